@@ -0,0 +1,405 @@
+"""Micro-benchmarks for the detection pipeline.
+
+Run all benchmarks:    python benchmarks.py
+Run one benchmark:     python benchmarks.py decoders
+"""
+import asyncio
+import base64
+import json
+import os
+import struct
+import sys
+import time
+
+import dex_registry
+import event_types
+import frame_filter
+import http_sessions
+import pool_decoders
+import pool_enrichment
+
+
+def _timeit(func, iterations: int) -> float:
+    """Return mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _raydium_account(traded: bool) -> bytes:
+    """Build a synthetic Raydium AMM v4 pool-state account."""
+    data = bytearray(pool_decoders.RAYDIUM_AMM_V4_SIZE)
+    struct.pack_into("<Q", data, 0, pool_decoders.RAYDIUM_STATUS_SWAP_ONLY)
+    struct.pack_into("<QQ", data, 32, 6, 9)
+    if traded:
+        struct.pack_into("<Q", data, 256, 123456789)
+    for offset in (336, 368, 400, 432, 464, 496, 528, 560, 592, 624, 656, 688):
+        data[offset:offset + 32] = os.urandom(32)
+    return bytes(data)
+
+
+def _notification(slot: int, pubkey: str, owner: str, data: object) -> str:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "programNotification",
+        "params": {
+            "result": {
+                "context": {"slot": slot},
+                "value": {
+                    "pubkey": pubkey,
+                    "account": {
+                        "data": data,
+                        "executable": False,
+                        "lamports": 6124800,
+                        "owner": owner,
+                        "rentEpoch": 18446744073709551615,
+                        "space": 752
+                    }
+                }
+            },
+            "subscription": 1
+        }
+    }, separators=(",", ":"))  # compact, as RPC nodes send it
+
+
+def _legacy_json_decode(frame: str):
+    """The jsonParsed path as MempoolMonitor._process_transaction walks it."""
+    data = json.loads(frame)
+    value = data["params"].get("result", {}).get("value", {})
+    parsed = value.get("account", {}).get("data", {}).get("parsed", {})
+    info = parsed.get("info", {})
+    if parsed.get("type", "") in ["initializePool", "createPool", "initialize"] or ("mintA" in info and "mintB" in info):
+        return {
+            "pool_address": info.get("poolAddress", info.get("account")),
+            "token_a": info.get("mintA", info.get("tokenMintA")),
+            "token_b": info.get("mintB", info.get("tokenMintB")),
+        }
+    return None
+
+
+def _binary_decode(frame: str):
+    """The base64 path: envelope JSON plus the fixed-offset decoder."""
+    value = json.loads(frame)["params"]["result"]["value"]
+    account = value["account"]
+    return dex_registry.decode_account(account["owner"], account["data"][0])
+
+
+def bench_decoders(iterations: int = 20000):
+    """Bytes per event and decode µs/event: jsonParsed dicts vs base64 + struct decoders."""
+    program = pool_decoders.RAYDIUM_AMM_V4_PROGRAM
+    pubkey = "58oQChx4yWmvKdwLLZzBi4ChoCc2fqCUWBkwMihLYQo2"
+    fresh = _raydium_account(traded=False)
+    traded = _raydium_account(traded=True)
+
+    # What a fully parsed pool-state account would look like on the wire
+    parsed_fields = {
+        "status": 6, "nonce": 254, "baseDecimal": 6, "quoteDecimal": 9,
+        "baseVault": pubkey, "quoteVault": pubkey, "mintA": pubkey, "mintB": pubkey,
+        "lpMint": pubkey, "openOrders": pubkey, "marketId": pubkey, "marketProgramId": pubkey,
+        "targetOrders": pubkey, "withdrawQueue": pubkey, "lpVault": pubkey, "owner": pubkey,
+        "swapBaseInAmount": "0", "swapQuoteOutAmount": "0", "swapQuoteInAmount": "0",
+        "swapBaseOutAmount": "0", "poolOpenTime": 1700000000, "lpReserve": 100000000,
+    }
+    json_frame = _notification(1, pubkey, program, {
+        "parsed": {"type": "initialize", "info": parsed_fields},
+        "program": "raydium-amm"
+    })
+    fresh_frame = _notification(1, pubkey, program, [base64.b64encode(fresh).decode(), "base64"])
+    traded_frame = _notification(1, pubkey, program, [base64.b64encode(traded).decode(), "base64"])
+
+    assert _binary_decode(fresh_frame) is not None
+    assert _binary_decode(traded_frame) is None
+
+    print("== Account decoding (Raydium AMM v4 pool state) ==")
+    print(f"{'path':<28}{'bytes/event':>12}{'µs/event':>12}")
+    rows = [
+        ("jsonParsed (dict walk)", json_frame, _legacy_json_decode),
+        ("base64 candidate", fresh_frame, _binary_decode),
+        ("base64 non-candidate", traded_frame, _binary_decode),
+    ]
+    for label, frame, decode in rows:
+        micros = _timeit(lambda: decode(frame), iterations)
+        print(f"{label:<28}{len(frame.encode()):>12}{micros:>12.2f}")
+
+    account_view = memoryview(traded)
+    micros = _timeit(lambda: pool_decoders.decode_raydium_amm_v4(account_view), iterations)
+    print(f"{'struct reject (no envelope)':<28}{'-':>12}{micros:>12.2f}")
+
+
+def bench_prefilter(frames_total: int = 20000, candidate_every: int = 100):
+    """Frames/sec on one core with and without the raw-frame prefilter."""
+    program = pool_decoders.RAYDIUM_AMM_V4_PROGRAM
+    pubkey = "58oQChx4yWmvKdwLLZzBi4ChoCc2fqCUWBkwMihLYQo2"
+    fresh = base64.b64encode(_raydium_account(traded=False)).decode()
+    traded = base64.b64encode(_raydium_account(traded=True)).decode()
+    frames = [
+        _notification(1000 + i, pubkey, program, [fresh if i % candidate_every == 0 else traded, "base64"])
+        for i in range(frames_total)
+    ]
+
+    def run(loads, prefilter):
+        detected = 0
+        start = time.perf_counter()
+        for frame in frames:
+            if prefilter is not None and not prefilter.accept(frame):
+                continue
+            account = loads(frame)["params"]["result"]["value"]["account"]
+            if dex_registry.decode_account(account["owner"], account["data"][0]):
+                detected += 1
+        return frames_total / (time.perf_counter() - start), detected
+
+    prefilter = frame_filter.FramePrefilter("base64")
+    prefilter.register(1, program)
+
+    print(f"== Frame ingest ({frames_total} frames, 1 in {candidate_every} a candidate) ==")
+    print(f"{'path':<36}{'frames/sec':>14}{'detected':>10}")
+    rows = [
+        ("json.loads, no prefilter", json.loads, None),
+        (f"{frame_filter.JSON_BACKEND}, no prefilter", frame_filter.json_loads, None),
+        (f"prefilter + {frame_filter.JSON_BACKEND}", frame_filter.json_loads, prefilter),
+    ]
+    for label, loads, active_prefilter in rows:
+        rate, detected = run(loads, active_prefilter)
+        print(f"{label:<36}{rate:>14,.0f}{detected:>10}")
+
+
+def bench_enrichment(pools: int = 40, arrival_ms: float = 5.0, rtt_ms: float = 25.0, provider_concurrency: int = 4):
+    """Added latency per pool: one getMultipleAccounts per pool vs one per window.
+
+    Runs against a local stand-in RPC server that answers after rtt_ms and,
+    like a rate-limited RPC plan, serves at most provider_concurrency
+    requests at a time. Latency is measured from each pool's detection.
+    """
+    import aiohttp
+    from aiohttp import web
+    from solders.pubkey import Pubkey
+
+    mint = bytearray(pool_decoders.MINT_MIN_SIZE)
+    struct.pack_into("<QB?", mint, 36, 10 ** 15, 6, True)
+    vault = bytearray(165)
+    struct.pack_into("<Q", vault, 64, 85 * 10 ** 9)
+    encoded = {"mint": [base64.b64encode(bytes(mint)).decode(), "base64"],
+               "vault": [base64.b64encode(bytes(vault)).decode(), "base64"]}
+
+    async def get_multiple_accounts(request):
+        body = await request.json()
+        async with provider_slots:
+            await asyncio.sleep(rtt_ms / 1000)
+        keys = body["params"][0]
+        return web.json_response({"jsonrpc": "2.0", "id": 1, "result": {"value": [
+            {"data": encoded["vault" if key.startswith("V") else "mint"]} for key in keys
+        ]}})
+
+    def make_pools():
+        return [event_types.PoolEvent(
+            pool_address=f"P{i}",
+            token_a=str(Pubkey.from_bytes(os.urandom(32))),
+            token_b=pool_decoders.SOLANA_NATIVE_MINT,
+            base_vault=f"VA{i}",
+            quote_vault=f"VB{i}",
+        ) for i in range(pools)]
+
+    async def run(window: float, sequential: bool):
+        # A session per row so each path pays its own connection setup
+        session = aiohttp.ClientSession()
+        enricher = pool_enrichment.PoolEnricher(url, session, window=window)
+        started = time.perf_counter()
+        detected = make_pools()
+        latencies = []
+
+        async def arrive(index, pool_info):
+            detected_at = started + index * arrival_ms / 1000
+            await asyncio.sleep(max(0.0, detected_at - time.perf_counter()))
+            await enricher.enrich(pool_info)
+            latencies.append((time.perf_counter() - detected_at) * 1000)
+
+        if sequential:
+            # A consumer fetching each pool as it is handed over, one at a time
+            for index, pool_info in enumerate(detected):
+                await arrive(index, pool_info)
+        else:
+            await asyncio.gather(*(arrive(index, pool_info) for index, pool_info in enumerate(detected)))
+        await session.close()
+        assert all(pool_info.liquidity == 170.0 for pool_info in detected)
+        return enricher.batches, sum(latencies) / len(latencies), max(latencies)
+
+    async def main():
+        nonlocal url
+        app = web.Application()
+        app.router.add_post("/", get_multiple_accounts)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+        print(f"== Pool enrichment ({pools} pools, one every {arrival_ms}ms, "
+              f"RPC round trip {rtt_ms}ms, {provider_concurrency} requests in flight) ==")
+        print(f"{'path':<34}{'RPC calls':>10}{'mean ms/pool':>14}{'max ms':>10}")
+        rows = [
+            ("one call per pool, sequential", 0, True),
+            ("one call per pool, concurrent", 0, False),
+            (f"batched, {pool_enrichment.ENRICH_WINDOW_SECONDS * 1000:.0f}ms window",
+             pool_enrichment.ENRICH_WINDOW_SECONDS, False),
+        ]
+        for label, window, sequential in rows:
+            calls, mean_ms, max_ms = await run(window, sequential)
+            print(f"{label:<34}{calls:>10}{mean_ms:>14.2f}{max_ms:>10.2f}")
+        await runner.cleanup()
+
+    url = None
+    provider_slots = None
+
+    async def with_slots():
+        nonlocal provider_slots
+        provider_slots = asyncio.Semaphore(provider_concurrency)
+        await main()
+
+    asyncio.run(with_slots())
+
+
+def bench_events(count: int = 100_000):
+    """Allocation rate and retained memory of event records vs the dicts they replace."""
+    import gc
+    import tracemalloc
+
+    from event_types import PoolEvent, PriceTick, SwapEvent
+
+    mint = pool_decoders.SOLANA_NATIVE_MINT
+    builders = {
+        "pool": (
+            lambda i: {"pool_address": "P", "token_a": mint, "token_b": mint, "created_at": 1.0, "signature": None,
+                       "slot": i, "dex": "Raydium LP V4", "base_vault": "VA", "quote_vault": "VB",
+                       "base_reserve": i, "quote_reserve": i, "base_decimals": 6, "quote_decimals": 9,
+                       "creator": None, "liquidity": 1.0},
+            lambda i: PoolEvent("P", mint, mint, 1.0, None, i, "Raydium LP V4", "VA", "VB",
+                                i, i, 6, 9, None, liquidity=1.0),
+        ),
+        "swap": (
+            lambda i: {"type": "swap", "program": "R", "token_in": mint, "token_out": mint,
+                       "amount_in": i, "amount_out": i, "timestamp": i},
+            lambda i: SwapEvent("R", mint, mint, i, i, i),
+        ),
+        "price tick": (
+            lambda i: {"token": mint, "price": 1.5, "slot": i, "observed_at": 1.0},
+            lambda i: PriceTick(mint, 1.5, i, 1.0),
+        ),
+    }
+
+    def measure(build):
+        gc.collect()
+        start = time.perf_counter()
+        events = [build(i) for i in range(count)]
+        rate = count / (time.perf_counter() - start)
+        del events
+        gc.collect()
+        tracemalloc.start()
+        events = [build(i) for i in range(count)]
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del events
+        return rate, retained / (1024 * 1024)
+
+    print(f"== Event records ({count:,} events) ==")
+    print(f"{'type':<12}{'record':<12}{'allocs/s':>14}{'MiB retained':>14}{'bytes/event':>13}")
+    for name, (as_dict, as_record) in builders.items():
+        for label, build in (("dict", as_dict), ("slotted", as_record)):
+            rate, mib = measure(build)
+            print(f"{name:<12}{label:<12}{rate:>14,.0f}{mib:>14.2f}{mib * 1024 * 1024 / count:>13.0f}")
+
+
+def bench_http(trades: int = 20, rtt_ms: float = 20.0, setup_round_trips: int = 3):
+    """Buy-path HTTP latency with a new session per request vs the shared pooled sessions.
+
+    A buy makes three requests to three hosts: Solscan metadata, the Jupiter
+    swap and sendTransaction. Local stand-in servers answer after rtt_ms;
+    the first request on a new connection waits setup_round_trips more round
+    trips, standing in for the TCP and TLS handshakes of a real host.
+    """
+    import aiohttp
+    from aiohttp import web
+
+    async def handle(request):
+        delay = rtt_ms
+        if request.protocol not in seen_connections:
+            seen_connections.add(request.protocol)
+            delay += setup_round_trips * rtt_ms
+        await asyncio.sleep(delay / 1000)
+        return web.json_response({"jsonrpc": "2.0", "id": 1, "result": "ok"})
+
+    async def cold_buy(path):
+        for _, method, url in path:
+            async with aiohttp.ClientSession() as session:
+                async with session.request(method, url) as response:
+                    await response.read()
+
+    async def pooled_buy(manager, path):
+        for service, method, url in path:
+            async with manager.get(service).request(method, url) as response:
+                await response.read()
+
+    async def run(buy, path, prewarm_manager=None):
+        seen_connections.clear()
+        if prewarm_manager:
+            await prewarm_manager.prewarm((service, url) for service, _, url in path)
+        opened_before = len(seen_connections)
+        latencies = []
+        for _ in range(trades):
+            started = time.perf_counter()
+            await buy(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies, len(seen_connections) - opened_before
+
+    async def main():
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        ports = []
+        for _ in range(3):
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            ports.append(site._server.sockets[0].getsockname()[1])
+        # "localhost" so cold requests also pay a DNS lookup
+        path = [
+            (http_sessions.SOLSCAN, "GET", f"http://localhost:{ports[0]}/token/meta"),
+            (http_sessions.JUPITER, "GET", f"http://localhost:{ports[1]}/v6/swap"),
+            (http_sessions.RPC, "POST", f"http://localhost:{ports[2]}/"),
+        ]
+
+        print(f"== Buy-path HTTP ({trades} buys x 3 hosts, round trip {rtt_ms}ms, "
+              f"connection setup {setup_round_trips} round trips) ==")
+        print(f"{'path':<34}{'connections':>12}{'first ms':>10}{'mean ms/buy':>13}")
+        pooled = http_sessions.SessionManager()
+        prewarmed = http_sessions.SessionManager()
+        rows = [
+            ("new session per request", cold_buy, None),
+            ("pooled sessions", lambda p: pooled_buy(pooled, p), None),
+            ("pooled sessions, prewarmed", lambda p: pooled_buy(prewarmed, p), prewarmed),
+        ]
+        for label, buy, prewarm_manager in rows:
+            latencies, connections = await run(buy, path, prewarm_manager)
+            print(f"{label:<34}{connections:>12}{latencies[0]:>10.2f}{sum(latencies) / len(latencies):>13.2f}")
+        await pooled.close()
+        await prewarmed.close()
+        await runner.cleanup()
+
+    seen_connections = set()
+    asyncio.run(main())
+
+
+BENCHMARKS = {
+    "decoders": bench_decoders,
+    "prefilter": bench_prefilter,
+    "enrichment": bench_enrichment,
+    "events": bench_events,
+    "http": bench_http,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
+        print()
@@ -0,0 +1,141 @@
+"""Background prefetch of the latest blockhash.
+
+The monitor keeps one BlockhashPrefetcher refreshing on its pooled session;
+the trade path reads the newest snapshot with get_latest_blockhash(), which
+is a plain attribute read (the snapshot is replaced atomically, never
+mutated), so it needs no lock and never waits on the network.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+import aiohttp
+
+from http_sessions import RPC, get_session
+
+LOGGER = logging.getLogger(__name__)
+
+BLOCKHASH_REFRESH_SECONDS = 0.4
+# A blockhash is valid for 150 blocks (~60s); refuse snapshots well before that
+BLOCKHASH_MAX_AGE_SECONDS = 20.0
+
+
+class BlockhashSnapshot(NamedTuple):
+    blockhash: str
+    last_valid_block_height: int
+    slot: Optional[int]
+    fetched_at: float  # time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class BlockhashPrefetcher:
+    """Keeps the latest blockhash and lastValidBlockHeight warm in the background."""
+
+    def __init__(self, rpc_url: str, session: Optional[aiohttp.ClientSession] = None,
+                 interval: float = BLOCKHASH_REFRESH_SECONDS, commitment: str = "confirmed"):
+        self.rpc_url = rpc_url
+        self.session = session
+        self.interval = interval
+        self.commitment = commitment
+        self.snapshot: Optional[BlockhashSnapshot] = None
+        self.refreshes = 0
+        self.changes = 0
+        self.failures = 0
+        self.last_error = None
+        self.max_age_seen = 0.0
+        self._task = None
+
+    def start(self):
+        """Start refreshing on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def get(self, max_age: float = BLOCKHASH_MAX_AGE_SECONDS) -> Optional[BlockhashSnapshot]:
+        """Return the current snapshot, or None if there is none younger than max_age."""
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.age > max_age:
+            return None
+        return snapshot
+
+    async def refresh(self) -> BlockhashSnapshot:
+        """Fetch the latest blockhash once and publish it."""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getLatestBlockhash",
+            "params": [{"commitment": self.commitment}]
+        }
+        async with (self.session or get_session(RPC)).post(self.rpc_url, json=payload) as response:
+            result = await response.json()
+        if "error" in result:
+            raise Exception(f"RPC Error: {result['error']}")
+
+        value = result["result"]["value"]
+        previous = self.snapshot
+        if previous is not None:
+            self.max_age_seen = max(self.max_age_seen, previous.age)
+        self.snapshot = BlockhashSnapshot(
+            blockhash=value["blockhash"],
+            last_valid_block_height=value["lastValidBlockHeight"],
+            slot=result["result"].get("context", {}).get("slot"),
+            fetched_at=time.monotonic(),
+        )
+        self.refreshes += 1
+        if previous is None or previous.blockhash != value["blockhash"]:
+            self.changes += 1
+        return self.snapshot
+
+    async def _run(self):
+        while True:
+            try:
+                # Skip the first round if start() was preceded by a fresh refresh()
+                if self.get(self.interval) is None:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                LOGGER.warning(f"⚠️ Blockhash refresh failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "blockhash": snapshot.blockhash if snapshot else None,
+            "last_valid_block_height": snapshot.last_valid_block_height if snapshot else None,
+            "age_seconds": round(snapshot.age, 3) if snapshot else None,
+            "max_age_seconds": round(self.max_age_seen, 3),
+            "refreshes": self.refreshes,
+            "changes": self.changes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+_shared_prefetcher: Optional[BlockhashPrefetcher] = None
+
+
+def set_shared_prefetcher(prefetcher: Optional[BlockhashPrefetcher]):
+    """Make prefetcher the one get_latest_blockhash() reads from."""
+    global _shared_prefetcher
+    _shared_prefetcher = prefetcher
+
+
+def get_latest_blockhash(max_age: float = BLOCKHASH_MAX_AGE_SECONDS) -> Optional[BlockhashSnapshot]:
+    """Return a fresh prefetched blockhash, or None if none is running or it went stale.
+
+    Safe to call from any thread or event loop.
+    """
+    prefetcher = _shared_prefetcher
+    return prefetcher.get(max_age) if prefetcher else None
@@ -17,7 +17,7 @@ from datetime import datetime, timedelta
 import nest_asyncio
 from telegram import Update, Bot
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
-from trade_execution import execute_trade, check_for_auto_sell, calculate_trade_size, get_market_volatility
+from trade_execution import execute_trade, check_for_auto_sell, calculate_trade_size, get_market_volatility, prewarm_trade_connections
 from telegram_notifications import safe_send_telegram_message
 from decrypt_config import config
 from utils import log_trade_result
@@ -410,6 +410,7 @@ async def async_main():
     update_heartbeat()
     
     start_sniper_thread()
+    await prewarm_trade_connections()
     await safe_send_telegram_message("✅ Snipe4SoleBot is now running with health monitoring.")
     
     asyncio.create_task(run_telegram_command_listener(TELEGRAM_BOT_TOKEN))
@@ -0,0 +1,139 @@
+"""Scoring and prioritisation of freshly detected pools.
+
+Several pools often land in the same slot. CandidateScorer ranks each one
+on liquidity, quote mint, creator reputation and DEX; CandidateQueue hands
+out the best-scoring candidate first and ages out candidates older than
+the deadline, since a launch that has been waiting too long is no longer
+worth sniping.
+"""
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+from event_types import PoolEvent
+from pool_decoders import SOLANA_NATIVE_MINT
+
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+USDT_MINT = "Es9vMFrzaCERiE2dZVjW6M9T3cxLVRshzF5sgJnpPzM9"
+
+CANDIDATE_DEADLINE_SECONDS = 10.0
+DEFAULT_WEIGHTS = {"liquidity": 0.4, "quote": 0.2, "creator": 0.2, "dex": 0.2}
+QUOTE_SCORES = {SOLANA_NATIVE_MINT: 1.0, USDC_MINT: 0.8, USDT_MINT: 0.7}
+DEX_SCORES = {"Raydium LP V4": 1.0, "Orca": 0.8, "pump.fun": 0.6}
+# Liquidity score grows with log(SOL) and saturates here
+LIQUIDITY_SATURATION_SOL = 500.0
+# Creators launching more than once in this window are treated as serial launchers
+CREATOR_WINDOW_SECONDS = 3600.0
+
+
+class CandidateScorer:
+    """Scores a pool in [0, 1]; returns None for pools from blocked creators."""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, dex_scores: Optional[Dict[str, float]] = None,
+                 trusted_creators: Iterable[str] = (), blocked_creators: Iterable[str] = ()):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.dex_scores = {**DEX_SCORES, **(dex_scores or {})}
+        self.trusted_creators = set(trusted_creators)
+        self.blocked_creators = set(blocked_creators)
+        self._launches: Dict[str, deque] = {}  # creator -> recent launch times
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "CandidateScorer":
+        """Build from trade_settings.candidate_scoring."""
+        return cls(settings.get("weights"), settings.get("dex_scores"),
+                   settings.get("trusted_creators", ()), settings.get("blocked_creators", ()))
+
+    def _creator_score(self, creator: Optional[str], now: float) -> float:
+        if creator is None:
+            return 0.5  # unknown for most AMMs; neutral
+        if creator in self.trusted_creators:
+            return 1.0
+        launches = self._launches.setdefault(creator, deque())
+        while launches and now - launches[0] > CREATOR_WINDOW_SECONDS:
+            launches.popleft()
+        launches.append(now)
+        # First launch scores 0.75, each further one in the window halves it
+        return 0.75 / (2 ** (len(launches) - 1))
+
+    def score(self, pool: PoolEvent) -> Optional[float]:
+        if pool.creator in self.blocked_creators:
+            return None
+        liquidity = pool.liquidity or 0.0
+        parts = {
+            "liquidity": min(1.0, math.log1p(max(liquidity, 0.0)) / math.log1p(LIQUIDITY_SATURATION_SOL)),
+            "quote": max(QUOTE_SCORES.get(pool.token_b, 0.0), QUOTE_SCORES.get(pool.token_a, 0.0)),
+            "creator": self._creator_score(pool.creator, time.monotonic()),
+            "dex": self.dex_scores.get(pool.dex, 0.5),
+        }
+        return sum(self.weights[name] * value for name, value in parts.items()) / sum(self.weights.values())
+
+
+class CandidateQueue:
+    """Thread-safe max-score queue of pool candidates with a staleness deadline.
+
+    A candidate's age counts from frame arrival when the event carries it,
+    otherwise from when it was pushed.
+    """
+
+    def __init__(self, scorer: Optional[CandidateScorer] = None, deadline: float = CANDIDATE_DEADLINE_SECONDS):
+        self.scorer = scorer or CandidateScorer()
+        self.deadline = deadline
+        self._heap = []  # (-score, seq, detected_at, pool)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.pushed = 0
+        self.popped = 0
+        self.rejected = 0
+        self.aged_out = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, pool: PoolEvent) -> Optional[float]:
+        """Score and enqueue a pool; returns its score, or None if it was rejected."""
+        score = self.scorer.score(pool)
+        if score is None:
+            self.rejected += 1
+            return None
+        pool.score = score
+        detected_at = pool.received_at if pool.received_at is not None else time.monotonic()
+        with self._cond:
+            heapq.heappush(self._heap, (-score, next(self._seq), detected_at, pool))
+            self.pushed += 1
+            self._cond.notify()
+        return score
+
+    def pop(self, timeout: float = 0) -> Optional[PoolEvent]:
+        """Return the best candidate still inside the deadline, waiting up to timeout for one."""
+        end = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._heap:
+                    _, _, detected_at, pool = heapq.heappop(self._heap)
+                    if now - detected_at > self.deadline:
+                        self.aged_out += 1
+                        continue
+                    self.popped += 1
+                    return pool
+                remaining = end - now
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            best = -self._heap[0][0] if self._heap else None
+            return {
+                "depth": len(self._heap),
+                "pushed": self.pushed,
+                "popped": self.popped,
+                "rejected": self.rejected,
+                "aged_out": self.aged_out,
+                "best_score": round(best, 4) if best is not None else None,
+                "deadline_seconds": self.deadline,
+            }
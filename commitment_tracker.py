@@ -0,0 +1,181 @@
+"""Confirmation tracking for pools detected at processed commitment.
+
+A processed-commitment event can be rolled back if its slot ends up on a
+minority fork. Each tentative event carries a TentativeStatus; the
+CommitmentTracker re-reads the pool accounts at confirmed commitment in
+batches and resolves every status as confirmed or retracted, so
+consumers can act early and still back out.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import aiohttp
+
+from event_types import PoolEvent
+from http_sessions import RPC, get_session
+from stream_metrics import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+RETRACTED = "retracted"
+
+CONFIRM_POLL_SECONDS = 0.4
+# A processed slot is normally confirmed within ~1s; give up well after that
+CONFIRM_TIMEOUT_SECONDS = 20.0
+
+
+class TentativeStatus:
+    """Thread-safe confirmation state attached to a tentative pool event."""
+
+    def __init__(self, pool_address: str, slot: Optional[int]):
+        self.pool_address = pool_address
+        self.slot = slot
+        self.state = PENDING
+        self.reason = None
+        self.detected_at = time.monotonic()
+        self.resolved_at = None
+        self._resolved = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"TentativeStatus({self.state})"
+
+    @property
+    def confirmed(self) -> bool:
+        return self.state == CONFIRMED
+
+    @property
+    def retracted(self) -> bool:
+        return self.state == RETRACTED
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """Block until confirmed or retracted (or timeout) and return the state."""
+        self._resolved.wait(timeout)
+        return self.state
+
+    def add_done_callback(self, callback: Callable[["TentativeStatus"], Any]):
+        """Call callback(status) once resolved (immediately if it already is).
+
+        Callbacks run on the tracker's event loop thread and must not block.
+        """
+        with self._lock:
+            if self.state == PENDING:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def resolve(self, state: str, reason: Optional[str] = None):
+        """Settle the status; later calls are ignored."""
+        with self._lock:
+            if self.state != PENDING:
+                return
+            self.state = state
+            self.reason = reason
+            self.resolved_at = time.monotonic()
+            callbacks, self._callbacks = self._callbacks, []
+        self._resolved.set()
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                LOGGER.error(f"Confirmation callback failed for {self.pool_address}: {str(e)}")
+
+
+class CommitmentTracker:
+    """Confirms or retracts tentative pool events by polling at confirmed commitment."""
+
+    def __init__(self, rpc_url: str, session: Optional[aiohttp.ClientSession] = None,
+                 interval: float = CONFIRM_POLL_SECONDS, timeout: float = CONFIRM_TIMEOUT_SECONDS):
+        self.rpc_url = rpc_url
+        self.session = session
+        self.interval = interval
+        self.timeout = timeout
+        self._pending: Dict[str, tuple] = {}  # pool address -> (status, owner)
+        self._task = None
+        self.tentative = 0
+        self.confirmed = 0
+        self.retracted = 0
+        self.timed_out = 0
+        self.confirm_latency = LatencyHistogram()
+
+    def track(self, pool_info: PoolEvent, owner: Optional[str]) -> TentativeStatus:
+        """Register a tentative event and return the status consumers can watch."""
+        status = TentativeStatus(pool_info.pool_address, pool_info.slot)
+        self._pending[status.pool_address] = (status, owner)
+        self.tentative += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return status
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._check_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.warning(f"⚠️ Confirmation check failed: {str(e)}")
+            self._expire()
+
+    async def _check_pending(self):
+        addresses = list(self._pending)[:100]  # getMultipleAccounts key limit
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [addresses, {"encoding": "base64", "commitment": "confirmed", "dataSlice": {"offset": 0, "length": 0}}]
+        }
+        async with (self.session or get_session(RPC)).post(self.rpc_url, json=payload) as response:
+            result = await response.json()
+        if "error" in result:
+            raise Exception(f"RPC Error: {result['error']}")
+
+        confirmed_slot = result["result"]["context"]["slot"]
+        for address, account in zip(addresses, result["result"]["value"]):
+            status, owner = self._pending[address]
+            if account is not None and (owner is None or account.get("owner") == owner):
+                self._settle(address, CONFIRMED)
+            elif status.slot is not None and confirmed_slot >= status.slot:
+                # The confirmed bank has passed the event's slot without the account: forked out
+                self._settle(address, RETRACTED, f"absent at confirmed slot {confirmed_slot}")
+
+    def _expire(self):
+        now = time.monotonic()
+        for address, (status, _) in list(self._pending.items()):
+            if now - status.detected_at > self.timeout:
+                self.timed_out += 1
+                self._settle(address, RETRACTED, "not confirmed in time")
+
+    def _settle(self, address: str, state: str, reason: Optional[str] = None):
+        status, _ = self._pending.pop(address)
+        if state == CONFIRMED:
+            self.confirmed += 1
+            self.confirm_latency.observe((time.monotonic() - status.detected_at) * 1000)
+        else:
+            self.retracted += 1
+            LOGGER.warning(f"↩️ Retracted tentative pool {address} (slot {status.slot}): {reason}")
+        status.resolve(state, reason)
+
+    def get_stats(self) -> Dict[str, Any]:
+        resolved = self.confirmed + self.retracted
+        return {
+            "tentative": self.tentative,
+            "pending": len(self._pending),
+            "confirmed": self.confirmed,
+            "retracted": self.retracted,
+            "timed_out": self.timed_out,
+            "rollback_rate": round(self.retracted / resolved, 4) if resolved else 0.0,
+            "confirm_latency": self.confirm_latency.as_dict(),
+        }
@@ -0,0 +1,252 @@
+"""Pool detection in a separate process.
+
+DetectionProcess runs a MempoolMonitor in a spawned child so websocket
+ingestion, decoding and enrichment never compete with trade execution or
+Telegram for this process's event loop. The child writes each PoolEvent
+as a compact JSON array into a ShmRing; this side rebuilds the events and
+hands them to the callback. It exposes the same start_monitoring(),
+stop() and get_metrics() as MempoolMonitor, so PoolStream can use either.
+
+Processed-commitment events keep working across the boundary: the child
+forwards each confirmation or retraction as a status record and this side
+resolves a local TentativeStatus. The child's blockhash prefetcher is out
+of the trade path's reach, so given an RPC URL this side runs and
+publishes its own.
+"""
+import asyncio
+import dataclasses
+import json
+import logging
+import multiprocessing
+import time
+from typing import Any, Dict, Optional
+
+from blockhash_cache import BlockhashPrefetcher, set_shared_prefetcher
+from commitment_tracker import TentativeStatus
+from event_types import PoolEvent
+from frame_filter import json_loads
+from http_sessions import close_sessions
+from latency_budget import DEFAULT_BUDGET_SECONDS, LatencyBudget
+from shm_ring import DEFAULT_CAPACITY, DEFAULT_SLOT_SIZE, ShmRing
+from stream_metrics import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+# Every field but the process-local confirmation and budget handles crosses the boundary
+WIRE_FIELDS = tuple(field.name for field in dataclasses.fields(PoolEvent) if field.name not in ("confirmation", "budget"))
+POOL_RECORD = "P"
+STATUS_RECORD = "S"
+
+# Safety net for a lost wakeup; records normally arrive via the notify pipe
+IDLE_POLL_SECONDS = 0.1
+CHILD_METRICS_SECONDS = 1.0
+STOP_TIMEOUT_SECONDS = 5.0
+
+
+def encode_pool(pool_info: PoolEvent) -> bytes:
+    """[kind, sent_at, *fields] with sent_at on the system-wide monotonic clock."""
+    return json.dumps([POOL_RECORD, time.monotonic(), *(getattr(pool_info, name) for name in WIRE_FIELDS)],
+                      separators=(",", ":")).encode()
+
+
+def encode_status(status: TentativeStatus) -> bytes:
+    return json.dumps([STATUS_RECORD, time.monotonic(), status.pool_address, status.state, status.reason],
+                      separators=(",", ":")).encode()
+
+
+def _notify(ring: ShmRing, conn):
+    if ring.take_waiting():
+        conn.send_bytes(b"")
+
+
+def _publish(ring: ShmRing, conn, payload: bytes):
+    if not ring.put(payload):
+        LOGGER.warning("⚠️ Detection ring full; dropped a record")
+    _notify(ring, conn)
+
+
+async def _detect(ring: ShmRing, conn, stop_event):
+    from mempool_monitor import MempoolMonitor
+
+    monitor = MempoolMonitor()
+
+    async def handoff(pool_info: PoolEvent):
+        _publish(ring, conn, encode_pool(pool_info))
+        if pool_info.confirmation is not None:
+            pool_info.confirmation.add_done_callback(lambda status: _publish(ring, conn, encode_status(status)))
+
+    task = asyncio.create_task(monitor.start_monitoring(handoff))
+    last_metrics = time.monotonic()
+    while not stop_event.is_set() and not task.done():
+        await asyncio.sleep(0.25)
+        if time.monotonic() - last_metrics >= CHILD_METRICS_SECONDS:
+            last_metrics = time.monotonic()
+            conn.send_bytes(json.dumps(monitor.get_metrics(), default=str).encode())
+    await monitor.stop()
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+    await close_sessions()
+
+
+def _child_main(ring_name: str, conn, stop_event):
+    """Entry point of the detection process."""
+    logging.basicConfig(level=logging.INFO)
+    ring = ShmRing.attach(ring_name)
+    try:
+        asyncio.run(_detect(ring, conn, stop_event))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+        conn.close()
+
+
+class DetectionProcess:
+    """Runs detection in a child process and delivers its pools on this event loop."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, slot_size: int = DEFAULT_SLOT_SIZE,
+                 latency_budget: float = DEFAULT_BUDGET_SECONDS, rpc_url: Optional[str] = None):
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.latency_budget = latency_budget
+        # Keeps get_latest_blockhash() warm for trades in this process
+        self.blockhash = BlockhashPrefetcher(rpc_url) if rpc_url else None
+        self.ring: Optional[ShmRing] = None
+        self.process = None
+        self._conn = None
+        self._stop_event = None
+        self._wakeup = None
+        self._statuses: Dict[str, TentativeStatus] = {}
+        self.child_metrics: Dict[str, Any] = {}
+        self.events = 0
+        # frame arrival in the child -> callback here
+        self.end_to_end = LatencyHistogram()
+        # handoff in the child -> callback here
+        self.handoff = LatencyHistogram()
+
+    @property
+    def is_connected(self) -> bool:
+        return bool(self.process and self.process.is_alive() and self.child_metrics.get("connected"))
+
+    async def start_monitoring(self, callback):
+        """Spawn the detection process and deliver its pools until stop() or the child exits."""
+        context = multiprocessing.get_context("spawn")
+        self.ring = ShmRing(capacity=self.capacity, slot_size=self.slot_size)
+        self._conn, child_conn = context.Pipe(duplex=False)
+        self._stop_event = context.Event()
+        self.process = context.Process(target=_child_main, name="pool-detection",
+                                       args=(self.ring.name, child_conn, self._stop_event), daemon=True)
+        self.process.start()
+        child_conn.close()
+        LOGGER.info(f"🧩 Detection process started (pid {self.process.pid}, ring {self.ring.name})")
+        if self.blockhash is not None:
+            self.blockhash.start()
+            set_shared_prefetcher(self.blockhash)
+
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        loop.add_reader(self._conn.fileno(), self._on_readable)
+        try:
+            while self.process.is_alive() or self._has_pending():
+                await self._deliver_ready(callback)
+                self.ring.set_waiting(True)
+                # Re-check after raising the flag so a record written in between isn't missed
+                if self._has_pending():
+                    self.ring.set_waiting(False)
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), IDLE_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                self.ring.set_waiting(False)
+            await self._deliver_ready(callback)
+            if not self._stop_event.is_set():
+                LOGGER.error(f"❌ Detection process exited unexpectedly (code {self.process.exitcode})")
+        finally:
+            loop.remove_reader(self._conn.fileno())
+            await self._shutdown()
+
+    def _has_pending(self) -> bool:
+        return self.ring.get_stats()["depth"] > 0
+
+    def _on_readable(self):
+        try:
+            while self._conn.poll():
+                message = self._conn.recv_bytes()
+                if message:
+                    self.child_metrics = json_loads(message)
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(self._conn.fileno())
+        self._wakeup.set()
+
+    async def _deliver_ready(self, callback):
+        while True:
+            payload = self.ring.get()
+            if payload is None:
+                return
+            record = json_loads(payload)
+            now = time.monotonic()
+            if record[0] == STATUS_RECORD:
+                _, _, pool_address, state, reason = record
+                status = self._statuses.pop(pool_address, None)
+                if status is not None:
+                    status.resolve(state, reason)
+                continue
+
+            pool_info = PoolEvent(**dict(zip(WIRE_FIELDS, record[2:])))
+            self.handoff.observe((now - record[1]) * 1000)
+            if pool_info.received_at is not None:
+                self.end_to_end.observe((now - pool_info.received_at) * 1000)
+            # Detection and enrichment in the child are booked together as "handoff"
+            pool_info.budget = LatencyBudget(pool_info.received_at, self.latency_budget)
+            pool_info.budget.mark("handoff")
+            if pool_info.tentative:
+                pool_info.confirmation = self._statuses[pool_info.pool_address] = TentativeStatus(
+                    pool_info.pool_address, pool_info.slot)
+            self.events += 1
+            try:
+                await callback(pool_info)
+            except Exception as e:
+                LOGGER.error(f"Error delivering pool {pool_info.pool_address}: {str(e)}")
+
+    async def stop(self):
+        """Ask the child to shut down cleanly; start_monitoring() returns once it has."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def _shutdown(self):
+        if self.blockhash is not None:
+            await self.blockhash.stop()
+        if self.process is not None:
+            self._stop_event.set()
+            await asyncio.to_thread(self.process.join, STOP_TIMEOUT_SECONDS)
+            if self.process.is_alive():
+                LOGGER.warning("⚠️ Detection process did not stop in time; terminating")
+                self.process.terminate()
+                await asyncio.to_thread(self.process.join)
+        if self._conn is not None:
+            self._conn.close()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """The child's latest MempoolMonitor metrics plus the cross-process handoff stats."""
+        metrics = dict(self.child_metrics)
+        metrics["detection_process"] = {
+            "pid": self.process.pid if self.process else None,
+            "alive": bool(self.process and self.process.is_alive()),
+            "events": self.events,
+            "ring": self.ring.get_stats() if self.ring else None,
+            "handoff_latency": self.handoff.as_dict(),
+            "end_to_end_latency": self.end_to_end.as_dict(),
+        }
+        if self.blockhash is not None:
+            # The prefetcher trades actually read from, not the child's
+            metrics["blockhash"] = self.blockhash.get_stats()
+        return metrics
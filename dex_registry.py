@@ -0,0 +1,149 @@
+"""Registry of supported DEX programs.
+
+Each DEX is one DexPlugin holding its program id and name, the pool-state
+prefilter and decoder used by the websocket stream, how to recognise its
+pool-creation transactions during backfill, a swap decoder for whale
+tracking, and its fee model. The stream (mempool_monitor, frame_filter),
+utils.get_dex_fee and WhaleTracker all look programs up here by id, so
+supporting another DEX means registering a plugin rather than editing each
+of them. The built-in DEXes register on import; modules listed in
+mempool_settings.dex_plugins are imported by load_plugins() and call
+register() themselves.
+"""
+import base64
+import importlib
+import logging
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+from event_types import SwapEvent
+from pool_decoders import (
+    ORCA_WHIRLPOOL_PREFILTER, ORCA_WHIRLPOOL_PROGRAM, PUMP_FUN_CURVE_PREFILTER, PUMP_FUN_PROGRAM,
+    RAYDIUM_AMM_V4_PREFILTER, RAYDIUM_AMM_V4_PROGRAM, AccountPrefilter, DecodedPool,
+    decode_orca_whirlpool, decode_pump_fun_curve, decode_raydium_amm_v4,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FEE_PCT = 0.3
+
+SwapDecoder = Callable[[Dict[str, Any], Dict[str, Any]], Optional[SwapEvent]]
+
+
+class PoolInitSpec(NamedTuple):
+    """Recognises a pool-creation transaction from its logs and instruction accounts.
+
+    mint_b_index is None for pools quoted in SOL that don't list the mint.
+    """
+    markers: Tuple[str, ...]  # log substrings, any of which marks a creation
+    pool_index: int
+    mint_a_index: int
+    mint_b_index: Optional[int]
+
+
+class DexPlugin(NamedTuple):
+    """Everything the bot needs to know about one DEX program."""
+    program_id: str
+    name: str
+    prefilter: Optional[AccountPrefilter]  # None subscribes to every account of the program
+    decode_pool: Optional[Callable[[memoryview], Optional[DecodedPool]]]
+    pool_init: Optional[PoolInitSpec]  # None skips the program during backfill
+    decode_swap: Optional[SwapDecoder]
+    fee_pct: float = DEFAULT_FEE_PCT
+
+    def fee(self, pool: Optional[DecodedPool] = None) -> float:
+        """Swap fee in percent: the pool's own rate when its layout stores one, else the DEX default."""
+        if pool is not None and pool.fee_pct is not None:
+            return pool.fee_pct
+        return self.fee_pct
+
+
+def parsed_swap_decoder(*swap_types: str) -> SwapDecoder:
+    """Swap decoder for programs whose instructions come back jsonParsed with token/amount info."""
+
+    def decode(instruction: Dict[str, Any], transaction: Dict[str, Any]) -> Optional[SwapEvent]:
+        parsed = instruction.get("parsed")
+        if not isinstance(parsed, dict) or parsed.get("type") not in swap_types:
+            return None
+        info = parsed.get("info", {})
+        return SwapEvent(
+            program=instruction.get("programId"),
+            token_in=info.get("tokenIn"),
+            token_out=info.get("tokenOut"),
+            amount_in=info.get("amountIn"),
+            amount_out=info.get("amountOut"),
+            timestamp=transaction.get("blockTime"),
+            type=parsed["type"],
+        )
+
+    return decode
+
+
+_PLUGINS: Dict[str, DexPlugin] = {}
+# Read-only view of the registry, keyed by program id
+PLUGINS: Mapping[str, DexPlugin] = MappingProxyType(_PLUGINS)
+
+
+def register(plugin: DexPlugin) -> DexPlugin:
+    """Add (or replace) the plugin for plugin.program_id."""
+    if plugin.program_id in _PLUGINS:
+        LOGGER.warning(f"⚠️ Replacing DEX plugin {_PLUGINS[plugin.program_id].name} with {plugin.name}")
+    _PLUGINS[plugin.program_id] = plugin
+    return plugin
+
+
+def get_dex(program_id: Optional[str]) -> Optional[DexPlugin]:
+    return _PLUGINS.get(program_id)
+
+
+def program_names() -> Dict[str, str]:
+    """{program id: DEX name} for every registered DEX."""
+    return {program_id: plugin.name for program_id, plugin in _PLUGINS.items()}
+
+
+def load_plugins(modules: Iterable[str]):
+    """Import plugin modules, each of which registers its DEX on import."""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            LOGGER.error(f"❌ Failed to load DEX plugin {module}: {str(e)}")
+
+
+def decode_account(owner: str, encoded_data: str) -> Optional[DecodedPool]:
+    """Decode a base64 account payload owned by one of the registered DEX programs."""
+    plugin = _PLUGINS.get(owner)
+    if plugin is None or plugin.decode_pool is None:
+        return None
+    return plugin.decode_pool(memoryview(base64.b64decode(encoded_data)))
+
+
+_parsed_swap = parsed_swap_decoder("swap", "swapExactTokensForTokens")
+
+register(DexPlugin(
+    program_id=RAYDIUM_AMM_V4_PROGRAM,
+    name="Raydium LP V4",
+    prefilter=RAYDIUM_AMM_V4_PREFILTER,
+    decode_pool=decode_raydium_amm_v4,
+    pool_init=PoolInitSpec(("initialize2",), 4, 8, 9),
+    decode_swap=_parsed_swap,
+    fee_pct=0.25,
+))
+register(DexPlugin(
+    program_id=ORCA_WHIRLPOOL_PROGRAM,
+    name="Orca",
+    prefilter=ORCA_WHIRLPOOL_PREFILTER,
+    decode_pool=decode_orca_whirlpool,
+    pool_init=PoolInitSpec(("InitializePool",), 4, 1, 2),
+    decode_swap=_parsed_swap,
+    fee_pct=0.3,  # default tier; each Whirlpool stores its own rate
+))
+register(DexPlugin(
+    program_id=PUMP_FUN_PROGRAM,
+    name="pump.fun",
+    prefilter=PUMP_FUN_CURVE_PREFILTER,
+    decode_pool=decode_pump_fun_curve,
+    pool_init=PoolInitSpec(("Instruction: Create",), 2, 0, None),
+    decode_swap=_parsed_swap,
+    fee_pct=1.0,
+))
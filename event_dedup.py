@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+# Defaults sized for a few minutes of pool creations across every DEX
+DEDUP_MAX_KEYS = 20000
+DEDUP_TTL_SECONDS = 600.0
+
+
+class DedupIndex:
+    """Bounded, time-decayed LRU of recently seen event keys.
+
+    An event is identified by several keys at once (signature, pool
+    address); a hit on any of them marks it as a duplicate, and every key it
+    arrives with is linked to the first entry so later arrivals match no
+    matter which identifier they carry. Entries expire ttl seconds after
+    their last hit and the index never holds more than max_keys keys, so
+    lookups and inserts stay O(1) with a fixed memory ceiling.
+    """
+
+    def __init__(self, max_keys: int = DEDUP_MAX_KEYS, ttl: float = DEDUP_TTL_SECONDS):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> [expires_at, value]; front expires first
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, keys: Iterable[Optional[Hashable]], value: Any = None,
+               now: Optional[float] = None) -> Optional[list]:
+        """Return the entry for the first known key, or insert value under all keys.
+
+        Returns None on a miss (value is now stored) and the stored
+        [expires_at, value] entry on a hit. None keys are ignored.
+        """
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        keys = [key for key in keys if key is not None]
+        found = None
+        for key in keys:
+            entry = self._entries.get(key)
+            # Aliased keys can sit behind a fresher front entry; check expiry here too
+            if entry is not None and entry[0] > now:
+                found = entry
+                break
+
+        if found is None:
+            self.misses += 1
+            entry = [now + self.ttl, value]
+        else:
+            self.hits += 1
+            entry = found
+            entry[0] = now + self.ttl
+
+        for key in keys:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+        return found
+
+    def contains(self, keys: Iterable[Optional[Hashable]], now: Optional[float] = None) -> bool:
+        """True if any key is known and unexpired. Unlike lookup(), inserts and counts nothing."""
+        now = time.monotonic() if now is None else now
+        for key in keys:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None and entry[0] > now:
+                return True
+        return False
+
+    def _expire(self, now: float):
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[0] > now:
+                return
+            del self._entries[key]
+            self.expired += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_keys": self.max_keys,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
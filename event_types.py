@@ -0,0 +1,108 @@
+"""Compact record types for the detection pipeline.
+
+PoolEvent and SwapEvent are slotted dataclasses: no per-instance __dict__,
+so a burst of events costs a fraction of the equivalent dicts. They still
+answer the dict-style access older consumers use (event["token_a"],
+event.get("liquidity", 0), event["liquidity"] = ...), where a field that is
+None reads as absent. PriceTick is an immutable NamedTuple, replaced rather
+than updated like BlockhashSnapshot.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+
+class _RecordMapping:
+    """Read/write dict-style access over a slotted dataclass's fields."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__dataclass_fields__ and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.__dataclass_fields__ else None
+        return default if value is None else value
+
+    def keys(self) -> Iterator[str]:
+        return (key for key in self.__dataclass_fields__ if getattr(self, key) is not None)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((key, getattr(self, key)) for key in self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{key}={value!r}' for key, value in self.items())})"
+
+
+@dataclass(slots=True, repr=False)
+class PoolEvent(_RecordMapping):
+    """A detected pool, filled in by enrichment and confirmation tracking as it moves downstream."""
+
+    pool_address: str
+    token_a: Optional[str] = None
+    token_b: Optional[str] = None
+    created_at: Optional[float] = None
+    signature: Optional[str] = None
+    slot: Optional[int] = None
+    dex: Optional[str] = None
+    base_vault: Optional[str] = None
+    quote_vault: Optional[str] = None
+    base_reserve: Optional[int] = None
+    quote_reserve: Optional[int] = None
+    base_decimals: Optional[int] = None
+    quote_decimals: Optional[int] = None
+    creator: Optional[str] = None
+    source: Optional[str] = None  # "backfill" for pools recovered after a disconnect
+    received_at: Optional[float] = None  # time.monotonic() when the frame arrived
+    score: Optional[float] = None  # set by candidate_queue
+    budget: Any = None  # LatencyBudget started at received_at (see latency_budget)
+    # Set by pool enrichment
+    mint_authority: Optional[str] = None
+    freeze_authority: Optional[str] = None
+    liquidity: Optional[float] = None
+    # Set at emission (see commitment_tracker)
+    commitment: Optional[str] = None
+    tentative: Optional[bool] = None
+    confirmation: Any = None
+
+
+@dataclass(slots=True, repr=False)
+class SwapEvent(_RecordMapping):
+    """A DEX swap seen in a tracked wallet's history."""
+
+    program: str
+    token_in: Optional[str] = None
+    token_out: Optional[str] = None
+    amount_in: Optional[int] = None
+    amount_out: Optional[int] = None
+    timestamp: Optional[int] = None
+    type: str = "swap"
+    whale: Optional[str] = None
+    wallet: Optional[str] = None
+
+
+class PriceTick(NamedTuple):
+    """One price observation for a token, in units of the pool's other asset."""
+
+    token: str
+    price: float
+    slot: Optional[int]
+    observed_at: float  # time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.observed_at
+
@@ -0,0 +1,206 @@
+import base64
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from dex_registry import PLUGINS
+from pool_decoders import AccountPrefilter
+
+# Fastest available JSON decoder for the frames that survive the prefilter
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    try:
+        import ujson
+        json_loads = ujson.loads
+        JSON_BACKEND = "ujson"
+    except ImportError:
+        json_loads = json.loads
+        JSON_BACKEND = "json"
+
+_SUBSCRIPTION_MARKER = '"subscription":'
+_SLOT_MARKER = '"slot":'
+_DATA_MARKER = '"data":'
+
+# Prefilter verdicts
+DROP = 0  # cannot contain a pool creation
+PASS = 1  # could not be classified (responses, unknown subscriptions); parse it
+MATCH = 2  # passed every byte-level check for its program
+
+# Dropped frames only refresh latest_slot this often; an older slot just
+# widens the reconnect backfill window slightly
+SLOT_SAMPLE_INTERVAL = 32
+
+# Substrings one of which every candidate jsonParsed frame must contain
+JSON_PARSED_MARKERS = ('"initializePool"', '"createPool"', '"initialize"', '"mintA"', '"tokenMintA"')
+
+
+def _read_int(frame: str, position: int) -> Optional[int]:
+    """Parse the integer value starting at position, ending at the next ',' or '}'."""
+    end = frame.find("}", position)
+    comma = frame.find(",", position, end)
+    if comma != -1:
+        end = comma
+    try:
+        return int(frame[position:end])
+    except ValueError:
+        return None
+
+
+def _compile_checks(spec: AccountPrefilter) -> Tuple[list, list]:
+    """Turn byte-level checks into comparisons on the base64 text.
+
+    Each 3-byte group of the account is one 4-character base64 group. Groups
+    entirely inside a checked range are compared as text (consecutive zero
+    groups collapse into one "AAAA..." comparison); groups straddling a range
+    edge are decoded individually. Per-group alternatives make this a
+    superset of the exact check, so it can pass extra frames but never
+    rejects one the decoders would accept.
+    """
+    text_checks = []  # [char offset, length, accepted texts]
+    byte_checks = []  # (char offset, lo, hi, accepted byte strings)
+
+    def add_range(start: int, end: int, allowed):
+        for group in range(start // 3, (end + 2) // 3):
+            lo = max(start, group * 3)
+            hi = min(end, group * 3 + 3)
+            accepted = allowed(lo, hi)
+            if hi - lo < 3:
+                byte_checks.append((group * 4, lo - group * 3, hi - group * 3, accepted))
+                continue
+            texts = {base64.b64encode(a).decode() for a in accepted}
+            previous = text_checks[-1] if text_checks else None
+            if (texts == {"AAAA"} and previous and previous[2] == {"A" * previous[1]}
+                    and previous[0] + previous[1] == group * 4):
+                previous[1] += 4
+                previous[2] = {"A" * previous[1]}
+            else:
+                text_checks.append([group * 4, 4, texts])
+
+    for offset, accepted in spec.equals:
+        add_range(offset, offset + len(accepted[0]),
+                  lambda lo, hi, offset=offset, accepted=accepted: {a[lo - offset:hi - offset] for a in accepted})
+    for start, end in spec.zero_ranges:
+        add_range(start, end, lambda lo, hi: {bytes(hi - lo)})
+
+    return [tuple(check) for check in text_checks], byte_checks
+
+
+def _base64_length(size: Optional[int]) -> Optional[Tuple[int, int]]:
+    """Return (encoded length, padding) for an exact account size."""
+    if size is None:
+        return None
+    return (size + 2) // 3 * 4, (3 - size % 3) % 3
+
+
+class FramePrefilter:
+    """Discards irrelevant programNotification frames before JSON parsing.
+
+    Works on the raw frame text: maps the subscription id to its program,
+    derives the account size from the base64 length, and decodes only the
+    few 4-character groups covering each discriminator/status/zero check in
+    each registered DEX's prefilter. Anything it can't classify is passed through
+    to the full parser, so it never drops a frame the decoders would accept.
+    """
+
+    def __init__(self, encoding: str = "base64"):
+        self.encoding = encoding
+        self._programs = {}  # subscription id text -> (spec, base64 length, text checks, byte checks)
+        self._compiled = {
+            program_id: (dex.prefilter, _base64_length(dex.prefilter.exact_size)) + _compile_checks(dex.prefilter)
+            for program_id, dex in PLUGINS.items() if dex.prefilter is not None
+        }
+        self.latest_slot = None
+        self.frames_seen = 0
+        self.frames_dropped = 0
+
+    def register(self, subscription_id: int, program_id: str):
+        """Associate a server-assigned subscription id with its program."""
+        if program_id in self._compiled:
+            self._programs[str(subscription_id)] = self._compiled[program_id]
+
+    def reset(self):
+        """Forget subscription ids (they are reassigned on reconnect)."""
+        self._programs.clear()
+
+    def accept(self, frame: str) -> bool:
+        """Return True if the frame may contain a pool creation and should be parsed."""
+        return self.classify(frame) != DROP
+
+    def classify(self, frame: str) -> int:
+        """Return DROP, PASS or MATCH for a raw frame."""
+        self.frames_seen += 1
+        verdict = self._classify(frame)
+        if verdict != DROP:
+            self._track_slot(frame)
+            return verdict
+        self.frames_dropped += 1
+        if self.frames_dropped % SLOT_SAMPLE_INTERVAL == 0:
+            self._track_slot(frame)
+        return verdict
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_dropped": self.frames_dropped,
+            "json_backend": JSON_BACKEND,
+        }
+
+    def _track_slot(self, frame: str):
+        slot_marker = frame.find(_SLOT_MARKER)
+        if slot_marker != -1:
+            slot = _read_int(frame, slot_marker + len(_SLOT_MARKER))
+            if slot and (self.latest_slot is None or slot > self.latest_slot):
+                self.latest_slot = slot
+
+    def _classify(self, frame: str) -> int:
+        marker = frame.rfind(_SUBSCRIPTION_MARKER)
+        if marker == -1:
+            return PASS  # RPC responses and subscription confirmations
+
+        if self.encoding != "base64":
+            return MATCH if any(candidate in frame for candidate in JSON_PARSED_MARKERS) else DROP
+
+        # The subscription id is compared as text to skip an int() per frame
+        id_start = marker + len(_SUBSCRIPTION_MARKER)
+        compiled = self._programs.get(frame[id_start:frame.find("}", id_start)].strip())
+        if compiled is None:
+            return PASS
+        spec, encoded_size, text_checks, byte_checks = compiled
+
+        # base64 payloads look like "data":["<base64>","base64"]
+        data_marker = frame.find(_DATA_MARKER)
+        if data_marker == -1:
+            return PASS
+        data_start = frame.find('"', data_marker + len(_DATA_MARKER)) + 1
+        if data_start == 0:
+            return PASS
+
+        if encoded_size is not None:
+            # Exact-size accounts: jump to where the payload must end
+            encoded_length, padding = encoded_size
+            data_end = data_start + encoded_length
+            if frame[data_end:data_end + 1] != '"':
+                return DROP
+            if padding and frame[data_end - padding:data_end] != "=" * padding:
+                return DROP
+            if frame[data_end - padding - 1] == "=":
+                return DROP
+        else:
+            data_end = frame.find('"', data_start)
+            if data_end == -1:
+                return PASS
+            padding = (frame[data_end - 1] == "=") + (frame[data_end - 2] == "=")
+            if (data_end - data_start) // 4 * 3 - padding < spec.min_size:
+                return DROP
+
+        for char_offset, length, accepted in text_checks:
+            position = data_start + char_offset
+            if frame[position:position + length] not in accepted:
+                return DROP
+        for char_offset, lo, hi, accepted in byte_checks:
+            position = data_start + char_offset
+            if base64.b64decode(frame[position:position + 4])[lo:hi] not in accepted:
+                return DROP
+        return MATCH
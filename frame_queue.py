@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Any, Dict, NamedTuple
+
+# Overflow policies for a full FrameQueue
+DROP_OLDEST = "drop-oldest"
+DROP_NON_CANDIDATE = "drop-non-candidate"
+BLOCK = "block"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NON_CANDIDATE, BLOCK)
+
+# Weight of the newest sample in the lag moving average
+LAG_EWMA_ALPHA = 0.1
+
+
+class QueuedFrame(NamedTuple):
+    frame: str
+    received_at: float  # time.monotonic() when read off the socket
+    candidate: bool  # positively matched by the prefilter
+    provider: str = ""  # name of the connection the frame arrived on
+
+
+class FrameQueue(asyncio.Queue):
+    """Bounded queue between the websocket reader and the processing workers.
+
+    put_frame() applies the overflow policy so the reader only ever waits
+    under the "block" policy (or when drop-non-candidate finds nothing but
+    candidates to evict). Depth and reader-to-worker lag are tracked for
+    get_stats().
+    """
+
+    def __init__(self, maxsize: int, policy: str = DROP_NON_CANDIDATE):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}; expected one of {OVERFLOW_POLICIES}")
+        super().__init__(maxsize)
+        self.policy = policy
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.blocked_puts = 0
+        self.high_watermark = 0
+        self.lag_ewma = 0.0
+        self.lag_max = 0.0
+
+    async def put_frame(self, frame: str, candidate: bool, provider: str = ""):
+        """Enqueue a raw frame, applying the overflow policy when full."""
+        item = QueuedFrame(frame, time.monotonic(), candidate, provider)
+        if self.full():
+            if self.policy == DROP_OLDEST:
+                self.get_nowait()
+                self.dropped += 1
+            elif self.policy == DROP_NON_CANDIDATE:
+                if not candidate:
+                    self.dropped += 1
+                    return
+                if not self._evict_non_candidate():
+                    self.blocked_puts += 1
+                    await self.put(item)
+                    self._record_put()
+                    return
+            else:
+                self.blocked_puts += 1
+                await self.put(item)
+                self._record_put()
+                return
+
+        self.put_nowait(item)
+        self._record_put()
+
+    async def get_frame(self) -> QueuedFrame:
+        """Dequeue the next frame and record how long it waited."""
+        item = await self.get()
+        self.dequeued += 1
+        lag = time.monotonic() - item.received_at
+        self.lag_ewma += LAG_EWMA_ALPHA * (lag - self.lag_ewma)
+        if lag > self.lag_max:
+            self.lag_max = lag
+        return item
+
+    def _evict_non_candidate(self) -> bool:
+        """Remove the oldest queued non-candidate frame; False if there is none."""
+        for index, queued in enumerate(self._queue):
+            if not queued.candidate:
+                del self._queue[index]
+                self.dropped += 1
+                return True
+        return False
+
+    def _record_put(self):
+        self.enqueued += 1
+        depth = self.qsize()
+        if depth > self.high_watermark:
+            self.high_watermark = depth
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queue_policy": self.policy,
+            "queue_depth": self.qsize(),
+            "queue_capacity": self.maxsize,
+            "queue_high_watermark": self.high_watermark,
+            "frames_enqueued": self.enqueued,
+            "frames_processed": self.dequeued,
+            "frames_dropped_overflow": self.dropped,
+            "reader_blocked_puts": self.blocked_puts,
+            "queue_lag_ms_avg": round(self.lag_ewma * 1000, 3),
+            "queue_lag_ms_max": round(self.lag_max * 1000, 3),
+        }
@@ -0,0 +1,119 @@
+"""Append-only recordings of raw websocket frames.
+
+Each record is one JSON line, [received_at, provider, frame], in a gzip
+file. Every session appends a new gzip member, so a file can collect
+several runs. A session that died mid-write leaves a torn member; the
+reader keeps what was flushed of it, then resyncs to the next member
+header so the sessions recorded after it are still read.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+from typing import BinaryIO, Generator, Iterator, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# Sync-flush the compressor this often so a crash loses at most this many frames
+FLUSH_EVERY_FRAMES = 500
+READ_BYTES = 65536
+GZIP_MAGIC = b"\x1f\x8b\x08"  # member header: ID1, ID2, CM=deflate
+
+
+class FrameRecorder:
+    """Writes raw frames with their receive timestamps to a compressed file."""
+
+    def __init__(self, path: str, compresslevel: int = 1):
+        self.path = path
+        # Level 1: recording sits on the reader's hot path, size matters less
+        self._file = gzip.open(path, "ab", compresslevel=compresslevel)
+        self.frames_written = 0
+        self.bytes_written = 0
+
+    def write(self, provider: str, frame: str, received_at: float = None):
+        """Append one frame; received_at defaults to now (wall clock)."""
+        record = json.dumps([time.time() if received_at is None else received_at, provider, frame],
+                            separators=(",", ":"))
+        data = record.encode() + b"\n"
+        self._file.write(data)
+        self.frames_written += 1
+        self.bytes_written += len(data)
+        if self.frames_written % FLUSH_EVERY_FRAMES == 0:
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            LOGGER.info(f"💾 Recorded {self.frames_written} frames ({self.bytes_written} bytes raw) to {self.path}")
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, str, str]]:
+    """Yield (received_at, provider, frame) records in the order they were written."""
+    with open(path, "rb") as recording:
+        size = os.fstat(recording.fileno()).st_size
+        start = 0
+        while start is not None and start < size:
+            end = yield from _member_records(recording, start)
+            if end is None:
+                LOGGER.warning(f"Recording {path} has a torn session at byte {start}; resyncing to the next one")
+                end = _next_member(recording, start + 1)
+            start = end
+
+
+def _member_records(recording: BinaryIO, start: int) -> Generator[Tuple[float, str, str], None, Optional[int]]:
+    """Yield the records of the gzip member at start; return where the next member begins, or None if torn."""
+    recording.seek(start)
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    consumed = start
+    pending = b""
+    torn = False
+    while not decompressor.eof and not torn:
+        chunk = recording.read(READ_BYTES)
+        if not chunk:
+            break  # the file ends inside this member
+        snapshot = decompressor.copy()
+        try:
+            data = decompressor.decompress(chunk)
+        except zlib.error:
+            data, torn = _salvage(snapshot, chunk), True
+        consumed += len(chunk)
+        *lines, pending = (pending + data).split(b"\n")
+        for line in lines:
+            try:
+                received_at, provider, frame = json.loads(line)
+            except (ValueError, TypeError):
+                continue  # partially written record, or garbage decoded past a tear
+            yield received_at, provider, frame
+    return consumed - len(decompressor.unused_data) if decompressor.eof and not torn else None
+
+
+def _salvage(decompressor, chunk: bytes) -> bytes:
+    """What decompressor yields from chunk before the first byte it can't decode.
+
+    Fed a byte at a time so nothing flushed before the tear is lost with the bad read.
+    """
+    data = []
+    for offset in range(len(chunk)):
+        try:
+            data.append(decompressor.decompress(chunk[offset:offset + 1]))
+        except zlib.error:
+            break
+    return b"".join(data)
+
+
+def _next_member(recording: BinaryIO, offset: int) -> Optional[int]:
+    """Offset of the first gzip member header at or after offset, or None."""
+    recording.seek(offset)
+    carry = b""
+    while True:
+        chunk = recording.read(READ_BYTES)
+        if not chunk:
+            return None
+        data = carry + chunk
+        found = data.find(GZIP_MAGIC)
+        if found != -1:
+            return offset + found
+        carry = data[-(len(GZIP_MAGIC) - 1):]
+        offset += len(data) - len(carry)
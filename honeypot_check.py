@@ -0,0 +1,227 @@
+"""Pre-buy sell simulation.
+
+A honeypot lets buyers in but makes their sells fail (or taxes them away),
+which nothing in the mint account or the metadata reveals. SellSimulator
+tests the sell path directly: it picks an existing holder of the mint, has
+Jupiter build a sell of part of that holder's balance, and runs it through
+simulateTransaction with signature verification off, so no key is needed
+and nothing is sent. A sell that fails, or pays out far less SOL than
+Jupiter quoted, marks the token as a honeypot. Each step is timed so the
+check can be held to the snipe's latency budget.
+
+Tokens nobody outside the pool holds yet can't be simulated; they pass
+unless require_simulation is set.
+"""
+import base64
+import logging
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import aiohttp
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from event_types import PoolEvent
+from http_sessions import JUPITER, RPC, get_session
+from stream_metrics import LatencyHistogram
+from token_risk import pool_token_accounts, rpc_batch
+
+LOGGER = logging.getLogger(__name__)
+
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+
+# Sells losing more than this share of the quote to transfer taxes count as honeypots
+MAX_SELL_TAX = 0.25
+# Share of the holder's balance to sell; small enough to keep price impact out of the tax figure
+SELL_FRACTION = 0.01
+SIMULATION_SLIPPAGE_BPS = 5000
+# Largest holders considered when looking for one that can sign a sell
+HOLDER_CANDIDATES = 5
+SIGNATURE_FEE_LAMPORTS = 5000
+# Rent-exempt minimum of a token account; the sell opens a temporary WSOL account
+TOKEN_ACCOUNT_RENT_LAMPORTS = 2_039_280
+MIN_SELLER_LAMPORTS = TOKEN_ACCOUNT_RENT_LAMPORTS + SIGNATURE_FEE_LAMPORTS
+# Simulation errors about the chosen seller rather than the token, as a bare
+# string or as the key of an error object ({"InsufficientFundsForRent": {...}})
+SELLER_ERRORS = ("AccountNotFound", "InsufficientFundsForFee", "InsufficientFundsForRent")
+LOG_LINES_KEPT = 5
+
+
+def is_seller_error(error: Any) -> bool:
+    """True for simulation errors caused by the seller's wallet rather than the token."""
+    if isinstance(error, dict):
+        return any(name in error for name in SELLER_ERRORS)
+    return error in SELLER_ERRORS
+
+
+class SellSimulation(NamedTuple):
+    mint: str
+    simulated: bool  # False when no usable seller was found; error says why
+    seller: Optional[str]
+    amount: Optional[int]  # raw token amount sold
+    expected_lamports: Optional[int]  # Jupiter's quote for the sell
+    received_lamports: Optional[int]  # what the seller's SOL balance gained, fees added back
+    tax: Optional[float]  # share of the quote that didn't arrive
+    error: Optional[str]
+    logs: Tuple[str, ...]  # last program log lines of a failed sell
+    simulate_ms: Optional[float]
+    elapsed_ms: float
+
+
+class SellSimulator:
+    """Simulates selling a mint from an existing holder's wallet before the bot buys it."""
+
+    def __init__(self, rpc_url: str, quote_url: str, swap_url: str,
+                 session: Optional[aiohttp.ClientSession] = None, max_tax: float = MAX_SELL_TAX,
+                 sell_fraction: float = SELL_FRACTION, require_simulation: bool = False,
+                 commitment: str = "processed"):
+        self.rpc_url = rpc_url
+        self.quote_url = quote_url
+        self.swap_url = swap_url
+        self.session = session
+        self.max_tax = max_tax
+        self.sell_fraction = sell_fraction
+        self.require_simulation = require_simulation
+        self.commitment = commitment
+        self.simulated = 0
+        self.unsimulated = 0
+        self.honeypots = 0
+        self.failures = 0
+        self.simulate_latency = LatencyHistogram()
+        self.total_latency = LatencyHistogram()
+
+    async def _rpc(self, method: str, params: list) -> Any:
+        reply = (await rpc_batch(self.session or get_session(RPC), self.rpc_url, [(method, params)]))[0]
+        if "error" in reply:
+            raise Exception(f"RPC Error: {reply['error']}")
+        return reply["result"]
+
+    async def _find_seller(self, mint: str, pool: Optional[PoolEvent]) -> Optional[Tuple[str, int]]:
+        """(owner, raw balance) of the largest holder outside the pool that can pay the sell's rent and fee."""
+        excluded = pool_token_accounts(mint, pool)
+        largest = await self._rpc("getTokenLargestAccounts", [mint, {"commitment": self.commitment}])
+        candidates = [holder["address"] for holder in largest["value"]
+                      if holder["address"] not in excluded and int(holder["amount"])][:HOLDER_CANDIDATES]
+        if not candidates:
+            return None
+        accounts = await self._rpc("getMultipleAccounts",
+                                   [candidates, {"encoding": "jsonParsed", "commitment": self.commitment}])
+        holders = []
+        for account in accounts["value"]:
+            try:
+                info = account["data"]["parsed"]["info"]
+            except (TypeError, KeyError):
+                continue
+            # Frozen accounts can't sell whatever the token does; PDAs (pool authorities, lockers) can't sign
+            if info.get("state") == "frozen" or not Pubkey.from_string(info["owner"]).is_on_curve():
+                continue
+            holders.append((info["owner"], int(info["tokenAmount"]["amount"])))
+        if not holders:
+            return None
+
+        owners = list(dict.fromkeys(owner for owner, _ in holders))
+        wallets = await self._rpc("getMultipleAccounts", [owners, {
+            "encoding": "base64", "dataSlice": {"offset": 0, "length": 0}, "commitment": self.commitment}])
+        lamports = {owner: wallet["lamports"] for owner, wallet in zip(owners, wallets["value"]) if wallet}
+        for owner, balance in holders:
+            if lamports.get(owner, 0) >= MIN_SELLER_LAMPORTS:
+                return owner, balance
+        return None
+
+    async def _build_sell(self, mint: str, seller: str, amount: int) -> Tuple[str, int]:
+        """Jupiter quote and transaction for selling amount of mint from seller; (base64 tx, quoted lamports)."""
+        session = self.session or get_session(JUPITER)
+        params = {"inputMint": mint, "outputMint": WSOL_MINT, "amount": amount,
+                  "slippageBps": SIMULATION_SLIPPAGE_BPS}
+        async with session.get(self.quote_url, params=params) as response:
+            quote = await response.json()
+        if "outAmount" not in quote:
+            raise Exception(f"No sell route for {mint}: {quote.get('error', quote)}")
+        async with session.post(self.swap_url, json={
+            "quoteResponse": quote,
+            "userPublicKey": seller,
+            "wrapAndUnwrapSol": True,
+            "prioritizationFeeLamports": 0,  # keeps the balance change down to the swap and the base fee
+        }) as response:
+            swap = await response.json()
+        if "swapTransaction" not in swap:
+            raise Exception(f"No sell transaction for {mint}: {swap.get('error', swap)}")
+        return swap["swapTransaction"], int(quote["outAmount"])
+
+    async def simulate(self, mint: str, pool: Optional[PoolEvent] = None) -> SellSimulation:
+        """Simulate a sell of mint; raises when the RPC or Jupiter can't be asked."""
+        started = time.monotonic()
+
+        def elapsed() -> float:
+            return round((time.monotonic() - started) * 1000, 3)
+
+        try:
+            seller = await self._find_seller(mint, pool)
+            if seller is None:
+                self.unsimulated += 1
+                return SellSimulation(mint, False, None, None, None, None, None,
+                                      "no holder outside the pool that can sign and pay for a sell", (), None, elapsed())
+            owner, balance = seller
+            amount = max(1, int(balance * self.sell_fraction))
+            transaction, expected = await self._build_sell(mint, owner, amount)
+
+            simulate_started = time.monotonic()
+            replies = await rpc_batch(self.session or get_session(RPC), self.rpc_url, [
+                ("getBalance", [owner, {"commitment": self.commitment}]),
+                ("simulateTransaction", [transaction, {
+                    "encoding": "base64",
+                    "sigVerify": False,
+                    "replaceRecentBlockhash": True,
+                    "commitment": self.commitment,
+                    "accounts": {"encoding": "base64", "addresses": [owner]},
+                }]),
+            ])
+            simulate_ms = round((time.monotonic() - simulate_started) * 1000, 3)
+            for reply in replies:
+                if "error" in reply:
+                    raise Exception(f"RPC Error: {reply['error']}")
+        except Exception:
+            self.failures += 1
+            raise
+
+        result = replies[1]["result"]["value"]
+        error = result.get("err")
+        if is_seller_error(error):
+            self.unsimulated += 1
+            return SellSimulation(mint, False, owner, amount, expected, None, None,
+                                  f"seller {owner} unusable: {error}", (), simulate_ms, elapsed())
+
+        received = tax = None
+        account = (result.get("accounts") or [None])[0]
+        if error is None and account is not None:
+            signatures = VersionedTransaction.from_bytes(base64.b64decode(transaction)).message.header.num_required_signatures
+            received = account["lamports"] - replies[0]["result"]["value"] + signatures * SIGNATURE_FEE_LAMPORTS
+            tax = round(max(0.0, 1 - received / expected), 4) if expected else None
+        simulation = SellSimulation(
+            mint, True, owner, amount, expected, received, tax,
+            str(error) if error is not None else None,
+            tuple((result.get("logs") or [])[-LOG_LINES_KEPT:]) if error is not None else (),
+            simulate_ms, elapsed(),
+        )
+        self.simulated += 1
+        self.honeypots += self.is_honeypot(simulation)
+        self.simulate_latency.observe(simulate_ms)
+        self.total_latency.observe(simulation.elapsed_ms)
+        return simulation
+
+    def is_honeypot(self, simulation: SellSimulation) -> bool:
+        if not simulation.simulated:
+            return self.require_simulation
+        return simulation.error is not None or (simulation.tax is not None and simulation.tax > self.max_tax)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "simulated": self.simulated,
+            "unsimulated": self.unsimulated,
+            "honeypots": self.honeypots,
+            "failures": self.failures,
+            "max_tax": self.max_tax,
+            # simulateTransaction round trip alone, and the whole check (holder lookup, Jupiter, simulation)
+            "simulate_latency": self.simulate_latency.as_dict(),
+            "total_latency": self.total_latency.as_dict(),
+        }
@@ -0,0 +1,164 @@
+"""Process-wide pooled HTTP sessions.
+
+Hot-path requests (Jupiter swaps, RPC calls, Solscan metadata, price APIs)
+share one aiohttp ClientSession per service instead of opening a session per
+call, so they go out over kept-alive connections with cached DNS answers
+rather than paying DNS + TCP + TLS setup every time. prewarm() opens those
+connections at startup and close_sessions() shuts them down.
+
+aiohttp sessions belong to the event loop that created them, and the bot
+runs coroutines on several loops (the pool stream's thread, the loops of
+synchronous wrappers), so each loop gets its own set of sessions.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+from yarl import URL
+
+LOGGER = logging.getLogger(__name__)
+
+# Services with a connection pool of their own
+RPC = "rpc"
+JUPITER = "jupiter"
+SOLSCAN = "solscan"
+PRICES = "prices"
+
+CONNECTIONS_PER_HOST = 16
+DNS_CACHE_SECONDS = 300
+KEEPALIVE_SECONDS = 60  # idle connections are kept open this long
+PREWARM_TIMEOUT_SECONDS = 5.0
+
+
+class SessionManager:
+    """One keep-alive ClientSession per (event loop, service), created on first use."""
+
+    def __init__(self, connections_per_host: int = CONNECTIONS_PER_HOST,
+                 dns_cache_seconds: int = DNS_CACHE_SECONDS, keepalive_seconds: float = KEEPALIVE_SECONDS):
+        self.connections_per_host = connections_per_host
+        self.dns_cache_seconds = dns_cache_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self._lock = threading.Lock()
+        self._sessions: Dict[asyncio.AbstractEventLoop, Dict[str, aiohttp.ClientSession]] = {}
+        self.counters = {
+            "sessions_created": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+        }
+
+    def _count(self, name: str):
+        async def handler(session, context, params):
+            with self._lock:
+                self.counters[name] += 1
+        return handler
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._count("connections_opened"))
+        trace.on_connection_reuseconn.append(self._count("connections_reused"))
+        trace.on_dns_cache_hit.append(self._count("dns_cache_hits"))
+        trace.on_dns_cache_miss.append(self._count("dns_cache_misses"))
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.connections_per_host,
+            ttl_dns_cache=self.dns_cache_seconds,
+            keepalive_timeout=self.keepalive_seconds,
+        )
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+
+    def get(self, service: str = RPC) -> aiohttp.ClientSession:
+        """Return the running loop's session for service. Callers must not close it."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sessions = self._sessions.get(loop)
+            if sessions is None:
+                # Loops that closed without close_sessions() can't close their sessions any more; forget them
+                for stale in [other for other in self._sessions if other.is_closed()]:
+                    leaked = [name for name, session in self._sessions.pop(stale).items() if not session.closed]
+                    if leaked:
+                        LOGGER.warning(f"⚠️ Event loop closed without close_sessions(); "
+                                       f"abandoning its open {', '.join(leaked)} session(s)")
+                sessions = self._sessions[loop] = {}
+            session = sessions.get(service)
+            if session is None or session.closed:
+                session = sessions[service] = self._new_session()
+                self.counters["sessions_created"] += 1
+            return session
+
+    async def prewarm(self, targets: Iterable[Tuple[str, str]],
+                      timeout: float = PREWARM_TIMEOUT_SECONDS) -> Dict[str, Optional[float]]:
+        """Open a connection for each (service, url) on the running loop.
+
+        Returns the seconds each took, keyed by host (None where it failed).
+        """
+        async def warm(service: str, url: str) -> Optional[float]:
+            started = time.monotonic()
+            try:
+                async with self.get(service).head(url, allow_redirects=False,
+                                                  timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    await response.read()
+                return round(time.monotonic() - started, 3)
+            except Exception as e:
+                LOGGER.warning(f"⚠️ Could not prewarm {service} connection to {URL(url).host}: {str(e)}")
+                return None
+
+        targets = list(targets)
+        results = await asyncio.gather(*(warm(service, url) for service, url in targets))
+        return {URL(url).host: seconds for (_, url), seconds in zip(targets, results)}
+
+    async def close(self):
+        """Close the running loop's sessions."""
+        with self._lock:
+            sessions = self._sessions.pop(asyncio.get_running_loop(), {})
+        for session in sessions.values():
+            await session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            open_sessions = sum(not session.closed for sessions in self._sessions.values()
+                                for session in sessions.values())
+            loops = len(self._sessions)
+        requests = counters["connections_opened"] + counters["connections_reused"]
+        return {
+            **counters,
+            "open_sessions": open_sessions,
+            "event_loops": loops,
+            "connection_reuse_rate": round(counters["connections_reused"] / requests, 4) if requests else 0.0,
+        }
+
+
+_session_manager = None
+_session_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> SessionManager:
+    """Return the process-wide SessionManager, creating it on first use."""
+    global _session_manager
+    with _session_manager_lock:
+        if _session_manager is None:
+            _session_manager = SessionManager()
+        return _session_manager
+
+
+def get_session(service: str = RPC) -> aiohttp.ClientSession:
+    """Shared keep-alive session for service on the running loop."""
+    return get_session_manager().get(service)
+
+
+async def prewarm(targets: Iterable[Tuple[str, str]]) -> Dict[str, Optional[float]]:
+    """Open connections for (service, url) pairs ahead of the first real request."""
+    return await get_session_manager().prewarm(targets)
+
+
+async def close_sessions():
+    """Close the shared sessions of the running loop (call before the loop stops)."""
+    await get_session_manager().close()
+
+
+def get_http_stats() -> Dict[str, Any]:
+    return get_session_manager().get_stats()
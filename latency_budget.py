@@ -0,0 +1,110 @@
+"""Latency budgets for pool opportunities.
+
+Each detected pool carries a LatencyBudget that starts at frame arrival.
+Every stage on the way to sendTransaction (detect, enrich, queue, filter,
+quote, sign, send) calls check(), which books the time spent since the
+previous stage and raises BudgetExceeded once the budget is gone, so a
+buy is never fired for a launch that is already too old. Finished budgets
+feed the process-wide per-stage report from get_budget_stats().
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from stream_metrics import LatencyHistogram
+
+DEFAULT_BUDGET_SECONDS = 2.0
+
+
+class BudgetExceeded(Exception):
+    """Raised by LatencyBudget.check() when a stage ends past the deadline."""
+
+    def __init__(self, stage: str, elapsed: float, budget: float):
+        super().__init__(f"latency budget of {budget * 1000:.0f}ms exceeded at {stage} ({elapsed * 1000:.0f}ms)")
+        self.stage = stage
+        self.elapsed = elapsed
+
+
+class LatencyBudget:
+    """Time left for one opportunity, with the time booked to each stage so far."""
+
+    def __init__(self, started_at: Optional[float] = None, budget: float = DEFAULT_BUDGET_SECONDS):
+        self.started_at = started_at if started_at is not None else time.monotonic()
+        self.budget = budget
+        self.stages: Dict[str, float] = {}  # stage -> seconds
+        self._last = self.started_at
+        self.outcome = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def remaining(self) -> float:
+        return self.budget - self.elapsed
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining <= 0
+
+    def mark(self, stage: str) -> float:
+        """Book the time since the previous stage to `stage` and return it."""
+        now = time.monotonic()
+        spent = now - self._last
+        self.stages[stage] = self.stages.get(stage, 0.0) + spent
+        self._last = now
+        return spent
+
+    def check(self, stage: str):
+        """mark(stage), then abort with BudgetExceeded if the deadline has passed."""
+        self.mark(stage)
+        if self.expired:
+            self.finish(f"aborted:{stage}")
+            raise BudgetExceeded(stage, self.elapsed, self.budget)
+
+    def finish(self, outcome: str):
+        """Record the budget's stage times and outcome in the process-wide stats (once)."""
+        if self.outcome is None:
+            self.outcome = outcome
+            BUDGET_STATS.record(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": round(self.budget * 1000, 1),
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()},
+            "outcome": self.outcome,
+        }
+
+    def __repr__(self) -> str:
+        return f"LatencyBudget({self.elapsed * 1000:.0f}/{self.budget * 1000:.0f}ms)"
+
+
+class BudgetStats:
+    """Per-stage time consumption and outcomes across finished budgets."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_latency: Dict[str, LatencyHistogram] = {}
+        self.outcomes: Dict[str, int] = {}
+
+    def record(self, budget: LatencyBudget):
+        with self._lock:
+            for stage, seconds in budget.stages.items():
+                self.stage_latency.setdefault(stage, LatencyHistogram()).observe(seconds * 1000)
+            self.outcomes[budget.outcome] = self.outcomes.get(budget.outcome, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "outcomes": dict(self.outcomes),
+                "stages": {stage: histogram.as_dict() for stage, histogram in self.stage_latency.items()},
+            }
+
+
+BUDGET_STATS = BudgetStats()
+
+
+def get_budget_stats() -> Dict[str, Any]:
+    """Return outcome counts and per-stage latency histograms for finished budgets."""
+    return BUDGET_STATS.as_dict()
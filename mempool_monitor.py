@@ -3,22 +3,38 @@ import asyncio
 import json
 import logging
 import os
+import random
 import time
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 import aiohttp
 import base64
 from solana.rpc.core import RPCException
 from tenacity import retry, stop_after_attempt, wait_exponential
 from config_manager import load_decrypted_config
+from blockhash_cache import BlockhashPrefetcher, set_shared_prefetcher
+from commitment_tracker import CommitmentTracker
+from event_types import PoolEvent
+from latency_budget import DEFAULT_BUDGET_SECONDS, LatencyBudget
+from frame_filter import MATCH, DROP, FramePrefilter, json_loads
+from frame_queue import FrameQueue
+from frame_recorder import FrameRecorder, read_frames
+from http_sessions import RPC, close_sessions, get_http_stats, get_session
+from stream_metrics import LatencyHistogram, ProviderRace, StreamMetrics
+from dex_registry import PLUGINS, decode_account, get_dex, load_plugins, program_names
+from pool_decoders import subscription_filters
+from pool_enrichment import PoolEnricher
 from telegram_notifications import send_telegram_message
 
 # Initialize logger first
 logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
 
-def get_helius_api_key():
+# Load configuration once
+CONFIG = load_decrypted_config()
+
+def get_helius_api_key(config: Optional[Dict[str, Any]] = None):
     """Extract Helius API key from the RPC URL."""
-    config = load_decrypted_config()
+    config = config or CONFIG
     rpc_url = config.get('api_keys', {}).get('solana_rpc_url', '')
     
     # Extract API key from URL
@@ -29,35 +45,87 @@ def get_helius_api_key():
         return api_key
     return None
 
-def get_helius_rpc_url():
+def get_helius_rpc_url(config: Optional[Dict[str, Any]] = None):
     """Get the Helius RPC URL from config."""
-    config = load_decrypted_config()
+    config = config or CONFIG
     return config.get('api_keys', {}).get('solana_rpc_url', '')
 
 # Get configuration
 HELIUS_API_KEY = get_helius_api_key()
 HELIUS_RPC_URL = get_helius_rpc_url()
 
-# Log the RPC URL being used
-LOGGER.info(f"Using Helius RPC endpoint: {HELIUS_RPC_URL}")
-
-# Log the API key for debugging (only first few characters)
-if HELIUS_API_KEY:
-    LOGGER.info(f"Found Helius API key: {HELIUS_API_KEY[:5]}...{HELIUS_API_KEY[-4:]}")
-else:
-    LOGGER.warning("No Helius API key found in RPC URL")
-
 # Helius WebSocket URL
 HELIUS_WS_URL = f"wss://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
 
-# DEX programs to monitor
-DEX_PROGRAMS = {
-    "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8": "Raydium LP V4",
-    "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc": "Orca",
-    "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBymtzvT": "Meteora"
-}
+# Optional tuning for the websocket stream
+MEMPOOL_SETTINGS = CONFIG.get('mempool_settings', {})
+
+# "base64" decodes pool accounts with the fixed-offset decoders in
+# pool_decoders.py; "jsonParsed" keeps the legacy parsed-dict path.
+ACCOUNT_ENCODING = MEMPOOL_SETTINGS.get('account_encoding', 'base64')
+
+# Reader -> worker pipeline: frames waiting for processing, number of
+# worker tasks, and what to do when the queue is full ("drop-oldest",
+# "drop-non-candidate" or "block")
+FRAME_QUEUE_SIZE = MEMPOOL_SETTINGS.get('frame_queue_size', 1000)
+FRAME_WORKERS = MEMPOOL_SETTINGS.get('frame_workers', 4)
+FRAME_OVERFLOW_POLICY = MEMPOOL_SETTINGS.get('frame_overflow_policy', 'drop-non-candidate')
+
+# Append every raw frame to this gzip file when set (see frame_recorder.py)
+RECORD_PATH = MEMPOOL_SETTINGS.get('record_path')
+
+# Bounds of the pool-event de-duplication index
+DEDUP_MAX_KEYS = MEMPOOL_SETTINGS.get('dedup_max_keys', 20000)
+DEDUP_TTL_SECONDS = MEMPOOL_SETTINGS.get('dedup_ttl_seconds', 600)
+
+# Detected pools are enriched (reserves, decimals, liquidity in SOL) in
+# batches collected over this window; 0 sends one request per pool
+ENRICH_WINDOW_SECONDS = MEMPOOL_SETTINGS.get('enrich_window_seconds', 0.02)
+
+# Spread each provider's programSubscribes over several sockets so one busy
+# program can't hold the others up behind it: "none", "per-program", or
+# "weighted" (ws_shards sockets, programs packed by program_weights)
+WS_SHARDING = MEMPOOL_SETTINGS.get('ws_sharding', 'none')
+WS_SHARDS = MEMPOOL_SETTINGS.get('ws_shards', 2)
+PROGRAM_WEIGHTS = MEMPOOL_SETTINGS.get('program_weights', {})
+
+# Websocket providers raced against each other, as {name: url}
+WS_ENDPOINTS = MEMPOOL_SETTINGS.get('ws_endpoints') or {"helius": HELIUS_WS_URL}
+
+# Modules that register extra DEXes with dex_registry when imported
+load_plugins(MEMPOOL_SETTINGS.get('dex_plugins', []))
+
+# DEX programs to monitor: everything registered in dex_registry
+DEX_PROGRAMS = program_names()
 
-LOGGER.info(f"Monitoring {len(DEX_PROGRAMS)} DEX programs: {list(DEX_PROGRAMS.keys())}")
+# Server-side programSubscribe filters: only fresh pool-state accounts are
+# sent at all. Each inner list is one subscription (filters within it are
+# ANDed); an empty outer list subscribes to every account of the program.
+# mempool_settings.program_filters overrides these per program id.
+PROGRAM_FILTERS = {program_id: subscription_filters(dex.prefilter)
+                   for program_id, dex in PLUGINS.items() if dex.prefilter is not None}
+PROGRAM_FILTERS.update(MEMPOOL_SETTINGS.get('program_filters', {}))
+SERVER_FILTERS = MEMPOOL_SETTINGS.get('server_filters', True)
+
+# Negotiate permessage-deflate on the websocket
+WS_COMPRESS = MEMPOOL_SETTINGS.get('ws_compress', False)
+
+# "processed" emits pools a few hundred ms earlier, tagged tentative; each
+# carries a TentativeStatus that later confirms or retracts it
+DETECTION_COMMITMENT = MEMPOOL_SETTINGS.get('commitment', 'confirmed')
+# How long to keep retrying pump.fun mint lookups, which need the create
+# transaction to reach confirmed, when detecting at processed; never past
+# the point where less than RESOLVE_BUDGET_HEADROOM_SECONDS of the pool's
+# latency budget would be left for the buy
+PROCESSED_RESOLVE_SECONDS = 3.0
+RESOLVE_BUDGET_HEADROOM_SECONDS = 0.5
+
+# Run ingestion and decoding in a child process that hands candidates to
+# this one through shared memory (see detection_process)
+DETECTION_PROCESS = MEMPOOL_SETTINGS.get('detection_process', False)
+
+# Time from frame arrival within which a buy must be sent (see latency_budget)
+LATENCY_BUDGET_SECONDS = MEMPOOL_SETTINGS.get('latency_budget_seconds', DEFAULT_BUDGET_SECONDS)
 
 SOLANA_NATIVE_MINT = "So11111111111111111111111111111111111111112"
 USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
@@ -69,6 +137,14 @@ HONEYPOT_TOKENS = {
     # Add more as discovered
 }
 
+# Stream supervisor settings
+RECONNECT_BASE_DELAY = 0.5  # seconds
+RECONNECT_MAX_DELAY = 30.0  # seconds
+STABLE_CONNECTION_SECONDS = 30  # connection age after which backoff resets
+BACKFILL_PAGE_LIMIT = 1000  # getSignaturesForAddress page size (RPC maximum)
+BACKFILL_MAX_PAGES = 10  # per program, per gap
+BACKFILL_CONCURRENCY = 8  # parallel getTransaction requests
+
 # Token blacklist (e.g., known scams, honeypots)
 TOKEN_BLACKLIST = {
     'ANvDJgYvf8nHyMYbKBBkL34gR5p8nfcZVB5JFGyELrQE',  # Example blacklisted token
@@ -76,27 +152,295 @@ TOKEN_BLACKLIST = {
     # Add more blacklisted tokens here
 }
 
-class MempoolMonitor:
-    """WebSocket-based mempool monitor for Solana using Helius."""
+def plan_shards(programs: Dict[str, str], sharding: str = "none", shards: int = 1,
+                weights: Optional[Dict[str, float]] = None) -> List[Dict[str, str]]:
+    """Split {program_id: name} into the program sets for each socket.
     
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
-        """Initialize the mempool monitor."""
-        self.session = session
-        self.latest_blockhash = None
+    "weighted" greedily assigns the heaviest programs first to the lightest
+    shard; weights are keyed by program id or name and default to 1.
+    """
+    if sharding == "per-program":
+        return [{program_id: name} for program_id, name in programs.items()]
+    if sharding != "weighted" or shards <= 1:
+        return [dict(programs)]
+    
+    weights = weights or {}
+    def weight(program_id: str) -> float:
+        return weights.get(program_id, weights.get(programs[program_id], 1))
+    
+    plan = [({}, 0.0) for _ in range(min(shards, len(programs)))]
+    for program_id in sorted(programs, key=weight, reverse=True):
+        index = min(range(len(plan)), key=lambda i: plan[i][1])
+        assigned, load = plan[index]
+        assigned[program_id] = programs[program_id]
+        plan[index] = (assigned, load + weight(program_id))
+    return [assigned for assigned, _ in plan]
+
+class ProviderConnection:
+    """One supervised WebSocket connection to a single RPC provider.
+    
+    Owns its socket, prefilter and subscription ids, reconnects with
+    jittered backoff, and feeds raw frames into the monitor's shared queue.
+    With sharding, several connections to one provider each carry a subset
+    of the DEX programs.
+    """
+    
+    def __init__(self, monitor: "MempoolMonitor", name: str, url: str,
+                 programs: Optional[Dict[str, str]] = None):
+        self.monitor = monitor
+        self.name = name
+        self.url = url
+        self.programs = programs or dict(DEX_PROGRAMS)
+        # Reader receive -> worker done, per frame: shows head-of-line blocking per socket
+        self.latency = LatencyHistogram()
         self.websocket = None
         self.is_connected = False
+        self.metrics = StreamMetrics()
+        self.prefilter = FramePrefilter(monitor.encoding)
+        self._pending_subscriptions = {}
+        self.frames_received = 0
+        self.bytes_received = 0
+        self.events_won = 0
+    
+    async def connect_websocket(self):
+        """Connect to the provider and (re)subscribe to all DEX programs."""
+        try:
+            self.websocket = await self.monitor.session.ws_connect(
+                self.url,
+                heartbeat=30,
+                timeout=60,
+                compress=15 if self.monitor.compress else 0
+            )
+            self.is_connected = True
+            LOGGER.info(f"✅ Connected to {self.name} WebSocket")
+            
+            # Subscribe to all DEX programs
+            await self._subscribe_to_programs()
+            
+        except Exception as e:
+            self.is_connected = False
+            LOGGER.error(f"❌ Failed to connect to {self.name} WebSocket: {str(e)}")
+            raise
+    
+    def _plan_subscriptions(self) -> List[Tuple[int, str, Optional[list]]]:
+        """(request id, program id, filters) of each programSubscribe, in the order they are sent."""
+        plan = []
+        for program_id in self.programs:
+            for filters in self.monitor.program_filters.get(program_id) or [None]:
+                plan.append((len(plan) + 1, program_id, filters))
+        return plan
+    
+    def _expect_subscriptions(self, plan: List[Tuple[int, str, Optional[list]]]):
+        """Forget old subscription ids and wait for the confirmations of plan's requests."""
+        # Subscription ids are reassigned by the server on every connection
+        self.prefilter.reset()
+        self._pending_subscriptions = {request_id: program_id for request_id, program_id, _ in plan}
+    
+    async def _subscribe_to_programs(self):
+        """Subscribe to program accounts for all DEX programs."""
+        plan = self._plan_subscriptions()
+        self._expect_subscriptions(plan)
+        for program_id, program_name in self.programs.items():
+            requests = [(request_id, filters) for request_id, planned, filters in plan if planned == program_id]
+            for request_id, filters in requests:
+                options = {
+                    "encoding": self.monitor.encoding,
+                    "commitment": self.monitor.commitment
+                }
+                if filters:
+                    options["filters"] = filters
+                subscribe_msg = {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "method": "programSubscribe",
+                    "params": [program_id, options]
+                }
+                
+                await self.websocket.send_json(subscribe_msg)
+            LOGGER.info(f"📡 [{self.name}] Subscribed to {program_name} ({program_id}) "
+                        f"with {len(requests) if requests[0][1] is not None else 'no'} filter sets")
+    
+    async def run(self):
+        """Supervise the connection, reconnecting until the monitor stops."""
+        attempt = 0
+        while not self.monitor._stopping:
+            try:
+                # MempoolMonitor.start() may already have connected us
+                if not self.is_connected:
+                    await self.connect_websocket()
+                self.metrics.record_connected()
+                self.monitor._on_provider_connected(self)
+                await self._read_stream()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error(f"Error in {self.name} WebSocket monitoring: {str(e)}")
+            finally:
+                connected_at = self.metrics.connected_at
+                await self.close()
+                self.metrics.record_disconnected()
+                self.monitor._on_provider_disconnected(self)
+            
+            if self.monitor._stopping:
+                break
+            
+            if connected_at and time.time() - connected_at >= STABLE_CONNECTION_SECONDS:
+                attempt = 0
+            delay = self._reconnect_delay(attempt)
+            attempt += 1
+            LOGGER.warning(f"🔄 Reconnecting to {self.name} WebSocket in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _reconnect_delay(attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        ceiling = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * (2 ** attempt))
+        return random.uniform(RECONNECT_BASE_DELAY / 2, ceiling)
+    
+    async def _read_stream(self):
+        """Read frames until the socket closes or errors.
         
-        # Initialize Helius connection
-        LOGGER.info("Initializing mempool monitor...")
-        if self._test_helius_connection():
-            LOGGER.info("✅ Helius RPC connection test successful")
-        else:
-            LOGGER.error("❌ Failed to connect to Helius RPC")
+        The reader only prefilters and enqueues; parsing, decoding and the
+        callback run in the worker tasks so slow consumers never stall the socket.
+        """
+        async for msg in self.websocket:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                self.frames_received += 1
+                self.bytes_received += len(msg.data)
+                if self.monitor.recorder:
+                    self.monitor.recorder.write(self.name, msg.data)
+                candidate = self._screen(msg.data)
+                if candidate is None:
+                    continue
+                await self.monitor.frame_queue.put_frame(msg.data, candidate, self.name)
+                    
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                LOGGER.error(f'{self.name} WebSocket error: {self.websocket.exception()}')
+                break
+                
+            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING):
+                LOGGER.warning(f"{self.name} WebSocket connection closed")
+                break
+    
+    def _screen(self, frame: str) -> Optional[bool]:
+        """Prefilter a raw frame. None if it was dropped or handled here, else whether it MATCHed."""
+        # Cheap raw-text checks first; most account churn stops here
+        verdict = self.prefilter.classify(frame)
+        self.monitor._track_slot(self.prefilter.latest_slot)
+        if verdict == DROP:
+            return None
+        if '"method"' not in frame:
+            # RPC responses (subscription confirmations) are handled inline
+            self._handle_response(frame)
+            return None
+        return verdict == MATCH
+    
+    def _handle_response(self, frame: str):
+        """Record the subscription id assigned to each programSubscribe request."""
+        try:
+            data = json_loads(frame)
+        except ValueError:
+            LOGGER.error(f"Failed to decode message: {frame}")
+            return
+        if data.get("id") in self._pending_subscriptions and "result" in data:
+            program_id = self._pending_subscriptions.pop(data["id"])
+            self.prefilter.register(data["result"], program_id)
+        elif "error" in data:
+            LOGGER.error(f"{self.name} WebSocket RPC error: {data['error']}")
+    
+    async def close(self):
+        """Close the current socket, if any."""
+        if self.websocket and not self.websocket.closed:
+            await self.websocket.close()
+        self.is_connected = False
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = self.metrics.as_dict()
+        for key in ("backfill_runs", "backfilled_signatures", "backfilled_events"):
+            metrics.pop(key)
+        metrics["url"] = self.url.split("?")[0]  # keep API keys out of metrics
+        metrics["programs"] = list(self.programs.values())
+        metrics["frame_latency"] = self.latency.as_dict()
+        metrics.update(self.prefilter.get_stats())
+        return metrics
+    
+    def get_ingest(self, elapsed: float) -> Dict[str, Any]:
+        """Received volume over `elapsed` seconds (bytes are after websocket decompression)."""
+        elapsed = max(elapsed, 1e-9)
+        return {
+            "frames": self.frames_received,
+            "bytes": self.bytes_received,
+            "events": self.events_won,
+            "frames_per_sec": round(self.frames_received / elapsed, 1),
+            "bytes_per_sec": round(self.bytes_received / elapsed, 1),
+            "events_per_sec": round(self.events_won / elapsed, 3),
+        }
+
+class MempoolMonitor:
+    """WebSocket-based mempool monitor for Solana.
+    
+    Connects to every configured provider at once, merges their streams and
+    emits each pool-creation event on its first arrival.
+    """
+    
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None, encoding: str = ACCOUNT_ENCODING,
+                 workers: int = FRAME_WORKERS, queue_size: int = FRAME_QUEUE_SIZE,
+                 overflow_policy: str = FRAME_OVERFLOW_POLICY,
+                 ws_endpoints: Optional[Dict[str, str]] = None, record_path: Optional[str] = RECORD_PATH,
+                 sharding: str = WS_SHARDING, shards: int = WS_SHARDS,
+                 program_weights: Optional[Dict[str, float]] = None,
+                 server_filters: bool = SERVER_FILTERS, compress: bool = WS_COMPRESS,
+                 commitment: str = DETECTION_COMMITMENT, latency_budget: float = LATENCY_BUDGET_SECONDS):
+        """Initialize the mempool monitor."""
+        self.session = session
+        self.encoding = encoding
+        self.blockhash = BlockhashPrefetcher(HELIUS_RPC_URL, session)
+        # Overall stream health: "connected" while at least one provider is up
+        self.metrics = StreamMetrics()
+        self.last_seen_slot = None
+        self._stopping = False
+        self._callback = None
+        self._gap_start_slots = {}  # program id -> last slot seen before no socket covered it
+        self._backfill_tasks = set()
+        self._emit_tasks = set()
+        self._resolving = {}  # pool address -> task resolving its creation transaction
+        self.commitment = commitment
+        self.latency_budget = latency_budget
+        # Vaults of a processed pool don't exist yet at confirmed; read them at the detection level
+        self.enricher = PoolEnricher(HELIUS_RPC_URL, session, ENRICH_WINDOW_SECONDS, commitment)
+        self.confirmations = CommitmentTracker(HELIUS_RPC_URL, session)
+        self.frame_queue = FrameQueue(queue_size, overflow_policy)
+        self.worker_count = workers
+        self._workers = []
+        self._connection_tasks = []
+        self.startup_timings = {}
+        self.started_at = None
+        self.program_filters = PROGRAM_FILTERS if server_filters else {}
+        self.compress = compress
+        # De-duplicates pool events across providers, subscriptions and backfill
+        self.race = ProviderRace(DEDUP_MAX_KEYS, DEDUP_TTL_SECONDS)
+        self.record_path = record_path
+        self.recorder = None  # opened by start(), closed when monitoring ends
+        shard_plan = plan_shards(DEX_PROGRAMS, sharding, shards, program_weights or PROGRAM_WEIGHTS)
+        self.connections = [
+            ProviderConnection(self, name if len(shard_plan) == 1 else f"{name}#{index}", url, programs)
+            for name, url in (ws_endpoints or WS_ENDPOINTS).items()
+            for index, programs in enumerate(shard_plan)
+        ]
+        self._connections_by_name = {connection.name: connection for connection in self.connections}
+    
+    @property
+    def latest_blockhash(self) -> Optional[str]:
+        snapshot = self.blockhash.get()
+        return snapshot.blockhash if snapshot else None
+    
+    @property
+    def is_connected(self) -> bool:
+        return any(connection.is_connected for connection in self.connections)
     
-    def _test_helius_connection(self) -> bool:
+    async def _test_helius_connection(self) -> bool:
         """Test the Helius RPC connection."""
         try:
-            import requests
             headers = {"Content-Type": "application/json"}
             payload = {
                 "jsonrpc": "2.0",
@@ -104,8 +448,9 @@ class MempoolMonitor:
                 "method": "getHealth"
             }
             
-            response = requests.post(HELIUS_RPC_URL, headers=headers, json=payload, timeout=5)
-            result = response.json()
+            async with self.session.post(HELIUS_RPC_URL, headers=headers, json=payload,
+                                         timeout=aiohttp.ClientTimeout(total=5)) as response:
+                result = await response.json()
             
             if result.get("result") == "ok":
                 LOGGER.info("✅ Helius RPC connection test successful: %s", result.get("result"))
@@ -118,78 +463,422 @@ class MempoolMonitor:
             LOGGER.error("❌ Failed to test Helius connection: %s", str(e))
             return False
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    async def connect_websocket(self):
-        """Connect to Helius WebSocket with retry logic."""
+    async def start(self, callback) -> Dict[str, float]:
+        """Bring the monitor up without blocking the event loop.
+        
+        The RPC health check, every provider's connect + subscribe and the
+        first blockhash fetch run concurrently; the per-step timings are
+        logged and returned. Connection supervisors and workers keep running
+        in the background afterwards (see start_monitoring()).
+        """
+        started = self.started_at = time.monotonic()
+        if not self.session:
+            self.session = get_session(RPC)
+        
+        self._stopping = False
+        self._callback = callback
+        if self.record_path and not self.recorder:
+            self.recorder = FrameRecorder(self.record_path)
+        if HELIUS_API_KEY:
+            LOGGER.info(f"Using Helius RPC endpoint with API key {HELIUS_API_KEY[:5]}...{HELIUS_API_KEY[-4:]}")
+        else:
+            LOGGER.warning("No Helius API key found in RPC URL")
+        LOGGER.info(f"Monitoring {len(DEX_PROGRAMS)} DEX programs: {list(DEX_PROGRAMS.keys())}")
+        
+        timings = {}
+        
+        async def timed(step: str, coro):
+            step_started = time.monotonic()
+            try:
+                return await coro
+            finally:
+                timings[step] = round(time.monotonic() - step_started, 3)
+        
+        # Keep a fresh blockhash warm for the trade path on the same pooled session
+        self.blockhash.session = self.session
+        self.enricher.session = self.session
+        self.confirmations.session = self.session
+        results = await asyncio.gather(
+            timed("health_check", self._test_helius_connection()),
+            timed("blockhash", self.blockhash.refresh()),
+            *(timed(f"ws:{connection.name}", connection.connect_websocket()) for connection in self.connections),
+            return_exceptions=True
+        )
+        if isinstance(results[1], Exception):
+            LOGGER.warning(f"⚠️ Initial blockhash fetch failed: {str(results[1])}")
+        
+        self.blockhash.start()
+        set_shared_prefetcher(self.blockhash)
+        self._workers = [
+            asyncio.create_task(self._process_frames(callback)) for _ in range(self.worker_count)
+        ]
+        self._connection_tasks = [asyncio.create_task(connection.run()) for connection in self.connections]
+        
+        timings["total"] = round(time.monotonic() - started, 3)
+        self.startup_timings = timings
+        breakdown = ", ".join(f"{step} {seconds:.3f}s" for step, seconds in timings.items() if step != "total")
+        LOGGER.info(f"🚀 Mempool monitor started in {timings['total']:.3f}s ({breakdown})")
+        return timings
+    
+    async def start_monitoring(self, callback):
+        """Start the monitor and run every provider connection until stop() is called.
+        
+        Each connection reconnects on its own; when all of them were down,
+        the first reconnect backfills the slots missed in between.
+        """
+        await self.start(callback)
         try:
-            self.websocket = await self.session.ws_connect(
-                HELIUS_WS_URL,
-                heartbeat=30,
-                timeout=60
-            )
-            self.is_connected = True
-            LOGGER.info("✅ Connected to Helius WebSocket")
-            
-            # Subscribe to all DEX programs
-            await self._subscribe_to_programs()
-            
-        except Exception as e:
-            self.is_connected = False
-            LOGGER.error(f"❌ Failed to connect to WebSocket: {str(e)}")
-            raise
+            await asyncio.gather(*self._connection_tasks, return_exceptions=True)
+        finally:
+            await self.stop()
     
-    async def _subscribe_to_programs(self):
-        """Subscribe to program accounts for all DEX programs."""
-        for program_id, program_name in DEX_PROGRAMS.items():
-            subscribe_msg = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "programSubscribe",
-                "params": [
-                    program_id,
-                    {
-                        "encoding": "jsonParsed",
-                        "commitment": "confirmed"
-                    }
-                ]
-            }
-            
-            await self.websocket.send_json(subscribe_msg)
-            LOGGER.info(f"📡 Subscribed to {program_name} ({program_id})")
+    async def stop(self):
+        """Stop the monitor and release everything start() set up.
+        
+        Cancels the connection supervisors, frame workers and pending
+        backfill, emit and pool-resolution tasks, closes every socket, stops
+        the blockhash prefetcher and confirmation tracker and closes the
+        frame recorder. Safe to call more than once.
+        """
+        self._stopping = True
+        tasks = (self._connection_tasks + self._workers + list(self._backfill_tasks)
+                 + list(self._emit_tasks) + list(self._resolving.values()))
+        for task in tasks:
+            task.cancel()
+        for connection in self.connections:
+            await connection.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._connection_tasks, self._workers = [], []
+        await self.blockhash.stop()
+        await self.confirmations.stop()
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
     
-    async def start_monitoring(self, callback):
-        """Start monitoring the mempool via WebSocket."""
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return stream health, queue, per-provider and first-seen racing metrics."""
+        metrics = self.metrics.as_dict()
+        metrics["last_seen_slot"] = self.last_seen_slot
+        provider_metrics = {connection.name: connection.get_metrics() for connection in self.connections}
+        metrics["frames_seen"] = sum(m["frames_seen"] for m in provider_metrics.values())
+        metrics["frames_dropped"] = sum(m["frames_dropped"] for m in provider_metrics.values())
+        metrics.update(self.frame_queue.get_stats())
+        metrics["providers"] = provider_metrics
+        metrics["first_seen"] = self.race.as_dict()
+        metrics["blockhash"] = self.blockhash.get_stats()
+        metrics["enrichment"] = self.enricher.get_stats()
+        metrics["commitment"] = {"level": self.commitment, **self.confirmations.get_stats()}
+        metrics["http"] = get_http_stats()
+        metrics["startup_seconds"] = self.startup_timings
+        metrics["ingest"] = self.get_ingest_report()
+        return metrics
+    
+    def get_ingest_report(self) -> Dict[str, Any]:
+        """Bytes, frames and pool events per second since start(), per socket and in total."""
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        report = {connection.name: connection.get_ingest(elapsed) for connection in self.connections}
+        totals = {key: sum(connection[key] for connection in report.values()) for key in ("frames", "bytes", "events")}
+        report["total"] = {
+            **totals,
+            "frames_per_sec": round(totals["frames"] / elapsed, 1) if elapsed else 0.0,
+            "bytes_per_sec": round(totals["bytes"] / elapsed, 1) if elapsed else 0.0,
+            "events_per_sec": round(totals["events"] / elapsed, 3) if elapsed else 0.0,
+            "seconds": round(elapsed, 1),
+            "server_filters": bool(self.program_filters),
+            "compress": self.compress,
+        }
+        return report
+    
+    async def replay(self, path: str, callback, speed: Optional[float] = 1.0) -> Dict[str, Any]:
+        """Feed a recording made with record_path back through _process_transaction.
+        
+        speed 1.0 keeps the recorded pacing, N plays N times faster and
+        None (or 0) replays as fast as possible. Frames are processed one at
+        a time in recorded order so runs are deterministic. Each replay gets
+        its own first-seen race and, per recorded provider, a connection
+        whose prefilter screens the frames exactly as the live reader does.
+        """
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            self.session = get_session(RPC)
+        self.enricher.session = self.session
+        self.confirmations.session = self.session
+        
+        frames = events = 0
+        first_recorded_at = None
+        started = time.monotonic()
+        replayed = {}  # recorded provider -> (its replay connection, its subscription plan)
+        live_race, live_connections = self.race, self._connections_by_name
+        live_emits = set(self._emit_tasks)
+        self.race = ProviderRace(DEDUP_MAX_KEYS, DEDUP_TTL_SECONDS)
+        self._connections_by_name = {}
+        
+        async def counting_callback(pool_info):
+            nonlocal events
+            events += 1
+            await callback(pool_info)
         
         try:
-            await self.connect_websocket()
-            
-            async for msg in self.websocket:
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    try:
-                        data = json.loads(msg.data)
-                        if "params" in data:
-                            await self._process_transaction(data["params"], callback)
-                    except json.JSONDecodeError:
-                        LOGGER.error(f"Failed to decode message: {msg.data}")
-                        
-                elif msg.type == aiohttp.WSMsgType.ERROR:
-                    LOGGER.error(f'WebSocket error: {self.websocket.exception()}')
-                    
-                elif msg.type == aiohttp.WSMsgType.CLOSED:
-                    LOGGER.warning("WebSocket connection closed")
-                    break
-                    
-        except Exception as e:
-            LOGGER.error(f"Error in WebSocket monitoring: {str(e)}")
+            for recorded_at, provider, frame in read_frames(path):
+                if speed:
+                    if first_recorded_at is None:
+                        first_recorded_at = recorded_at
+                    delay = (recorded_at - first_recorded_at) / speed - (time.monotonic() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if provider not in replayed:
+                    live = live_connections.get(provider)
+                    connection = ProviderConnection(self, provider, "replay", live.programs if live else None)
+                    replayed[provider] = (connection, connection._plan_subscriptions())
+                    self._connections_by_name[provider] = connection
+                connection, plan = replayed[provider]
+                if not connection._pending_subscriptions and '"method"' not in frame and '"result"' in frame:
+                    # Confirmations after all were answered mean the recorded socket reconnected
+                    connection._expect_subscriptions(plan)
+                frames += 1
+                connection.frames_received += 1
+                connection.bytes_received += len(frame)
+                candidate = connection._screen(frame)
+                if candidate is None:
+                    continue
+                try:
+                    data = json_loads(frame)
+                except ValueError:
+                    continue
+                if "params" in data:
+                    await self._process_transaction(data["params"], counting_callback, provider, time.monotonic())
+            # pump.fun resolutions spawn their emits later, so drain until nothing new appears
+            while self._emit_tasks - live_emits:
+                await asyncio.gather(*(self._emit_tasks - live_emits))
+            first_seen = self.race.as_dict()
         finally:
-            if self.websocket and not self.websocket.closed:
-                await self.websocket.close()
-            self.is_connected = False
+            self.race, self._connections_by_name = live_race, live_connections
+        
+        elapsed = time.monotonic() - started
+        stats = {
+            "frames": frames,
+            "frames_dropped": sum(connection.prefilter.get_stats()["frames_dropped"]
+                                  for connection, _ in replayed.values()),
+            "events": events,
+            "events_won": {provider: connection.events_won for provider, (connection, _) in replayed.items()},
+            "first_seen": first_seen,
+            "elapsed_seconds": round(elapsed, 3),
+            "frames_per_second": round(frames / elapsed, 1) if elapsed else 0.0,
+        }
+        LOGGER.info(f"⏯️ Replayed {path}: {stats}")
+        return stats
+    
+    def _covered_programs(self) -> set:
+        return {program_id for connection in self.connections if connection.is_connected
+                for program_id in connection.programs}
+    
+    def _on_provider_connected(self, connection: ProviderConnection):
+        """Close downtime windows and backfill programs no socket was covering."""
+        if self.metrics.connected_at is None:
+            self.metrics.record_connected()
+        gaps = {}
+        for program_id in connection.programs:
+            gap_start_slot = self._gap_start_slots.pop(program_id, None)
+            if gap_start_slot is not None:
+                gaps.setdefault(gap_start_slot, []).append(program_id)
+        for gap_start_slot, program_ids in gaps.items():
+            self._start_backfill(gap_start_slot, self._callback, program_ids)
+    
+    def _on_provider_disconnected(self, connection: ProviderConnection):
+        """Open a gap for each program that is now uncovered by every socket."""
+        if self._stopping:
+            return
+        if not self.is_connected:
+            self.metrics.record_disconnected()
+        if self.last_seen_slot is None:
+            return
+        covered = self._covered_programs()
+        for program_id in connection.programs:
+            if program_id not in covered:
+                self._gap_start_slots.setdefault(program_id, self.last_seen_slot)
     
-    async def _process_transaction(self, params: Dict[str, Any], callback):
-        """Process a transaction from the WebSocket stream."""
+    async def _process_frames(self, callback):
+        """Worker: parse queued frames and run detection plus the callback."""
+        while True:
+            queued = await self.frame_queue.get_frame()
+            try:
+                data = json_loads(queued.frame)
+            except ValueError:
+                LOGGER.error(f"Failed to decode message: {queued.frame}")
+                continue
+            if "params" in data:
+                await self._process_transaction(data["params"], callback, queued.provider, queued.received_at)
+            connection = self._connections_by_name.get(queued.provider)
+            if connection:
+                connection.latency.observe((time.monotonic() - queued.received_at) * 1000)
+    
+    def _claim(self, keys: Tuple[Optional[str], ...], provider: str, received_at: Optional[float] = None) -> bool:
+        """Return True if this is the first arrival of an event identified by keys.
+        
+        keys are its signature and/or pool address; events with neither pass through.
+        """
+        first = not any(keys) or self.race.arrive(keys, provider, received_at)
+        connection = self._connections_by_name.get(provider)
+        if first and connection:
+            connection.events_won += 1
+        return first
+    
+    def _spawn_emit(self, pool_info: PoolEvent, callback, program_id: Optional[str] = None):
+        """Enrich and deliver a pool without holding up the frame worker.
+        
+        The pool's LatencyBudget starts at frame arrival. At processed commitment the pool is tagged tentative and gets a
+        "confirmation" TentativeStatus that resolves once the pool account
+        is (or is not) visible at confirmed.
+        """
+        pool_info.budget = LatencyBudget(pool_info.received_at, self.latency_budget)
+        pool_info.budget.mark("detect")
+        pool_info.commitment = self.commitment
+        if self.commitment == "processed":
+            pool_info.tentative = True
+            pool_info.confirmation = self.confirmations.track(pool_info, program_id)
+        task = asyncio.create_task(self._emit(pool_info, callback))
+        self._emit_tasks.add(task)
+        task.add_done_callback(self._emit_tasks.discard)
+    
+    async def _emit(self, pool_info: PoolEvent, callback):
+        """Attach reserves and liquidity (batched with other fresh pools), then run the callback."""
+        try:
+            await self.enricher.enrich(pool_info)
+            if pool_info.budget is not None:
+                pool_info.budget.mark("enrich")
+            await callback(pool_info)
+        except Exception as e:
+            LOGGER.error(f"Error delivering pool {pool_info.pool_address}: {str(e)}")
+    
+    def _track_slot(self, slot: Optional[int]):
+        """Remember the newest slot seen on the stream for gap backfill."""
+        if slot and (self.last_seen_slot is None or slot > self.last_seen_slot):
+            self.last_seen_slot = slot
+    
+    def _start_backfill(self, gap_start_slot: int, callback, program_ids: Optional[List[str]] = None):
+        """Backfill the disconnected window in the background."""
+        task = asyncio.create_task(self._backfill_missed_slots(gap_start_slot, callback, program_ids))
+        self._backfill_tasks.add(task)
+        task.add_done_callback(self._backfill_tasks.discard)
+    
+    async def _backfill_missed_slots(self, gap_start_slot: int, callback, program_ids: Optional[List[str]] = None):
+        """Replay pool creations that landed after gap_start_slot via RPC history."""
+        self.metrics.backfill_runs += 1
+        LOGGER.info(f"⏪ Backfilling DEX activity since slot {gap_start_slot}")
+        
+        signatures = []
+        for program_id in program_ids or DEX_PROGRAMS:
+            dex = get_dex(program_id)
+            if dex is None or dex.pool_init is None:
+                continue  # no way to recognise its pool creations
+            try:
+                for sig_info in await self._get_signatures_since(program_id, gap_start_slot):
+                    signatures.append((program_id, sig_info))
+            except Exception as e:
+                LOGGER.error(f"Backfill paging failed for {program_id}: {str(e)}")
+        
+        self.metrics.backfilled_signatures += len(signatures)
+        semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+        
+        async def replay(program_id: str, sig_info: Dict[str, Any]):
+            async with semaphore:
+                pool_info = await self._fetch_backfill_pool(program_id, sig_info)
+            if pool_info and self._claim((pool_info.signature, pool_info.pool_address), "backfill"):
+                self.metrics.backfilled_events += 1
+                LOGGER.info(f"🎯 Backfilled liquidity pool: {pool_info}")
+                await self._emit(pool_info, callback)
+        
+        results = await asyncio.gather(
+            *(replay(program_id, sig_info) for program_id, sig_info in signatures),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                LOGGER.error(f"Backfill replay failed: {str(result)}")
+        
+        LOGGER.info(f"⏪ Backfill complete: {len(signatures)} signatures scanned since slot {gap_start_slot}")
+    
+    async def _get_signatures_since(self, program_id: str, gap_start_slot: int) -> List[Dict[str, Any]]:
+        """Page getSignaturesForAddress backwards until reaching gap_start_slot."""
+        collected = []
+        before = None
+        for _ in range(BACKFILL_MAX_PAGES):
+            options = {"limit": BACKFILL_PAGE_LIMIT, "commitment": "confirmed"}
+            if before:
+                options["before"] = before
+            page = await self._rpc_request("getSignaturesForAddress", [program_id, options]) or []
+            for sig_info in page:
+                if sig_info.get("slot", 0) <= gap_start_slot:
+                    return collected
+                if sig_info.get("err") is None:
+                    collected.append(sig_info)
+            if len(page) < BACKFILL_PAGE_LIMIT:
+                return collected
+            before = page[-1]["signature"]
+        
+        LOGGER.warning(f"Backfill for {program_id} hit the {BACKFILL_MAX_PAGES}-page limit; older activity skipped")
+        return collected
+    
+    async def _fetch_backfill_pool(self, program_id: str, sig_info: Dict[str, Any]) -> Optional[PoolEvent]:
+        """Fetch a historical transaction and extract pool info if it created a pool."""
+        signature = sig_info["signature"]
+        transaction = await self._rpc_request("getTransaction", [
+            signature,
+            {
+                "encoding": "jsonParsed",
+                "commitment": "confirmed",
+                "maxSupportedTransactionVersion": 0
+            }
+        ])
+        if not transaction:
+            return None
+        return self._extract_pool_info_from_transaction(program_id, transaction, signature)
+    
+    def _extract_pool_info_from_transaction(self, program_id: str, transaction: Dict[str, Any],
+                                            signature: str) -> Optional[PoolEvent]:
+        """Extract pool info from a confirmed pool-initialisation transaction."""
+        dex = get_dex(program_id)
+        if dex is None or dex.pool_init is None:
+            return None
+        markers, pool_index, mint_a_index, mint_b_index = dex.pool_init
+        logs = transaction.get("meta", {}).get("logMessages") or []
+        if not any(marker in line for line in logs for marker in markers):
+            return None
+        
+        instructions = transaction.get("transaction", {}).get("message", {}).get("instructions", [])
+        for instruction in instructions:
+            accounts = instruction.get("accounts")
+            if instruction.get("programId") != program_id or not accounts:
+                continue
+            if len(accounts) <= max(pool_index, mint_a_index):
+                continue
+            return PoolEvent(
+                pool_address=accounts[pool_index],
+                token_a=accounts[mint_a_index],
+                token_b=accounts[mint_b_index] if mint_b_index is not None else SOLANA_NATIVE_MINT,
+                created_at=transaction.get("blockTime") or time.time(),
+                signature=signature,
+                slot=transaction.get("slot"),
+                dex=dex.name,
+                source="backfill"
+            )
+        return None
+    
+    async def _rpc_request(self, method: str, params: List[Any]) -> Any:
+        """Send a JSON-RPC request to Helius and return its result."""
+        headers = {"Content-Type": "application/json"}
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        async with self.session.post(HELIUS_RPC_URL, headers=headers, json=payload) as response:
+            result = await response.json()
+            if "error" in result:
+                raise Exception(f"RPC Error: {result['error']}")
+            return result.get("result")
+    
+    async def _process_transaction(self, params: Dict[str, Any], callback, provider: str = "",
+                                   received_at: Optional[float] = None):
+        """Process a transaction from the WebSocket stream.
+        
+        Only the first provider to deliver a given pool reaches the callback.
+        """
         try:
             result = params.get("result", {})
             value = result.get("value", {})
@@ -200,18 +889,155 @@ class MempoolMonitor:
             
             # Get account updates
             account_data = value.get("account", {})
-            parsed_data = account_data.get("data", {}).get("parsed", {})
+            data = account_data.get("data", {})
+            
+            # base64 payloads arrive as [data, "base64"]
+            if isinstance(data, list):
+                pool_info = await self._decode_binary_pool(
+                    value, result.get("context", {}).get("slot"), provider, received_at, callback
+                )
+                if pool_info:
+                    LOGGER.info(f"🎯 New liquidity pool detected: {pool_info}")
+                    self._spawn_emit(pool_info, callback, account_data.get("owner"))
+                return
+            
+            parsed_data = data.get("parsed", {})
             
             # Check if this is a liquidity pool creation
             if self._is_liquidity_pool_creation(parsed_data):
                 pool_info = self._extract_pool_info(parsed_data, signature)
-                if pool_info:
+                if pool_info and self._claim((pool_info.signature, pool_info.pool_address),
+                                             provider, received_at):
+                    pool_info.received_at = received_at
                     LOGGER.info(f"🎯 New liquidity pool detected: {pool_info}")
-                    await callback(pool_info)
+                    self._spawn_emit(pool_info, callback, account_data.get("owner"))
                     
         except Exception as e:
             LOGGER.error(f"Error processing transaction: {str(e)}")
     
+    async def _decode_binary_pool(self, value: Dict[str, Any], slot: Optional[int], provider: str = "",
+                                  received_at: Optional[float] = None, callback=None) -> Optional[PoolEvent]:
+        """Decode a base64 pool-state account into pool info.
+        
+        Returns None for non-candidates and for pools another provider already
+        delivered. pump.fun curves are also returned as None: their mint is
+        resolved in a task of its own, which emits the pool to callback.
+        """
+        account = value.get("account", {})
+        owner = account.get("owner")
+        decoded = decode_account(owner, account["data"][0])
+        if decoded is None:
+            return None
+        
+        pool_address = value.get("pubkey")
+        if decoded.base_mint is None:
+            # pump.fun curves don't store their mint; read it from the create transaction.
+            # The pool is only claimed once that worked, so a failed lookup doesn't shut
+            # out later deliveries; deliveries meanwhile share the one lookup.
+            if self.race.seen((pool_address,)):
+                self._claim((pool_address,), provider, received_at)  # records the duplicate
+            elif callback is not None:
+                self._spawn_resolution(decoded, value, slot, provider, received_at, callback)
+            return None
+        # First delivery wins; slower providers stop here
+        if not self._claim((pool_address,), provider, received_at):
+            return None
+        return self._pool_event(decoded, value, slot, received_at, decoded.base_mint)
+    
+    def _spawn_resolution(self, decoded, value: Dict[str, Any], slot: Optional[int], provider: str,
+                          received_at: Optional[float], callback):
+        """Resolve a pump.fun curve's mint without holding up the frame worker, then claim and emit it."""
+        task = asyncio.create_task(self._resolve_and_emit(decoded, value, slot, provider, received_at, callback))
+        self._emit_tasks.add(task)
+        task.add_done_callback(self._emit_tasks.discard)
+    
+    async def _resolve_and_emit(self, decoded, value: Dict[str, Any], slot: Optional[int], provider: str,
+                                received_at: Optional[float], callback):
+        pool_address = value.get("pubkey")
+        owner = value["account"]["owner"]
+        deadline = time.monotonic()
+        if self.commitment == "processed":
+            deadline += PROCESSED_RESOLVE_SECONDS
+            if received_at is not None:
+                deadline = min(deadline, received_at + self.latency_budget - RESOLVE_BUDGET_HEADROOM_SECONDS)
+        creation = await self._resolve_once(owner, pool_address, deadline)
+        if not creation or not self._claim((pool_address,), provider, received_at):
+            return
+        pool_info = self._pool_event(decoded, value, slot, received_at, creation.token_a, creation.signature)
+        LOGGER.info(f"🎯 New liquidity pool detected: {pool_info}")
+        self._spawn_emit(pool_info, callback, owner)
+    
+    def _pool_event(self, decoded, value: Dict[str, Any], slot: Optional[int], received_at: Optional[float],
+                    base_mint: str, signature: Optional[str] = None) -> PoolEvent:
+        owner = value["account"]["owner"]
+        return PoolEvent(
+            pool_address=value.get("pubkey"),
+            token_a=base_mint,
+            token_b=decoded.quote_mint,
+            created_at=time.time(),
+            signature=signature,
+            slot=slot,
+            dex=DEX_PROGRAMS.get(owner),
+            base_vault=decoded.base_vault,
+            quote_vault=decoded.quote_vault,
+            base_reserve=decoded.base_reserve,
+            quote_reserve=decoded.quote_reserve,
+            base_decimals=decoded.base_decimals,
+            quote_decimals=decoded.quote_decimals,
+            creator=decoded.creator,
+            received_at=received_at
+        )
+    
+    async def _get_oldest_signature(self, address: str) -> Optional[Dict[str, Any]]:
+        """Page getSignaturesForAddress backwards to the address's first signature."""
+        oldest = None
+        before = None
+        for _ in range(BACKFILL_MAX_PAGES):
+            options = {"limit": BACKFILL_PAGE_LIMIT, "commitment": "confirmed"}
+            if before:
+                options["before"] = before
+            page = await self._rpc_request("getSignaturesForAddress", [address, options]) or []
+            if page:
+                oldest = page[-1]
+            if len(page) < BACKFILL_PAGE_LIMIT:
+                return oldest
+            before = page[-1]["signature"]
+        
+        LOGGER.warning(f"{address} has over {BACKFILL_MAX_PAGES} pages of signatures; creation not found")
+        return None
+    
+    async def _resolve_once(self, program_id: str, pool_address: str,
+                            deadline: Optional[float] = None) -> Optional[PoolEvent]:
+        """_resolve_pool_creation, shared by every delivery of the pool that arrives while it runs."""
+        task = self._resolving.get(pool_address)
+        if task is None:
+            task = self._resolving[pool_address] = asyncio.ensure_future(
+                self._resolve_pool_creation(program_id, pool_address, deadline))
+            task.add_done_callback(lambda _: self._resolving.pop(pool_address, None))
+        return await asyncio.shield(task)
+    
+    async def _resolve_pool_creation(self, program_id: str, pool_address: str,
+                                     deadline: Optional[float] = None) -> Optional[PoolEvent]:
+        """Find and parse the transaction that created pool_address.
+        
+        getSignaturesForAddress has no processed level, so a pool detected at
+        processed is retried until its create confirms or deadline (monotonic) passes.
+        """
+        try:
+            deadline = deadline or time.monotonic()
+            while True:
+                oldest = await self._get_oldest_signature(pool_address)
+                if oldest or time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(self.confirmations.interval)
+            if not oldest:
+                return None
+            # The creation is the pool's first transaction
+            return await self._fetch_backfill_pool(program_id, oldest)
+        except Exception as e:
+            LOGGER.error(f"Failed to resolve creation of {pool_address}: {str(e)}")
+            return None
+    
     def _is_liquidity_pool_creation(self, parsed_data: Dict[str, Any]) -> bool:
         """Check if the transaction creates a new liquidity pool."""
         try:
@@ -232,7 +1058,7 @@ class MempoolMonitor:
             LOGGER.error(f"Error checking pool creation: {str(e)}")
             return False
     
-    def _extract_pool_info(self, parsed_data: Dict[str, Any], signature: str) -> Optional[Dict[str, Any]]:
+    def _extract_pool_info(self, parsed_data: Dict[str, Any], signature: str) -> Optional[PoolEvent]:
         """Extract pool information from parsed transaction data."""
         try:
             info = parsed_data.get("info", {})
@@ -247,19 +1073,19 @@ class MempoolMonitor:
             # Extract pool address if available
             pool_address = info.get("poolAddress", info.get("account", signature))
             
-            return {
-                "pool_address": pool_address,
-                "token_a": token_a,
-                "token_b": token_b,
-                "created_at": time.time(),
-                "signature": signature
-            }
+            return PoolEvent(
+                pool_address=pool_address,
+                token_a=token_a,
+                token_b=token_b,
+                created_at=time.time(),
+                signature=signature
+            )
             
         except Exception as e:
             LOGGER.error(f"Error extracting pool info: {str(e)}")
             return None
     
-    async def get_pool_info_http(self, pool_address: str) -> Optional[Dict[str, Any]]:
+    async def get_pool_info_http(self, pool_address: str) -> Optional[PoolEvent]:
         """Get pool information via HTTP RPC call."""
         try:
             headers = {"Content-Type": "application/json"}
@@ -296,55 +1122,53 @@ class MempoolMonitor:
     
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def _get_recent_blockhash(self):
-        """Get recent blockhash with retry."""
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getLatestBlockhash",
-            "params": [{"commitment": "finalized"}]
-        }
-        
-        async with self.session.post(HELIUS_RPC_URL, headers=headers, json=payload) as response:
-            result = await response.json()
-            if "error" in result:
-                raise Exception(f"RPC Error: {result['error']}")
-            
-            blockhash_info = result.get("result", {}).get("value", {})
-            return blockhash_info.get("blockhash")
+        """Get recent blockhash, from the prefetcher when it is fresh."""
+        snapshot = self.blockhash.get()
+        if snapshot is None:
+            self.blockhash.session = self.blockhash.session or self.session
+            snapshot = await self.blockhash.refresh()
+        return snapshot.blockhash
+
+async def measure_ingest(seconds: float = 60.0) -> Dict[str, Dict[str, Any]]:
+    """Compare ingest volume without and with server-side filters, `seconds` each."""
+    reports = {}
+    for label, server_filters in (("unfiltered", False), ("filtered", True)):
+        monitor = MempoolMonitor(server_filters=server_filters)
+        async def discard(pool_info):
+            pass
+        task = asyncio.create_task(monitor.start_monitoring(discard))
+        await asyncio.sleep(seconds)
+        reports[label] = monitor.get_ingest_report()["total"]
+        await monitor.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    await close_sessions()
+    
+    for label, report in reports.items():
+        LOGGER.info(f"📊 {label:<10} {report['bytes_per_sec'] / 1024:>10.1f} KiB/s "
+                    f"{report['frames_per_sec']:>10.1f} frames/s {report['events_per_sec']:>8.3f} events/s")
+    return reports
 
 # Legacy function for backward compatibility
 def get_new_liquidity_pools():
-    """Legacy function - now returns empty list as we use WebSocket monitoring."""
-    return []
+    """Return pools detected since the previous call from the shared pool stream."""
+    from pool_stream import drain_new_pools
+    return drain_new_pools()
 
 # Async function to check for new pools
-async def check_new_pools_async():
-    """Async function to check for new pools via WebSocket."""
-    monitor = MempoolMonitor()
-    pools = []
-    
-    async def pool_callback(pool_info):
-        pools.append(pool_info)
-    
-    # Run for a short time to collect any new pools
-    try:
-        await asyncio.wait_for(
-            monitor.start_monitoring(pool_callback),
-            timeout=5.0
-        )
-    except asyncio.TimeoutError:
-        pass
-    
-    return pools
+async def check_new_pools_async(timeout: float = 5.0):
+    """Return pools from the shared stream, waiting up to timeout for the first one."""
+    from pool_stream import drain_new_pools
+    return await asyncio.to_thread(drain_new_pools, timeout)
 
 # Synchronous wrapper for async function
-def check_new_pools():
+def check_new_pools(timeout: float = 5.0):
     """Check for new pools synchronously."""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(check_new_pools_async())
+    from pool_stream import drain_new_pools
+    return drain_new_pools(timeout)
+
+if __name__ == "__main__":
+    import sys
+    # python mempool_monitor.py ingest-report [seconds]
+    if sys.argv[1:2] == ["ingest-report"]:
+        asyncio.run(measure_ingest(float(sys.argv[2]) if len(sys.argv) > 2 else 60.0))
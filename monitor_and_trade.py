@@ -2,10 +2,18 @@ import time
 import asyncio
 import threading
 from trade_execution import buy_token_multi_wallet, sell_token_auto_withdraw
-from mempool_monitor import get_new_liquidity_pools
+from mempool_monitor import check_new_pools
 from telegram_notifications import safe_send_telegram_message
-from whale_tracking import get_whale_transactions
-from utils import get_token_price, should_buy_token, get_random_wallet
+from whale_tracking import get_whale_transactions_async
+from utils import get_token_price_async, should_buy_token, get_random_wallet
+from price_oracle import get_price_oracle
+from portfolio import get_position
+from candidate_queue import CANDIDATE_DEADLINE_SECONDS, CandidateQueue, CandidateScorer
+from config_manager import load_decrypted_config
+from latency_budget import BudgetExceeded, LatencyBudget
+from pool_decoders import SOLANA_NATIVE_MINT
+
+LAMPORTS_PER_SOL = 1_000_000_000
 
 def send_telegram_message(message):
     try:
@@ -14,63 +22,159 @@ def send_telegram_message(message):
     except RuntimeError:
         asyncio.run(safe_send_telegram_message(message))
 
-def sniper_loop():
+def start_trading_loop():
+    """Event loop on a background thread, for when the sniper runs without the bot's loop."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="trading-loop", daemon=True).start()
+    return loop
+
+def run_on_trading_loop(trading_loop, coro):
+    """Run a coroutine on the trading loop and wait for its result.
+
+    Trades go through the loop that owns the pooled, prewarmed HTTP sessions
+    rather than a fresh loop per call.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, trading_loop).result()
+
+def whale_flows(swaps, token_address):
+    """SOL the tracked whales recently spent on token_address and got back selling it."""
+    bought = sum(swap.amount_in or 0 for swap in swaps
+                 if swap.token_in == SOLANA_NATIVE_MINT and swap.token_out == token_address)
+    sold = sum(swap.amount_out or 0 for swap in swaps
+               if swap.token_in == token_address and swap.token_out == SOLANA_NATIVE_MINT)
+    return bought / LAMPORTS_PER_SOL, sold / LAMPORTS_PER_SOL
+
+async def alert_whale_activity(token_address):
+    """Whale alerts for a new token; runs on the trading loop beside the buy, never in its path."""
+    try:
+        swaps = await get_whale_transactions_async()
+    except Exception as e:
+        print(f"⚠️ Whale lookup for {token_address} failed: {e}")
+        return
+    whale_buys, whale_sells = whale_flows(swaps, token_address)
+
+    if whale_buys > 100:
+        send_telegram_message(f"🐋 WHALE ALERT! {whale_buys:.2f} SOL worth of {token_address} just bought!")
+
+    if whale_sells > 50:
+        send_telegram_message(f"⚠️ Warning! {whale_sells:.2f} SOL worth of {token_address} just sold!")
+
+def monitor_position(trading_loop, token_address, pool):
+    """Sell a bought token at +10% / -5%, or as soon as its pool is rolled back."""
+    confirmation = pool.get("confirmation")
+    # Price from the pool's own vaults; HTTP only while the feed is stale
+    price_oracle = get_price_oracle()
+    price_oracle.track(token_address, pool)
+    # The HTTP fallback measures from the USD price the buy recorded, not from its first use
+    position = get_position(token_address)
+    initial_price = position["price"] if position else None
+    if not initial_price:
+        initial_price = run_on_trading_loop(trading_loop, get_token_price_async(token_address))
+
+    while True:
+        if confirmation and confirmation.retracted:
+            run_on_trading_loop(trading_loop, sell_token_auto_withdraw(token_address))
+            price_oracle.untrack(token_address)
+            send_telegram_message(f"↩️ Exited {token_address}: pool creation was rolled back.")
+            return
+
+        profit = price_oracle.get_profit_pct(token_address)
+        if profit is None:
+            current_price = run_on_trading_loop(trading_loop, get_token_price_async(token_address))
+            if not current_price:
+                time.sleep(2)
+                continue
+            initial_price = initial_price or current_price
+            profit = (current_price - initial_price) / initial_price * 100
+
+        if profit >= 10:
+            run_on_trading_loop(trading_loop, sell_token_auto_withdraw(token_address))
+            price_oracle.untrack(token_address)
+            send_telegram_message(f"✅ Sold {token_address} for {profit:.2f}% profit! Profits withdrawn.")
+            return
+        elif profit <= -5:
+            run_on_trading_loop(trading_loop, sell_token_auto_withdraw(token_address))
+            price_oracle.untrack(token_address)
+            send_telegram_message(f"❌ Stop-loss triggered! Sold {token_address} at {profit:.2f}% loss.")
+            return
+
+        # Wakes on the next vault update instead of a fixed poll
+        price_oracle.wait_for_update(token_address, timeout=2)
+
+def sniper_loop(trading_loop=None):
     """Main sniper loop with automatic profit withdrawals."""
     print("🚀 Sniper bot running with Automatic Withdrawals...")
+    trading_loop = trading_loop or start_trading_loop()
     send_telegram_message("🚀 Snipe4SoleBot is LIVE and scanning for new liquidity pools!")
 
+    # Pools from the same slot are taken best-score first; stale ones age out
+    scoring_settings = load_decrypted_config().get("trade_settings", {}).get("candidate_scoring", {})
+    candidates = CandidateQueue(CandidateScorer.from_settings(scoring_settings),
+                                scoring_settings.get("deadline_seconds", CANDIDATE_DEADLINE_SECONDS))
+
     while True:
-        new_pools = get_new_liquidity_pools()
+        for pool in check_new_pools(timeout=0 if len(candidates) else 1):
+            candidates.push(pool)
 
-        for pool in new_pools:
-            token_address = pool.get("baseMint") or pool.get("mint")
+        pool = candidates.pop()
+        if pool is not None:
+            token_address = pool.get("baseMint") or pool.get("mint") or pool.get("token_a")
             if not token_address:
                 continue
 
-            print(f"🔹 New liquidity detected: {token_address}")
-            send_telegram_message(f"🚀 New liquidity detected: {token_address}")
+            # Started at frame arrival; every stage up to sendTransaction spends from it
+            budget = pool.budget or LatencyBudget()
+            try:
+                budget.check("queue")
+            except BudgetExceeded as e:
+                print(f"⏱️ Skipping {token_address}: {e}")
+                continue
 
-            # Fetch whale transactions
-            whale_buys, whale_sells = get_whale_transactions(token_address)
+            print(f"🔹 New liquidity detected: {token_address} (score {pool.score:.2f}, {len(candidates)} queued)")
+            send_telegram_message(f"🚀 New liquidity detected: {token_address}")
 
-            if whale_buys > 100:
-                send_telegram_message(f"🐋 WHALE ALERT! {whale_buys} SOL worth of {token_address} just bought!")
+            # Whale alerts are informational; fetched on the trading loop without holding up the buy
+            asyncio.run_coroutine_threadsafe(alert_whale_activity(token_address), trading_loop)
 
-            if whale_sells > 50:
-                send_telegram_message(f"⚠️ Warning! {whale_sells} SOL worth of {token_address} just sold!")
+            # Pools detected at processed commitment may still be rolled back
+            confirmation = pool.get("confirmation")
+            if confirmation and confirmation.retracted:
+                budget.finish("retracted")
+                send_telegram_message(f"↩️ Skipping {token_address}. Pool was rolled back before confirmation.")
+                continue
 
             # Decide whether to buy
-            if should_buy_token(token_address):
-                selected_wallet = get_random_wallet()
-                send_telegram_message(f"🛒 Buying {token_address} with wallet {selected_wallet.pubkey()}.")
-
-                buy_token_multi_wallet(token_address, selected_wallet)
-                initial_price = get_token_price(token_address)
-
-                # Monitor price and auto-sell if conditions met
-                while True:
-                    current_price = get_token_price(token_address)
-                    if not current_price:
-                        continue
-
-                    profit = (current_price - initial_price) / initial_price * 100
-
-                    if profit >= 10:
-                        sell_token_auto_withdraw(token_address, selected_wallet)
-                        send_telegram_message(f"✅ Sold {token_address} for {profit:.2f}% profit! Profits withdrawn.")
-                        break
-                    elif profit <= -5:
-                        sell_token_auto_withdraw(token_address, selected_wallet)
-                        send_telegram_message(f"❌ Stop-loss triggered! Sold {token_address} at {profit:.2f}% loss.")
-                        break
-
-                    time.sleep(2)
+            try:
+                buy = should_buy_token(token_address, pool)
+                budget.check("filter")
+            except BudgetExceeded as e:
+                send_telegram_message(f"⏱️ Skipping {token_address}: {e}")
+                continue
+
+            if buy:
+                wallets = load_decrypted_config().get("solana_wallets", {})
+                selected_wallet = get_random_wallet(wallets)
+                wallet_name = next(name for name, address in wallets.items() if address == selected_wallet)
+                send_telegram_message(f"🛒 Buying {token_address} with wallet {selected_wallet}.")
+
+                bought = run_on_trading_loop(
+                    trading_loop, buy_token_multi_wallet(token_address, [wallet_name], budget=budget, pool=pool))
+                if not bought:
+                    send_telegram_message(f"❌ Buy of {token_address} was not sent.")
+                    continue
+                # Exits are watched on a thread of their own so the queue keeps draining
+                threading.Thread(target=monitor_position, args=(trading_loop, token_address, pool),
+                                 name=f"position-{token_address[:8]}", daemon=True).start()
             else:
+                budget.finish("filtered")
                 send_telegram_message(f"❌ Skipping {token_address}. Doesn't meet buy criteria.")
 
-        time.sleep(1)
-
 def start_sniper_thread():
-    thread = threading.Thread(target=sniper_loop, daemon=True)
+    """Start the sniper thread; called from a running loop, trades are run on that loop."""
+    try:
+        trading_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        trading_loop = None
+    thread = threading.Thread(target=sniper_loop, args=(trading_loop,), daemon=True)
     thread.start()
     return thread
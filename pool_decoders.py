@@ -0,0 +1,268 @@
+"""Fixed-offset binary decoders for DEX pool-state accounts.
+
+Used with base64 programSubscribe notifications. Each decoder reads straight
+out of a memoryview with struct.unpack_from and bails out on the cheap checks
+(size, discriminator, "has this pool traded yet") before touching any pubkey,
+so the overwhelming majority of account updates never allocate more than a
+memoryview.
+"""
+import hashlib
+import itertools
+import struct
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import base58
+from solders.pubkey import Pubkey
+
+RAYDIUM_AMM_V4_PROGRAM = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+ORCA_WHIRLPOOL_PROGRAM = "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc"
+PUMP_FUN_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBymtzvT"
+
+SOLANA_NATIVE_MINT = "So11111111111111111111111111111111111111112"
+
+
+class AccountPrefilter(NamedTuple):
+    """Byte-level checks a candidate account must pass, evaluable on raw base64.
+
+    equals: (offset, accepted byte strings) pairs; zero_ranges: (start, end)
+    byte ranges that must be all zero.
+    """
+    exact_size: Optional[int]
+    min_size: int
+    equals: Tuple[Tuple[int, Tuple[bytes, ...]], ...]
+    zero_ranges: Tuple[Tuple[int, int], ...]
+
+
+class DecodedPool(NamedTuple):
+    """Pool fields pulled out of an account. Mints/vaults are base58 strings."""
+    program_id: str
+    base_mint: Optional[str]
+    quote_mint: str
+    base_vault: Optional[str]
+    quote_vault: Optional[str]
+    base_reserve: Optional[int]
+    quote_reserve: Optional[int]
+    base_decimals: Optional[int]
+    quote_decimals: Optional[int]
+    creator: Optional[str] = None
+    fee_pct: Optional[float] = None  # per-pool swap fee, for DEXes that store one
+
+
+_ZERO_16 = bytes(16)
+_ZERO_32 = bytes(32)
+
+
+def _anchor_discriminator(account_name: str) -> bytes:
+    return hashlib.sha256(f"account:{account_name}".encode()).digest()[:8]
+
+
+def _pubkey(data: memoryview, offset: int) -> str:
+    return str(Pubkey.from_bytes(bytes(data[offset:offset + 32])))
+
+
+# ---------- Raydium AMM v4 (LIQUIDITY_STATE_LAYOUT_V4) ----------
+
+RAYDIUM_AMM_V4_SIZE = 752
+_RAYDIUM_STATUS = struct.Struct("<Q")
+_RAYDIUM_DECIMALS = struct.Struct("<QQ")  # baseDecimal, quoteDecimal @ 32
+RAYDIUM_STATUS_SWAP_ONLY = 6
+RAYDIUM_STATUS_WAITING_TRADE = 7
+_RAYDIUM_OFFSETS = {
+    "base_vault": 336,
+    "quote_vault": 368,
+    "base_mint": 400,
+    "quote_mint": 432,
+}
+
+
+def decode_raydium_amm_v4(data: memoryview) -> Optional[DecodedPool]:
+    """Decode a Raydium AMM v4 pool that is open for trading but has not traded yet.
+
+    Reserves live in the vault token accounts, not the pool state, so
+    base_reserve/quote_reserve are left for the enrichment stage.
+    """
+    if len(data) != RAYDIUM_AMM_V4_SIZE:
+        return None
+    status, = _RAYDIUM_STATUS.unpack_from(data, 0)
+    if status not in (RAYDIUM_STATUS_SWAP_ONLY, RAYDIUM_STATUS_WAITING_TRADE):
+        return None
+    # swapBaseIn/swapQuoteOut (u128 @ 256) and swapQuoteIn/swapBaseOut (u128 @ 296)
+    if data[256:288] != _ZERO_32 or data[296:328] != _ZERO_32:
+        return None  # already traded, not a fresh pool
+
+    base_decimals, quote_decimals = _RAYDIUM_DECIMALS.unpack_from(data, 32)
+    return DecodedPool(
+        program_id=RAYDIUM_AMM_V4_PROGRAM,
+        base_mint=_pubkey(data, _RAYDIUM_OFFSETS["base_mint"]),
+        quote_mint=_pubkey(data, _RAYDIUM_OFFSETS["quote_mint"]),
+        base_vault=_pubkey(data, _RAYDIUM_OFFSETS["base_vault"]),
+        quote_vault=_pubkey(data, _RAYDIUM_OFFSETS["quote_vault"]),
+        base_reserve=None,
+        quote_reserve=None,
+        base_decimals=base_decimals,
+        quote_decimals=quote_decimals,
+    )
+
+
+# ---------- Orca Whirlpool ----------
+
+WHIRLPOOL_SIZE = 653
+WHIRLPOOL_DISCRIMINATOR = _anchor_discriminator("Whirlpool")
+_WHIRLPOOL_FEE_RATE = struct.Struct("<H")  # hundredths of a basis point @ 45
+_WHIRLPOOL_OFFSETS = {
+    "mint_a": 101,
+    "vault_a": 133,
+    "fee_growth_a": 165,
+    "mint_b": 181,
+    "vault_b": 213,
+    "fee_growth_b": 245,
+}
+
+
+def decode_orca_whirlpool(data: memoryview) -> Optional[DecodedPool]:
+    """Decode a Whirlpool that has been initialised but never swapped against."""
+    if len(data) != WHIRLPOOL_SIZE or data[:8] != WHIRLPOOL_DISCRIMINATOR:
+        return None
+    fee_growth_a = _WHIRLPOOL_OFFSETS["fee_growth_a"]
+    fee_growth_b = _WHIRLPOOL_OFFSETS["fee_growth_b"]
+    if data[fee_growth_a:fee_growth_a + 16] != _ZERO_16 or data[fee_growth_b:fee_growth_b + 16] != _ZERO_16:
+        return None  # fees have accrued, so it has been swapped against
+
+    return DecodedPool(
+        program_id=ORCA_WHIRLPOOL_PROGRAM,
+        base_mint=_pubkey(data, _WHIRLPOOL_OFFSETS["mint_a"]),
+        quote_mint=_pubkey(data, _WHIRLPOOL_OFFSETS["mint_b"]),
+        base_vault=_pubkey(data, _WHIRLPOOL_OFFSETS["vault_a"]),
+        quote_vault=_pubkey(data, _WHIRLPOOL_OFFSETS["vault_b"]),
+        base_reserve=None,
+        quote_reserve=None,
+        base_decimals=None,
+        quote_decimals=None,
+        fee_pct=_WHIRLPOOL_FEE_RATE.unpack_from(data, 45)[0] / 10_000,
+    )
+
+
+# ---------- pump.fun bonding curve ----------
+
+PUMP_FUN_CURVE_MIN_SIZE = 49
+PUMP_FUN_CURVE_DISCRIMINATOR = _anchor_discriminator("BondingCurve")
+PUMP_FUN_TOKEN_DECIMALS = 6
+PUMP_FUN_INITIAL_VIRTUAL_TOKEN_RESERVES = 1_073_000_000_000_000
+PUMP_FUN_INITIAL_VIRTUAL_SOL_RESERVES = 30_000_000_000  # lamports no one deposited
+_PUMP_FUN_CURVE = struct.Struct("<QQQQQ?")  # virtual token/sol, real token/sol, supply, complete
+
+
+def decode_pump_fun_curve(data: memoryview) -> Optional[DecodedPool]:
+    """Decode a freshly created pump.fun bonding curve (no buys yet).
+
+    The curve is a PDA of the mint and does not store it, so base_mint is
+    None; the monitor resolves it from the creation transaction.
+    """
+    if len(data) < PUMP_FUN_CURVE_MIN_SIZE or data[:8] != PUMP_FUN_CURVE_DISCRIMINATOR:
+        return None
+    virtual_token, virtual_sol, real_token, real_sol, _, complete = _PUMP_FUN_CURVE.unpack_from(data, 8)
+    if complete or real_sol or virtual_token != PUMP_FUN_INITIAL_VIRTUAL_TOKEN_RESERVES:
+        return None
+
+    return DecodedPool(
+        program_id=PUMP_FUN_PROGRAM,
+        base_mint=None,
+        quote_mint=SOLANA_NATIVE_MINT,
+        base_vault=None,
+        quote_vault=None,
+        base_reserve=virtual_token,
+        quote_reserve=virtual_sol,
+        base_decimals=PUMP_FUN_TOKEN_DECIMALS,
+        quote_decimals=9,
+        creator=_pubkey(data, 49) if len(data) >= 81 else None,
+    )
+
+
+def decode_pump_fun_reserves(data: memoryview) -> Optional[Tuple[int, int]]:
+    """Return a bonding curve's (virtual token, virtual SOL) reserves at any stage."""
+    if len(data) < PUMP_FUN_CURVE_MIN_SIZE or data[:8] != PUMP_FUN_CURVE_DISCRIMINATOR:
+        return None
+    virtual_token, virtual_sol = _PUMP_FUN_CURVE.unpack_from(data, 8)[:2]
+    return virtual_token, virtual_sol
+
+
+# ---------- SPL token accounts and mints (enrichment) ----------
+
+TOKEN_ACCOUNT_MIN_SIZE = 72
+_TOKEN_AMOUNT = struct.Struct("<Q")  # amount @ 64, after mint and owner
+MINT_MIN_SIZE = 82
+_MINT = struct.Struct("<I32sQB?I32s")  # COption authority, supply, decimals, initialized, COption freeze
+
+
+class MintInfo(NamedTuple):
+    supply: int
+    decimals: int
+    mint_authority: Optional[str]
+    freeze_authority: Optional[str]
+
+
+def decode_token_amount(data: memoryview) -> Optional[int]:
+    """Return the raw amount held by an SPL (or Token-2022) token account."""
+    if len(data) < TOKEN_ACCOUNT_MIN_SIZE:
+        return None
+    amount, = _TOKEN_AMOUNT.unpack_from(data, 64)
+    return amount
+
+
+def decode_mint(data: memoryview) -> Optional[MintInfo]:
+    """Decode the base layout shared by SPL and Token-2022 mints."""
+    if len(data) < MINT_MIN_SIZE:
+        return None
+    has_authority, authority, supply, decimals, initialized, has_freeze, freeze = _MINT.unpack_from(data, 0)
+    if not initialized:
+        return None
+    return MintInfo(
+        supply=supply,
+        decimals=decimals,
+        mint_authority=str(Pubkey.from_bytes(authority)) if has_authority else None,
+        freeze_authority=str(Pubkey.from_bytes(freeze)) if has_freeze else None,
+    )
+
+
+# Byte-level prefilters matching exactly the accounts each decoder accepts
+RAYDIUM_AMM_V4_PREFILTER = AccountPrefilter(
+    exact_size=RAYDIUM_AMM_V4_SIZE,
+    min_size=RAYDIUM_AMM_V4_SIZE,
+    equals=((0, (_RAYDIUM_STATUS.pack(RAYDIUM_STATUS_SWAP_ONLY),
+                 _RAYDIUM_STATUS.pack(RAYDIUM_STATUS_WAITING_TRADE))),),
+    zero_ranges=((256, 288), (296, 328)),
+)
+ORCA_WHIRLPOOL_PREFILTER = AccountPrefilter(
+    exact_size=WHIRLPOOL_SIZE,
+    min_size=WHIRLPOOL_SIZE,
+    equals=((0, (WHIRLPOOL_DISCRIMINATOR,)),),
+    zero_ranges=((165, 181), (245, 261)),
+)
+PUMP_FUN_CURVE_PREFILTER = AccountPrefilter(
+    exact_size=None,
+    min_size=PUMP_FUN_CURVE_MIN_SIZE,
+    equals=((0, (PUMP_FUN_CURVE_DISCRIMINATOR,)),
+            (8, (struct.pack("<Q", PUMP_FUN_INITIAL_VIRTUAL_TOKEN_RESERVES),))),
+    zero_ranges=((32, 40), (48, 49)),  # real SOL reserves, complete flag
+)
+
+
+def subscription_filters(spec: AccountPrefilter) -> List[List[Dict[str, Any]]]:
+    """Translate a prefilter into programSubscribe filter sets.
+
+    RPC filters within a set are ANDed and there is no OR, so each
+    combination of accepted values in spec.equals becomes its own set (one
+    subscription each).
+    """
+    base = [{"dataSize": spec.exact_size}] if spec.exact_size is not None else []
+    base += [{"memcmp": {"offset": start, "bytes": base58.b58encode(bytes(end - start)).decode()}}
+             for start, end in spec.zero_ranges]
+    offsets = [offset for offset, _ in spec.equals]
+    filter_sets = []
+    for values in itertools.product(*(accepted for _, accepted in spec.equals)):
+        filter_sets.append(base + [
+            {"memcmp": {"offset": offset, "bytes": base58.b58encode(value).decode()}}
+            for offset, value in zip(offsets, values)
+        ])
+    return filter_sets
+
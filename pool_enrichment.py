@@ -0,0 +1,164 @@
+"""Batched enrichment of detected pools.
+
+Pools detected within a short window are resolved together with a single
+getMultipleAccounts call: vault balances, mint decimals and the base mint's
+mint/freeze authorities. Liquidity is attached in SOL so the trading
+filters can act on the event without a follow-up request per pool.
+"""
+import asyncio
+import base64
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from event_types import PoolEvent
+from dex_registry import get_dex
+from http_sessions import RPC, get_session
+from pool_decoders import (
+    PUMP_FUN_INITIAL_VIRTUAL_SOL_RESERVES, PUMP_FUN_PROGRAM, SOLANA_NATIVE_MINT, decode_mint, decode_token_amount,
+)
+from stream_metrics import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+ENRICH_WINDOW_SECONDS = 0.02
+# getMultipleAccounts accepts at most 100 pubkeys per call
+MAX_ACCOUNTS_PER_CALL = 100
+ACCOUNTS_PER_POOL = 4  # base vault, quote vault, base mint, quote mint
+LAMPORTS_PER_SOL = 1_000_000_000
+
+
+def _accounts_for(pool_info: PoolEvent) -> List[str]:
+    accounts = [pool_info.base_vault, pool_info.quote_vault]
+    # SOL's decimals are known; skip fetching its mint
+    accounts += [mint for mint in (pool_info.token_a, pool_info.token_b) if mint != SOLANA_NATIVE_MINT]
+    return [account for account in accounts if account]
+
+
+async def get_multiple_accounts(session: aiohttp.ClientSession, rpc_url: str, keys: List[str],
+                                commitment: str = "confirmed") -> Dict[str, memoryview]:
+    """Fetch accounts with one base64 getMultipleAccounts call; missing accounts are omitted."""
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "getMultipleAccounts",
+        "params": [keys, {"encoding": "base64", "commitment": commitment}]
+    }
+    async with session.post(rpc_url, json=payload) as response:
+        result = await response.json()
+    if "error" in result:
+        raise Exception(f"RPC Error: {result['error']}")
+    return {
+        key: memoryview(base64.b64decode(account["data"][0]))
+        for key, account in zip(keys, result["result"]["value"])
+        if account
+    }
+
+
+def attach_liquidity(pool_info: PoolEvent, accounts: Dict[str, memoryview]) -> PoolEvent:
+    """Fill reserves, decimals, authorities and liquidity (in SOL) from fetched accounts."""
+    for side, mint, vault in (("base", pool_info.token_a, pool_info.base_vault),
+                              ("quote", pool_info.token_b, pool_info.quote_vault)):
+        if mint == SOLANA_NATIVE_MINT:
+            setattr(pool_info, f"{side}_decimals", 9)
+        elif mint in accounts:
+            mint_info = decode_mint(accounts[mint])
+            if mint_info:
+                setattr(pool_info, f"{side}_decimals", mint_info.decimals)
+                if side == "base":
+                    pool_info.mint_authority = mint_info.mint_authority
+                    pool_info.freeze_authority = mint_info.freeze_authority
+        if vault in accounts:
+            setattr(pool_info, f"{side}_reserve", decode_token_amount(accounts[vault]))
+
+    # Both sides of a constant-product pool hold equal value, so liquidity is twice the SOL side.
+    # pump.fun curves report virtual reserves; only what was deposited beyond the initial virtual
+    # SOL is real, so a fresh curve has none.
+    sol_reserve = None
+    if pool_info.token_b == SOLANA_NATIVE_MINT:
+        sol_reserve = pool_info.quote_reserve
+    elif pool_info.token_a == SOLANA_NATIVE_MINT:
+        sol_reserve = pool_info.base_reserve
+    if sol_reserve is not None:
+        if pool_info.dex == get_dex(PUMP_FUN_PROGRAM).name:
+            sol_reserve = max(0, sol_reserve - PUMP_FUN_INITIAL_VIRTUAL_SOL_RESERVES)
+        pool_info.liquidity = 2 * sol_reserve / LAMPORTS_PER_SOL
+    return pool_info
+
+
+class PoolEnricher:
+    """Collects pools for up to `window` seconds and enriches them in one RPC call.
+
+    A batch is sent early once it would reach the getMultipleAccounts key
+    limit. If the call fails the pools are returned unenriched rather than
+    held back.
+    """
+
+    def __init__(self, rpc_url: str, session: Optional[aiohttp.ClientSession] = None,
+                 window: float = ENRICH_WINDOW_SECONDS, commitment: str = "confirmed"):
+        self.rpc_url = rpc_url
+        self.session = session
+        self.window = window
+        self.commitment = commitment
+        self._pending = []  # (pool_info, future, queued_at)
+        self._pending_accounts = set()
+        self._flush_handle = None
+        self.batches = 0
+        self.pools_enriched = 0
+        self.failures = 0
+        self.added_latency = LatencyHistogram()
+
+    async def enrich(self, pool_info: PoolEvent) -> PoolEvent:
+        """Wait for pool_info's batch to resolve and return it enriched in place."""
+        accounts = _accounts_for(pool_info)
+        if not accounts:
+            return pool_info
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((pool_info, future, time.monotonic()))
+        self._pending_accounts.update(accounts)
+        if len(self._pending_accounts) > MAX_ACCOUNTS_PER_CALL - ACCOUNTS_PER_POOL or self.window <= 0:
+            self._flush_now()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        self._pending_accounts = set()
+        if batch:
+            asyncio.ensure_future(self._flush(batch))
+
+    async def _flush(self, batch):
+        keys = list(dict.fromkeys(account for pool_info, _, _ in batch for account in _accounts_for(pool_info)))
+        try:
+            accounts = await get_multiple_accounts(self.session or get_session(RPC), self.rpc_url, keys, self.commitment)
+        except Exception as e:
+            self.failures += 1
+            LOGGER.error(f"❌ Pool enrichment failed for {len(batch)} pools: {str(e)}")
+            accounts = {}
+
+        self.batches += 1
+        now = time.monotonic()
+        for pool_info, future, queued_at in batch:
+            if accounts:
+                attach_liquidity(pool_info, accounts)
+                self.pools_enriched += 1
+            self.added_latency.observe((now - queued_at) * 1000)
+            if not future.done():
+                future.set_result(pool_info)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "pools_enriched": self.pools_enriched,
+            "failures": self.failures,
+            "pools_per_batch": round(self.added_latency.count / self.batches, 2) if self.batches else 0.0,
+            "added_latency": self.added_latency.as_dict(),
+        }
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from http_sessions import close_sessions
+from latency_budget import get_budget_stats
+from mempool_monitor import DETECTION_PROCESS, HELIUS_RPC_URL, LATENCY_BUDGET_SECONDS, MempoolMonitor
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SUBSCRIBER_QUEUE_SIZE = 1000
+LEGACY_QUEUE_SIZE = 1000
+
+# Sentinel pushed into a subscription to end iteration
+_CLOSED = object()
+
+
+class PoolSubscription:
+    """Async iterator over the pool events delivered to one consumer.
+
+    Events may be published from another thread/event loop; delivery is
+    marshalled onto the loop that created the subscription. When the
+    consumer falls behind, the oldest buffered event is dropped.
+    """
+
+    def __init__(self, stream: "PoolStream", maxsize: int):
+        self._stream = stream
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+        self._closed = False
+        self.delivered = 0
+        self.dropped = 0
+
+    def deliver(self, item: Any):
+        """Hand an event to this subscriber from any thread."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._offer(item)
+        else:
+            self._loop.call_soon_threadsafe(self._offer, item)
+
+    def _offer(self, item: Any):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+        if item is not _CLOSED:
+            self.delivered += 1
+
+    def close(self):
+        """Detach from the stream and end iteration once the buffer is drained."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stream.unsubscribe(self)
+        try:
+            self.deliver(_CLOSED)
+        except RuntimeError:
+            pass  # consumer loop already closed
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        item = await self._queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+
+class _QueueSink:
+    """Thread-safe buffer used by the synchronous legacy polling helpers."""
+
+    def __init__(self, maxsize: int):
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def deliver(self, item: Any):
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def drain(self, timeout: float = 0) -> List[Dict[str, Any]]:
+        """Return all buffered events, waiting up to timeout for the first one."""
+        items = []
+        if timeout > 0:
+            try:
+                items.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                return items
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+
+class PoolStream:
+    """Single process-wide pool-creation stream fanned out to many consumers.
+
+    One MempoolMonitor (one websocket connection) feeds every subscriber, so
+    the sniper loop, whale correlator and notifier all share the same
+    connection instead of paying connect/handshake latency per poll.
+    """
+
+    def __init__(self, monitor: Optional[MempoolMonitor] = None):
+        # monitor may also be a DetectionProcess, which has the same interface
+        self.monitor = monitor
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._task = None
+        self._loop = None
+        self._thread = None
+        self.events_published = 0
+        self.started_at = None
+
+    @property
+    def is_running(self) -> bool:
+        if self._thread is not None:
+            return self._thread.is_alive()
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start the shared stream on the current event loop."""
+        if self.is_running:
+            return
+        if self.monitor is None:
+            if DETECTION_PROCESS:
+                from detection_process import DetectionProcess
+                self.monitor = DetectionProcess(latency_budget=LATENCY_BUDGET_SECONDS, rpc_url=HELIUS_RPC_URL)
+            else:
+                self.monitor = MempoolMonitor()
+        self._loop = asyncio.get_running_loop()
+        self.started_at = time.time()
+        self._task = asyncio.create_task(self.monitor.start_monitoring(self._publish))
+        LOGGER.info("📡 Shared pool stream started")
+
+    def start_in_background(self):
+        """Start the shared stream on a dedicated daemon thread.
+
+        Used by synchronous callers whose own event loops are short-lived.
+        """
+        if self.is_running:
+            return
+
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+
+            async def main():
+                await self.start()
+                started.set()
+                await self._task
+
+            try:
+                loop.run_until_complete(main())
+            except Exception as e:
+                LOGGER.error(f"Shared pool stream stopped: {str(e)}")
+            finally:
+                started.set()
+                loop.run_until_complete(close_sessions())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="pool-stream", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    async def stop(self):
+        """Stop the monitor and end every subscription."""
+        if self.monitor:
+            if self._loop and self._loop is not asyncio.get_running_loop():
+                asyncio.run_coroutine_threadsafe(self.monitor.stop(), self._loop)
+            else:
+                await self.monitor.stop()
+
+        with self._lock:
+            subscribers = tuple(self._subscribers)
+        for subscriber in subscribers:
+            if isinstance(subscriber, PoolSubscription):
+                subscriber.close()
+
+    def subscribe(self, maxsize: int = DEFAULT_SUBSCRIBER_QUEUE_SIZE) -> PoolSubscription:
+        """Attach a new async consumer. Must be called from a running event loop."""
+        subscription = PoolSubscription(self, maxsize)
+        self.add_sink(subscription)
+        return subscription
+
+    def add_sink(self, sink: Any):
+        """Attach any object exposing a thread-safe deliver(item) method."""
+        with self._lock:
+            self._subscribers.add(sink)
+
+    def unsubscribe(self, sink: Any):
+        with self._lock:
+            self._subscribers.discard(sink)
+
+    async def _publish(self, pool_info: Dict[str, Any]):
+        """MempoolMonitor callback: fan the event out to every subscriber."""
+        self.events_published += 1
+        with self._lock:
+            subscribers = tuple(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.deliver(pool_info)
+            except RuntimeError:
+                # The consumer's event loop has gone away
+                LOGGER.warning("Dropping pool stream subscriber with a closed event loop")
+                self.unsubscribe(subscriber)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return fan-out counters plus the underlying monitor's stream metrics."""
+        with self._lock:
+            subscribers = tuple(self._subscribers)
+        stats = {
+            "running": self.is_running,
+            "subscribers": len(subscribers),
+            "events_published": self.events_published,
+            "subscriber_drops": sum(getattr(s, "dropped", 0) for s in subscribers),
+            # Per-stage time of the opportunities consumers acted on, frame to sendTransaction
+            "latency_budget": get_budget_stats(),
+        }
+        if self.monitor:
+            stats["stream"] = self.monitor.get_metrics()
+        return stats
+
+
+# Process-wide stream instance
+_pool_stream = None
+_pool_stream_lock = threading.Lock()
+_legacy_sink = None
+
+
+def get_pool_stream() -> PoolStream:
+    """Return the process-wide PoolStream, creating it on first use."""
+    global _pool_stream
+    with _pool_stream_lock:
+        if _pool_stream is None:
+            _pool_stream = PoolStream()
+        return _pool_stream
+
+
+async def pool_stream(maxsize: int = DEFAULT_SUBSCRIBER_QUEUE_SIZE):
+    """Yield pool-creation events from the shared stream.
+
+    Usage:
+        async for pool in pool_stream():
+            ...
+    """
+    stream = get_pool_stream()
+    if not stream.is_running:
+        await stream.start()
+
+    subscription = stream.subscribe(maxsize)
+    try:
+        async for pool_info in subscription:
+            yield pool_info
+    finally:
+        subscription.close()
+
+
+def drain_new_pools(timeout: float = 0) -> List[Dict[str, Any]]:
+    """Return pools seen since the previous call, for synchronous pollers.
+
+    Starts the shared stream on a background thread on first use.
+    """
+    global _legacy_sink
+    stream = get_pool_stream()
+    with _pool_stream_lock:
+        if _legacy_sink is None:
+            _legacy_sink = _QueueSink(LEGACY_QUEUE_SIZE)
+            stream.add_sink(_legacy_sink)
+    if not stream.is_running:
+        stream.start_in_background()
+    return _legacy_sink.drain(timeout)
@@ -0,0 +1,372 @@
+"""In-process AMM prices for the positions we hold.
+
+PriceOracle accountSubscribes to each tracked pool's base/quote vaults (or
+to the bonding curve for pump.fun) and recomputes the constant-product
+price on every update, so exit checks see a new price within a slot
+without polling an HTTP price API. A feed only counts as fresh while its
+websocket is up, every subscription has been confirmed and synced, and
+its reserves moved within the last FEED_MAX_AGE_SECONDS (a completed or
+migrated pump.fun curve stops changing but keeps its last price);
+otherwise callers fall back to the HTTP price path.
+"""
+import asyncio
+import base64
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from event_types import PriceTick
+from frame_filter import json_loads
+from http_sessions import RPC, close_sessions, get_session
+from mempool_monitor import HELIUS_RPC_URL, HELIUS_WS_URL, RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY
+from pool_decoders import decode_pump_fun_reserves, decode_token_amount
+from pool_enrichment import get_multiple_accounts
+
+LOGGER = logging.getLogger(__name__)
+
+# Vault updates are only useful if they arrive within a slot
+ORACLE_COMMITMENT = "processed"
+# A feed without a reserve update for this long is stale
+FEED_MAX_AGE_SECONDS = 30.0
+
+
+class PoolPriceFeed:
+    """Reserves of one pool and the price of `token` in the pool's other asset."""
+
+    def __init__(self, token: str, pool_info: Dict[str, Any], entry_price: Optional[float] = None):
+        self.token = token
+        self.pool_address = pool_info.get("pool_address")
+        self.base_mint = pool_info.get("token_a")
+        self.quote_mint = pool_info.get("token_b")
+        self.base_vault = pool_info.get("base_vault")
+        self.quote_vault = pool_info.get("quote_vault")
+        self.base_decimals = pool_info.get("base_decimals")
+        self.quote_decimals = pool_info.get("quote_decimals")
+        self.base_reserve = pool_info.get("base_reserve")
+        self.quote_reserve = pool_info.get("quote_reserve")
+        # pump.fun curves hold both reserves in the curve account itself
+        self.accounts = (
+            {self.base_vault: "base", self.quote_vault: "quote"}
+            if self.base_vault and self.quote_vault
+            else {self.pool_address: "curve"}
+        )
+        self.subscription_ids = {}  # account -> subscription id
+        self.synced = False
+        self.entry_price = entry_price if entry_price is not None else self.price
+        self.tick: Optional[PriceTick] = None
+        self.updated_at = None
+        self.slot = None
+        self.updates = 0
+        self.changed = threading.Event()
+
+    @property
+    def price(self) -> Optional[float]:
+        """Price of the tracked token in units of the other side (SOL for SOL pairs)."""
+        if not self.base_reserve or not self.quote_reserve or self.base_decimals is None or self.quote_decimals is None:
+            return None
+        base_price = (self.quote_reserve / 10 ** self.quote_decimals) / (self.base_reserve / 10 ** self.base_decimals)
+        return base_price if self.token == self.base_mint else 1 / base_price
+
+    def apply(self, role: str, data: memoryview, slot: Optional[int] = None):
+        """Update reserves from a vault or curve account."""
+        if role == "curve":
+            reserves = decode_pump_fun_reserves(data)
+            if reserves is None:
+                return
+            self.base_reserve, self.quote_reserve = reserves
+        else:
+            amount = decode_token_amount(data)
+            if amount is None:
+                return
+            setattr(self, f"{role}_reserve", amount)
+
+        self.updated_at = time.monotonic()
+        if slot:
+            self.slot = slot
+        self.updates += 1
+        price = self.price
+        if price is not None:
+            # Replaced, never mutated, so readers on other threads need no lock
+            self.tick = PriceTick(self.token, price, self.slot, self.updated_at)
+            if self.entry_price is None:
+                self.entry_price = price
+        self.changed.set()
+
+
+class PriceOracle:
+    """Subscription-driven prices for tracked pools over one websocket."""
+
+    def __init__(self, ws_url: str = HELIUS_WS_URL, rpc_url: str = HELIUS_RPC_URL,
+                 commitment: str = ORACLE_COMMITMENT, max_age: float = FEED_MAX_AGE_SECONDS):
+        self.ws_url = ws_url
+        self.rpc_url = rpc_url
+        self.commitment = commitment
+        self.max_age = max_age
+        self.session = None
+        self.websocket = None
+        self.is_connected = False
+        self.feeds: Dict[str, PoolPriceFeed] = {}
+        self._subscriptions = {}  # subscription id -> (feed, account)
+        self._pending = {}  # request id -> (feed, account)
+        self._request_ids = iter(range(1, 1 << 62))
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self.reconnects = 0
+        self.notifications = 0
+
+    @property
+    def is_running(self) -> bool:
+        if self._thread is not None:
+            return self._thread.is_alive()
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start the oracle on the current event loop."""
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+
+    def start_in_background(self):
+        """Start the oracle on a dedicated daemon thread (for synchronous callers)."""
+        if self.is_running:
+            return
+
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+
+            async def main():
+                await self.start()
+                started.set()
+                await self._task
+
+            try:
+                loop.run_until_complete(main())
+            except Exception as e:
+                LOGGER.error(f"Price oracle stopped: {str(e)}")
+            finally:
+                started.set()
+                loop.run_until_complete(close_sessions())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="price-oracle", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def track(self, token: str, pool_info: Dict[str, Any], entry_price: Optional[float] = None) -> PoolPriceFeed:
+        """Start following the pool behind a position. Safe to call from any thread.
+
+        entry_price is in the feed's units (the other side of the pool); it
+        defaults to the first price the feed computes.
+        """
+        feed = self.feeds.get(token)
+        if feed is not None:
+            return feed
+        feed = PoolPriceFeed(token, pool_info, entry_price)
+        if None in feed.accounts:
+            LOGGER.warning(f"⚠️ Cannot price {token} on-chain: pool has no vaults or curve address")
+            return feed
+        self.feeds[token] = feed
+        if not self.is_running:
+            self.start_in_background()
+        self._call_soon(self._subscribe_feed(feed))
+        return feed
+
+    def untrack(self, token: str):
+        """Stop following a position's pool. Safe to call from any thread."""
+        feed = self.feeds.pop(token, None)
+        if feed is not None:
+            self._call_soon(self._unsubscribe_feed(feed))
+
+    def get_tick(self, token: str) -> Optional[PriceTick]:
+        """Return the latest PriceTick if the feed is fresh, else None (use the HTTP path)."""
+        feed = self.feeds.get(token)
+        if feed is None or not (self.is_connected and feed.synced) or feed.tick is None:
+            return None
+        if time.monotonic() - feed.tick.observed_at > self.max_age:
+            return None
+        return feed.tick
+
+    def get_price(self, token: str) -> Optional[float]:
+        """Return the on-chain price if the feed is fresh, else None (use the HTTP path)."""
+        tick = self.get_tick(token)
+        return tick.price if tick else None
+
+    def get_profit_pct(self, token: str) -> Optional[float]:
+        """Return the % change since entry from a fresh feed, else None."""
+        price = self.get_price(token)
+        feed = self.feeds.get(token)
+        if price is None or not feed.entry_price:
+            return None
+        return (price - feed.entry_price) / feed.entry_price * 100
+
+    def wait_for_update(self, token: str, timeout: float) -> bool:
+        """Block until the token's reserves change or timeout; for synchronous pollers."""
+        feed = self.feeds.get(token)
+        if feed is None:
+            time.sleep(timeout)
+            return False
+        updated = feed.changed.wait(timeout)
+        feed.changed.clear()
+        return updated
+
+    def _call_soon(self, coro):
+        if self._loop is None or self._loop.is_closed():
+            coro.close()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._loop.create_task(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _run(self):
+        """Keep the websocket up, resubscribing and resyncing every feed on reconnect."""
+        attempt = 0
+        while True:
+            try:
+                self.websocket = await (self.session or get_session(RPC)).ws_connect(self.ws_url, heartbeat=15)
+                self.is_connected = True
+                attempt = 0
+                LOGGER.info(f"✅ Price oracle connected ({len(self.feeds)} pools)")
+                for feed in list(self.feeds.values()):
+                    await self._subscribe_feed(feed)
+                await self._read_stream()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error(f"Price oracle websocket error: {str(e)}")
+            finally:
+                self.is_connected = False
+                self._subscriptions.clear()
+                self._pending.clear()
+                for feed in self.feeds.values():
+                    feed.synced = False
+                    feed.subscription_ids.clear()
+                if self.websocket and not self.websocket.closed:
+                    await self.websocket.close()
+
+            self.reconnects += 1
+            delay = random.uniform(RECONNECT_BASE_DELAY / 2, min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * (2 ** attempt)))
+            attempt += 1
+            LOGGER.warning(f"🔄 Reconnecting price oracle in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def _subscribe_feed(self, feed: PoolPriceFeed):
+        if not self.is_connected:
+            return  # subscribed on (re)connect
+        in_flight = set(self._pending.values())
+        for account in feed.accounts:
+            if account in feed.subscription_ids or (feed, account) in in_flight:
+                continue
+            request_id = next(self._request_ids)
+            self._pending[request_id] = (feed, account)
+            await self.websocket.send_json({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "accountSubscribe",
+                "params": [account, {"encoding": "base64", "commitment": self.commitment}]
+            })
+
+    async def _unsubscribe_feed(self, feed: PoolPriceFeed):
+        for subscription_id in feed.subscription_ids.values():
+            self._subscriptions.pop(subscription_id, None)
+            if self.is_connected:
+                await self.websocket.send_json({
+                    "jsonrpc": "2.0",
+                    "id": next(self._request_ids),
+                    "method": "accountUnsubscribe",
+                    "params": [subscription_id]
+                })
+
+    async def _sync_feed(self, feed: PoolPriceFeed):
+        """Load current reserves once all of the feed's subscriptions are live.
+
+        Subscriptions only report changes, so without this a quiet pool
+        would never get a price after a reconnect.
+        """
+        try:
+            accounts = await get_multiple_accounts(self.session or get_session(RPC), self.rpc_url, list(feed.accounts), self.commitment)
+        except Exception as e:
+            LOGGER.error(f"Failed to sync reserves for {feed.token}: {str(e)}")
+            return
+        for account, role in feed.accounts.items():
+            if account in accounts:
+                feed.apply(role, accounts[account])
+        feed.synced = feed.token in self.feeds and len(feed.subscription_ids) == len(feed.accounts)
+
+    async def _read_stream(self):
+        async for msg in self.websocket:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING):
+                    break
+                continue
+            try:
+                data = json_loads(msg.data)
+            except ValueError:
+                LOGGER.error(f"Failed to decode price feed message: {msg.data}")
+                continue
+            if data.get("method") == "accountNotification":
+                params = data["params"]
+                subscribed = self._subscriptions.get(params["subscription"])
+                if subscribed is None:
+                    continue
+                feed, account = subscribed
+                result = params["result"]
+                self.notifications += 1
+                feed.apply(feed.accounts[account], memoryview(base64.b64decode(result["value"]["data"][0])),
+                           result.get("context", {}).get("slot"))
+            elif data.get("id") in self._pending:
+                feed, account = self._pending.pop(data["id"])
+                if "result" not in data:
+                    LOGGER.error(f"accountSubscribe failed for {account}: {data.get('error')}")
+                    continue
+                if feed.token not in self.feeds:
+                    continue  # untracked while the request was in flight
+                feed.subscription_ids[account] = data["result"]
+                self._subscriptions[data["result"]] = (feed, account)
+                if len(feed.subscription_ids) == len(feed.accounts):
+                    asyncio.ensure_future(self._sync_feed(feed))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.is_connected,
+            "reconnects": self.reconnects,
+            "notifications": self.notifications,
+            "feeds": {
+                token: {
+                    "price": feed.tick.price if feed.tick else None,
+                    "priced_in": feed.quote_mint if feed.token == feed.base_mint else feed.base_mint,
+                    "synced": feed.synced,
+                    "updates": feed.updates,
+                    "slot": feed.slot,
+                    "age_seconds": round(time.monotonic() - feed.updated_at, 3) if feed.updated_at else None,
+                }
+                for token, feed in list(self.feeds.items())
+            },
+        }
+
+
+# Process-wide oracle instance
+_price_oracle = None
+_price_oracle_lock = threading.Lock()
+
+
+def get_price_oracle() -> PriceOracle:
+    """Return the process-wide PriceOracle, creating it on first use."""
+    global _price_oracle
+    with _price_oracle_lock:
+        if _price_oracle is None:
+            _price_oracle = PriceOracle()
+        return _price_oracle
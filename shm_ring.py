@@ -0,0 +1,109 @@
+"""Single-producer/single-consumer ring buffer in shared memory.
+
+Fixed-size slots hold one length-prefixed record each. The producer fills
+a slot and publishes it by writing the slot's sequence number last; the
+consumer only reads a slot whose sequence matches the one it expects, so
+neither side takes a lock. A full ring drops the new record (counted)
+rather than blocking the producer.
+"""
+import struct
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+# capacity, slot size, write seq, read seq, dropped, oversized, consumer waiting
+_HEADER = struct.Struct("<IIQQQQI")
+_CAPACITY, _SLOT_SIZE, _WRITE_SEQ, _READ_SEQ, _DROPPED, _OVERSIZED, _WAITING = (0, 4, 8, 16, 24, 32, 40)
+_HEADER_SIZE = 64
+_SLOT_HEADER = struct.Struct("<QI")  # sequence, payload length
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_SLOT_SIZE = 1024
+
+
+class ShmRing:
+    """A named shared-memory ring; create it in the parent and attach() in a child process."""
+
+    def __init__(self, name: Optional[str] = None, capacity: int = DEFAULT_CAPACITY,
+                 slot_size: int = DEFAULT_SLOT_SIZE, create: bool = True):
+        if create:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=_HEADER_SIZE + capacity * slot_size)
+            _HEADER.pack_into(self.shm.buf, 0, capacity, slot_size, 0, 0, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name)
+        self.buf = self.shm.buf
+        self.capacity, self.slot_size = struct.unpack_from("<II", self.buf, 0)
+        self.max_payload = self.slot_size - _SLOT_HEADER.size
+
+    @classmethod
+    def attach(cls, name: str) -> "ShmRing":
+        return cls(name, create=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _get(self, offset: int) -> int:
+        return struct.unpack_from("<Q", self.buf, offset)[0]
+
+    def _set(self, offset: int, value: int):
+        struct.pack_into("<Q", self.buf, offset, value)
+
+    def put(self, payload: bytes) -> bool:
+        """Producer: append a record. Returns False if it was dropped (ring full or too large)."""
+        if len(payload) > self.max_payload:
+            self._set(_OVERSIZED, self._get(_OVERSIZED) + 1)
+            return False
+        write_seq = self._get(_WRITE_SEQ)
+        if write_seq - self._get(_READ_SEQ) >= self.capacity:
+            self._set(_DROPPED, self._get(_DROPPED) + 1)
+            return False
+        offset = _HEADER_SIZE + (write_seq % self.capacity) * self.slot_size
+        self.buf[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + len(payload)] = payload
+        struct.pack_into("<I", self.buf, offset + 8, len(payload))
+        # Publishing the sequence last makes the slot visible only once it is complete
+        struct.pack_into("<Q", self.buf, offset, write_seq + 1)
+        self._set(_WRITE_SEQ, write_seq + 1)
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """Consumer: pop the next record, or None if the ring is empty."""
+        read_seq = self._get(_READ_SEQ)
+        offset = _HEADER_SIZE + (read_seq % self.capacity) * self.slot_size
+        sequence, length = _SLOT_HEADER.unpack_from(self.buf, offset)
+        if sequence != read_seq + 1:
+            return None
+        start = offset + _SLOT_HEADER.size
+        payload = bytes(self.buf[start:start + length])
+        self._set(_READ_SEQ, read_seq + 1)
+        return payload
+
+    def set_waiting(self, waiting: bool):
+        """Consumer: announce that it is about to block until notified."""
+        struct.pack_into("<I", self.buf, _WAITING, int(waiting))
+
+    def take_waiting(self) -> bool:
+        """Producer: return True (and clear the flag) if the consumer needs a wakeup."""
+        if struct.unpack_from("<I", self.buf, _WAITING)[0]:
+            struct.pack_into("<I", self.buf, _WAITING, 0)
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        write_seq, read_seq = self._get(_WRITE_SEQ), self._get(_READ_SEQ)
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "slot_size": self.slot_size,
+            "written": write_seq,
+            "read": read_seq,
+            "depth": write_seq - read_seq,
+            "dropped_full": self._get(_DROPPED),
+            "dropped_oversized": self._get(_OVERSIZED),
+        }
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
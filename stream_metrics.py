@@ -0,0 +1,131 @@
+import bisect
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Sequence
+
+from event_dedup import DEDUP_MAX_KEYS, DEDUP_TTL_SECONDS, DedupIndex
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class StreamMetrics:
+    """Counters describing the health of a supervised WebSocket stream."""
+
+    def __init__(self):
+        self.connections = 0
+        self.reconnect_count = 0
+        self.total_downtime = 0.0
+        self.last_downtime = 0.0
+        self.disconnected_at = None
+        self.connected_at = None
+        self.backfill_runs = 0
+        self.backfilled_signatures = 0
+        self.backfilled_events = 0
+
+    def record_connected(self):
+        """Record a successful (re)connection and close any open downtime window."""
+        now = time.time()
+        if self.connections:
+            self.reconnect_count += 1
+        if self.disconnected_at is not None:
+            self.last_downtime = now - self.disconnected_at
+            self.total_downtime += self.last_downtime
+            self.disconnected_at = None
+        self.connections += 1
+        self.connected_at = now
+
+    def record_disconnected(self):
+        """Start a downtime window."""
+        if self.disconnected_at is None:
+            self.disconnected_at = time.time()
+        self.connected_at = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a snapshot of the metrics, including any ongoing downtime."""
+        downtime = self.total_downtime
+        if self.disconnected_at is not None:
+            downtime += time.time() - self.disconnected_at
+        return {
+            "connected": self.connected_at is not None,
+            "reconnect_count": self.reconnect_count,
+            "total_downtime_seconds": round(downtime, 3),
+            "last_downtime_seconds": round(self.last_downtime, 3),
+            "backfill_runs": self.backfill_runs,
+            "backfilled_signatures": self.backfilled_signatures,
+            "backfilled_events": self.backfilled_events,
+        }
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of latencies in milliseconds."""
+
+    def __init__(self, bounds_ms: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.bounds_ms, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in self.bounds_ms] + [f">{self.bounds_ms[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class ProviderRace:
+    """First-seen arbitration of events arriving from several providers.
+
+    The first provider to deliver an event wins and the event is emitted;
+    every later arrival of it (from any provider, a duplicate subscription
+    or reconnect backfill) records how far behind the winner it was. Event
+    keys are kept in a DedupIndex, so memory stays bounded.
+    """
+
+    def __init__(self, max_keys: int = DEDUP_MAX_KEYS, ttl: float = DEDUP_TTL_SECONDS):
+        self.index = DedupIndex(max_keys, ttl)
+        self.wins = {}
+        self.duplicates = 0
+        self.arrival_delay = {}  # provider -> LatencyHistogram of ms behind the winner
+
+    def arrive(self, keys: Iterable[Optional[Hashable]], provider: str,
+               received_at: Optional[float] = None) -> bool:
+        """Record an arrival; return True if no key of the event was seen before."""
+        received_at = time.monotonic() if received_at is None else received_at
+        first = self.index.lookup(keys, (received_at, provider), now=received_at)
+        if first is None:
+            self.wins[provider] = self.wins.get(provider, 0) + 1
+            return True
+
+        self.duplicates += 1
+        first_at, first_provider = first[1]
+        if provider != first_provider:
+            histogram = self.arrival_delay.get(provider)
+            if histogram is None:
+                histogram = self.arrival_delay[provider] = LatencyHistogram()
+            histogram.observe(max(0.0, received_at - first_at) * 1000)
+        return False
+
+    def seen(self, keys: Iterable[Optional[Hashable]]) -> bool:
+        """True if an event with any of these keys already arrived; records nothing."""
+        return self.index.contains(keys)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "wins": dict(self.wins),
+            "duplicates": self.duplicates,
+            "dedup": self.index.get_stats(),
+            "arrival_delay_behind_first": {
+                provider: histogram.as_dict() for provider, histogram in self.arrival_delay.items()
+            },
+        }
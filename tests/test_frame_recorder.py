@@ -0,0 +1,52 @@
+"""Recordings that span several sessions, including ones that died mid-write."""
+from frame_recorder import FLUSH_EVERY_FRAMES, FrameRecorder, read_frames
+
+
+def record(path, provider, count):
+    recorder = FrameRecorder(str(path))
+    for index in range(count):
+        recorder.write(provider, f'{{"frame":{index}}}', received_at=float(index))
+    return recorder
+
+
+def crash(path, provider, count):
+    """Write count frames and leave the file as a killed process would, without closing it."""
+    recorder = record(path, provider, count)
+    image = path.read_bytes()
+    recorder.close()
+    path.write_bytes(image)
+
+
+def test_sessions_are_read_back_in_order(tmp_path):
+    path = tmp_path / "frames.gz"
+    record(path, "a", 3).close()
+    record(path, "b", 2).close()
+
+    assert list(read_frames(str(path))) == [
+        (0.0, "a", '{"frame":0}'), (1.0, "a", '{"frame":1}'), (2.0, "a", '{"frame":2}'),
+        (0.0, "b", '{"frame":0}'), (1.0, "b", '{"frame":1}'),
+    ]
+
+
+def test_sessions_after_a_torn_one_are_still_read(tmp_path):
+    path = tmp_path / "frames.gz"
+    crash(path, "crashed", FLUSH_EVERY_FRAMES + 100)
+    record(path, "next", 10).close()
+    record(path, "last", 10).close()
+
+    frames = list(read_frames(str(path)))
+    crashed = [frame for _, provider, frame in frames if provider == "crashed"]
+    # Everything up to the last sync flush survives the crash, in order
+    assert FLUSH_EVERY_FRAMES <= len(crashed) < FLUSH_EVERY_FRAMES + 100
+    assert crashed == [f'{{"frame":{index}}}' for index in range(len(crashed))]
+    assert [provider for _, provider, _ in frames[len(crashed):]] == ["next"] * 10 + ["last"] * 10
+
+
+def test_torn_final_session_keeps_its_flushed_frames(tmp_path):
+    path = tmp_path / "frames.gz"
+    record(path, "a", 5).close()
+    crash(path, "b", FLUSH_EVERY_FRAMES + 1)
+
+    providers = [provider for _, provider, _ in read_frames(str(path))]
+    assert providers[:5] == ["a"] * 5
+    assert providers.count("b") >= FLUSH_EVERY_FRAMES
@@ -0,0 +1,152 @@
+"""Provider racing in MempoolMonitor against local websocket stand-ins with injected delays."""
+import asyncio
+import base64
+import json
+import struct
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer, unused_port
+from solders.pubkey import Pubkey
+
+import mempool_monitor
+from http_sessions import close_sessions
+from mempool_monitor import DEX_PROGRAMS, MempoolMonitor
+from pool_decoders import RAYDIUM_AMM_V4_PROGRAM, RAYDIUM_AMM_V4_SIZE, RAYDIUM_STATUS_SWAP_ONLY
+
+
+def raydium_pool_account() -> str:
+    """base64 of a fresh (swap-only, never traded) Raydium AMM v4 pool-state account."""
+    data = bytearray(RAYDIUM_AMM_V4_SIZE)
+    struct.pack_into("<Q", data, 0, RAYDIUM_STATUS_SWAP_ONLY)
+    struct.pack_into("<QQ", data, 32, 6, 9)
+    for offset in range(336, 720, 32):  # vaults, mints, market and the other pool keys
+        data[offset:offset + 32] = bytes(Pubkey.new_unique())
+    return base64.b64encode(bytes(data)).decode()
+
+
+def notification(subscription: int, pool_address: str, account: str, slot: int = 100) -> str:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "programNotification",
+        "params": {
+            "result": {
+                "context": {"slot": slot},
+                "value": {
+                    "pubkey": pool_address,
+                    "account": {"data": [account, "base64"], "executable": False, "lamports": 6124800,
+                                "owner": RAYDIUM_AMM_V4_PROGRAM, "rentEpoch": 0, "space": RAYDIUM_AMM_V4_SIZE},
+                },
+            },
+            "subscription": subscription,
+        },
+    }, separators=(",", ":"))
+
+
+class ProviderStandIn:
+    """A provider's websocket: confirms every programSubscribe, then sends pool frames on a schedule.
+
+    schedule is [(seconds to wait first, pool address)]; accounts maps each
+    pool address to the account data every provider sends for it.
+    """
+
+    def __init__(self, schedule, accounts):
+        self.schedule = schedule
+        self.accounts = accounts
+        self.done = asyncio.Event()
+
+    async def handle(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        subscriptions = {}
+        while len(subscriptions) < len(DEX_PROGRAMS):
+            call = await websocket.receive_json()
+            subscriptions[call["params"][0]] = 1000 + call["id"]
+            await websocket.send_json({"jsonrpc": "2.0", "result": 1000 + call["id"], "id": call["id"]})
+        for delay, pool_address in self.schedule:
+            await asyncio.sleep(delay)
+            await websocket.send_str(notification(subscriptions[RAYDIUM_AMM_V4_PROGRAM], pool_address,
+                                                  self.accounts[pool_address]))
+        self.done.set()
+        await websocket.receive()  # hold the socket open until the monitor closes it
+        return websocket
+
+
+async def until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def race(schedules, accounts, expected_arrivals):
+    """Run a monitor against one stand-in per schedule; return it (stopped) and the pools delivered."""
+    stand_ins = {name: ProviderStandIn(schedule, accounts) for name, schedule in schedules.items()}
+    app = web.Application()
+    for name, stand_in in stand_ins.items():
+        app.router.add_get(f"/{name}", stand_in.handle)
+    async with TestServer(app) as server:
+        monitor = MempoolMonitor(
+            ws_endpoints={name: str(server.make_url(f"/{name}")).replace("http://", "ws://") for name in stand_ins},
+            record_path=None, server_filters=False,
+        )
+        delivered = []
+
+        async def callback(pool_info):
+            delivered.append(pool_info.pool_address)
+
+        task = asyncio.create_task(monitor.start_monitoring(callback))
+        try:
+            await asyncio.gather(*(asyncio.wait_for(stand_in.done.wait(), 5) for stand_in in stand_ins.values()))
+
+            def arrivals():
+                first_seen = monitor.race.as_dict()
+                return sum(first_seen["wins"].values()) + first_seen["duplicates"]
+
+            await until(lambda: arrivals() >= expected_arrivals)
+            await until(lambda: not monitor._emit_tasks)
+        finally:
+            await monitor.stop()
+            await task
+            await close_sessions()
+    return monitor, delivered
+
+
+@pytest.fixture
+def accounts(monkeypatch):
+    # Health check, blockhash and enrichment fail fast against a closed port
+    monkeypatch.setattr(mempool_monitor, "HELIUS_RPC_URL", f"http://127.0.0.1:{unused_port()}")
+    return {str(Pubkey.new_unique()): raydium_pool_account() for _ in range(3)}
+
+
+@pytest.mark.parametrize("fast, slow", [("a", "b"), ("b", "a")])
+def test_first_arrival_wins_and_the_slower_provider_is_deduplicated(accounts, fast, slow):
+    pools = list(accounts)
+    schedules = {
+        fast: [(0.0, pool) for pool in pools],
+        slow: [(0.3, pools[0])] + [(0.0, pool) for pool in pools[1:]],
+    }
+    monitor, delivered = asyncio.run(race(schedules, accounts, 2 * len(pools)))
+
+    assert delivered == pools
+    first_seen = monitor.race.as_dict()
+    assert first_seen["wins"] == {fast: len(pools)}
+    assert first_seen["duplicates"] == len(pools)
+    assert first_seen["arrival_delay_behind_first"][slow]["count"] == len(pools)
+    assert monitor._connections_by_name[fast].events_won == len(pools)
+    assert monitor._connections_by_name[slow].events_won == 0
+
+
+def test_events_won_are_counted_per_provider(accounts):
+    early, late, shared = accounts
+    schedules = {
+        "a": [(0.0, early), (0.0, shared), (0.3, late)],
+        "b": [(0.0, late), (0.15, shared), (0.3, early)],
+    }
+    monitor, delivered = asyncio.run(race(schedules, accounts, 6))
+
+    assert sorted(delivered) == sorted(accounts)
+    assert monitor.race.as_dict()["wins"] == {"a": 2, "b": 1}
+    assert monitor.race.as_dict()["duplicates"] == 3
+    assert monitor._connections_by_name["a"].events_won == 2
+    assert monitor._connections_by_name["b"].events_won == 1
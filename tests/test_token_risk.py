@@ -0,0 +1,151 @@
+"""TokenRiskAnalyzer against a local JSON-RPC stand-in serving canned accounts."""
+import asyncio
+import base64
+import struct
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from solders.pubkey import Pubkey
+
+from event_types import PoolEvent
+from token_risk import (
+    TOKEN_2022_PROGRAM, TOKEN_PROGRAM, TokenRiskAnalyzer, associated_token_address, score_token,
+)
+
+SUPPLY = 1_000_000_000
+
+
+def mint_account(supply=SUPPLY, mint_authority=None, freeze_authority=None, decimals=6, owner=TOKEN_PROGRAM):
+    """getMultipleAccounts entry for an SPL mint (82-byte layout)."""
+    data = bytearray(82)
+    if mint_authority:
+        struct.pack_into("<I", data, 0, 1)
+        data[4:36] = bytes(Pubkey.from_string(mint_authority))
+    struct.pack_into("<QB?", data, 36, supply, decimals, True)
+    if freeze_authority:
+        struct.pack_into("<I", data, 46, 1)
+        data[50:82] = bytes(Pubkey.from_string(freeze_authority))
+    return {"data": [base64.b64encode(bytes(data)).decode(), "base64"], "owner": owner}
+
+
+def holders(*amounts):
+    return [{"address": str(Pubkey.new_unique()), "amount": str(amount)} for amount in amounts]
+
+
+class RpcStandIn:
+    """Answers batched getMultipleAccounts / getTokenLargestAccounts calls from dicts."""
+
+    def __init__(self, mints, largest):
+        self.mints = mints
+        self.largest = largest
+        self.batches = []
+
+    async def handle(self, request):
+        calls = await request.json()
+        self.batches.append([call["method"] for call in calls])
+        replies = []
+        for call in reversed(calls):  # batch replies may come back in any order
+            if call["method"] == "getMultipleAccounts":
+                value = [self.mints.get(mint) for mint in call["params"][0]]
+            elif call["params"][0] in self.largest:
+                value = self.largest[call["params"][0]]
+            else:
+                replies.append({"jsonrpc": "2.0", "id": call["id"],
+                                "error": {"code": -32600, "message": "too many accounts"}})
+                continue
+            replies.append({"jsonrpc": "2.0", "id": call["id"], "result": {"context": {"slot": 1}, "value": value}})
+        return web.json_response(replies)
+
+
+async def analyze(stand_in, mints):
+    app = web.Application()
+    app.router.add_post("/", stand_in.handle)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        analyzer = TokenRiskAnalyzer(str(server.make_url("/")), session=session)
+        return analyzer, await analyzer.analyze_many(mints)
+
+
+def new_mint():
+    return str(Pubkey.new_unique())
+
+
+def test_authorities_and_token_2022_are_scored():
+    authority = new_mint()
+    clean, authorities, token_2022 = new_mint(), new_mint(), new_mint()
+    stand_in = RpcStandIn(
+        {clean: mint_account(), authorities: mint_account(mint_authority=authority, freeze_authority=authority),
+         token_2022: mint_account(owner=TOKEN_2022_PROGRAM)},
+        {mint: holders(10_000_000) for mint in (clean, authorities, token_2022)},
+    )
+    analyzer, results = asyncio.run(analyze(stand_in, [(clean, None), (authorities, None), (token_2022, None)]))
+
+    assert results[clean].reasons == ()
+    assert not analyzer.is_risky(results[clean])
+    assert results[authorities].mint_authority == authority
+    assert results[authorities].freeze_authority == authority
+    assert results[authorities].reasons == ("mint authority not renounced", "freeze authority set")
+    assert analyzer.is_risky(results[authorities])
+    assert results[token_2022].token_program == TOKEN_2022_PROGRAM
+    assert results[token_2022].reasons == ("Token-2022 mint",)
+    assert results[token_2022].score > results[clean].score
+
+
+def test_holder_concentration():
+    mint = new_mint()
+    stand_in = RpcStandIn({mint: mint_account()}, {mint: holders(450_000_000, 200_000_000, 100_000_000)})
+    analyzer, results = asyncio.run(analyze(stand_in, [(mint, None)]))
+
+    risk = results[mint]
+    assert risk.top_holder_share == 0.45
+    assert risk.top10_share == 0.75
+    assert risk.reasons == ("top holder owns 45%", "top 10 holders own 75%")
+    assert risk.score > 0.4
+
+
+def test_pool_accounts_are_excluded_from_concentration():
+    raydium_mint, curve_mint = new_mint(), new_mint()
+    vault = str(Pubkey.new_unique())
+    raydium = PoolEvent(str(Pubkey.new_unique()), token_a=raydium_mint, base_vault=vault)
+    curve = PoolEvent(str(Pubkey.new_unique()), token_a=curve_mint)
+    curve_account = associated_token_address(curve.pool_address, curve_mint)
+    stand_in = RpcStandIn(
+        {raydium_mint: mint_account(), curve_mint: mint_account()},
+        {raydium_mint: [{"address": vault, "amount": "900000000"}, *holders(20_000_000)],
+         curve_mint: [{"address": curve_account, "amount": "950000000"}, *holders(10_000_000)]},
+    )
+    _, with_pools = asyncio.run(analyze(stand_in, [(raydium_mint, raydium), (curve_mint, curve)]))
+    _, without_pools = asyncio.run(analyze(stand_in, [(raydium_mint, None), (curve_mint, None)]))
+
+    assert with_pools[raydium_mint].top_holder_share == 0.02
+    assert with_pools[curve_mint].top_holder_share == 0.01
+    assert with_pools[raydium_mint].reasons == with_pools[curve_mint].reasons == ()
+    assert without_pools[raydium_mint].top_holder_share == 0.9
+    assert without_pools[curve_mint].top_holder_share == 0.95
+
+
+def test_missing_mint_and_unavailable_holders():
+    missing, no_holders = new_mint(), new_mint()
+    stand_in = RpcStandIn({no_holders: mint_account()}, {missing: []})
+    analyzer, results = asyncio.run(analyze(stand_in, [(missing, None), (no_holders, None)]))
+
+    assert results[missing].score == 1.0
+    assert analyzer.is_risky(results[missing])
+    assert results[no_holders].top_holder_share is None
+    assert results[no_holders].reasons == ("holder data unavailable",)
+
+
+def test_analyze_many_sends_one_batch():
+    mints = [new_mint() for _ in range(4)]
+    stand_in = RpcStandIn({mint: mint_account() for mint in mints}, {mint: holders(1_000) for mint in mints})
+    analyzer, results = asyncio.run(analyze(stand_in, [(mint, None) for mint in mints + mints[:1]]))
+
+    assert stand_in.batches == [["getMultipleAccounts"] + ["getTokenLargestAccounts"] * 4]
+    assert list(results) == mints
+    assert analyzer.get_stats()["analyzed"] == 4
+
+
+def test_score_token_without_rpc():
+    risk = score_token("mint", None, None)
+    assert risk.score == 1.0
+    assert risk.supply is None
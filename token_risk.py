@@ -0,0 +1,183 @@
+"""On-chain token risk scoring.
+
+TokenRiskAnalyzer reads everything it needs in one batched JSON-RPC round
+trip: the mint account (authorities, supply, decimals, token program) and
+getTokenLargestAccounts for holder concentration. The pool's own vaults (or
+a bonding curve's token account) are left out of the concentration figures,
+since for a fresh pool they hold most of the supply by design. The result is
+a TokenRisk with a score in [0, 1] and the reasons behind it, so the buy
+decision does not wait on a third-party metadata API.
+"""
+import base64
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import aiohttp
+from solders.pubkey import Pubkey
+
+from event_types import PoolEvent
+from http_sessions import RPC, get_session
+from pool_decoders import decode_mint
+
+LOGGER = logging.getLogger(__name__)
+
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_2022_PROGRAM = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
+ASSOCIATED_TOKEN_PROGRAM = "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL"
+
+# Tokens scoring above this are treated as suspicious
+MAX_RISK_SCORE = 0.5
+# Score added by each finding; concentration contributions scale up to these
+RISK_WEIGHTS = {
+    "mint_authority": 0.4,  # supply can still be inflated
+    "freeze_authority": 0.4,  # holders can be frozen, i.e. unable to sell
+    "top_holder": 0.3,
+    "top10_holders": 0.2,
+    "token_2022": 0.1,  # extensions (transfer fees, permanent delegate) not inspected
+}
+# Holder shares at which the concentration contributions max out
+TOP_HOLDER_FULL_RISK = 0.5
+TOP10_FULL_RISK = 0.8
+# Shares below these are not worth a reason string
+TOP_HOLDER_REPORT = 0.2
+TOP10_REPORT = 0.5
+
+
+class TokenRisk(NamedTuple):
+    mint: str
+    score: float
+    reasons: Tuple[str, ...]
+    mint_authority: Optional[str]
+    freeze_authority: Optional[str]
+    supply: Optional[int]
+    decimals: Optional[int]
+    token_program: Optional[str]
+    top_holder_share: Optional[float]  # of supply, pool accounts excluded
+    top10_share: Optional[float]
+
+
+async def rpc_batch(session: aiohttp.ClientSession, rpc_url: str,
+                    requests: List[Tuple[str, list]]) -> List[Dict[str, Any]]:
+    """Send [(method, params)] as one JSON-RPC batch; responses come back in request order."""
+    payload = [{"jsonrpc": "2.0", "id": index, "method": method, "params": params}
+               for index, (method, params) in enumerate(requests)]
+    async with session.post(rpc_url, json=payload) as response:
+        replies = await response.json()
+    if isinstance(replies, dict):
+        raise Exception(f"RPC Error: {replies.get('error', replies)}")
+    return sorted(replies, key=lambda reply: reply.get("id", 0))
+
+
+def associated_token_address(owner: str, mint: str, token_program: str = TOKEN_PROGRAM) -> str:
+    address, _ = Pubkey.find_program_address(
+        [bytes(Pubkey.from_string(owner)), bytes(Pubkey.from_string(token_program)), bytes(Pubkey.from_string(mint))],
+        Pubkey.from_string(ASSOCIATED_TOKEN_PROGRAM),
+    )
+    return str(address)
+
+
+def pool_token_accounts(mint: str, pool: Optional[PoolEvent]) -> set:
+    """Token accounts of mint that belong to the pool itself: its vaults, or a curve's associated account."""
+    if pool is None:
+        return set()
+    accounts = {pool.base_vault, pool.quote_vault}
+    if pool.pool_address:
+        accounts.update(associated_token_address(pool.pool_address, mint, program)
+                        for program in (TOKEN_PROGRAM, TOKEN_2022_PROGRAM))
+    accounts.discard(None)
+    return accounts
+
+
+def score_token(mint: str, mint_account: Optional[Dict[str, Any]], largest: Optional[List[Dict[str, Any]]],
+                excluded: Iterable[str] = ()) -> TokenRisk:
+    """Score a mint from its getMultipleAccounts entry and getTokenLargestAccounts value."""
+    mint_info = None
+    token_program = None
+    if mint_account:
+        token_program = mint_account.get("owner")
+        mint_info = decode_mint(memoryview(base64.b64decode(mint_account["data"][0])))
+    if mint_info is None or not mint_info.supply:
+        return TokenRisk(mint, 1.0, ("mint account missing, uninitialised or empty",),
+                         None, None, mint_info.supply if mint_info else None,
+                         mint_info.decimals if mint_info else None, token_program, None, None)
+
+    score = 0.0
+    reasons = []
+    if mint_info.mint_authority:
+        score += RISK_WEIGHTS["mint_authority"]
+        reasons.append("mint authority not renounced")
+    if mint_info.freeze_authority:
+        score += RISK_WEIGHTS["freeze_authority"]
+        reasons.append("freeze authority set")
+    if token_program == TOKEN_2022_PROGRAM:
+        score += RISK_WEIGHTS["token_2022"]
+        reasons.append("Token-2022 mint")
+
+    top_share = top10_share = None
+    if largest is not None:
+        excluded = set(excluded)
+        amounts = [int(holder["amount"]) for holder in largest if holder["address"] not in excluded]
+        top_share = amounts[0] / mint_info.supply if amounts else 0.0
+        top10_share = sum(amounts[:10]) / mint_info.supply
+        score += RISK_WEIGHTS["top_holder"] * min(1.0, top_share / TOP_HOLDER_FULL_RISK)
+        score += RISK_WEIGHTS["top10_holders"] * min(1.0, top10_share / TOP10_FULL_RISK)
+        if top_share >= TOP_HOLDER_REPORT:
+            reasons.append(f"top holder owns {top_share:.0%}")
+        if top10_share >= TOP10_REPORT:
+            reasons.append(f"top 10 holders own {top10_share:.0%}")
+    else:
+        reasons.append("holder data unavailable")
+
+    return TokenRisk(mint, round(min(score, 1.0), 4), tuple(reasons), mint_info.mint_authority,
+                     mint_info.freeze_authority, mint_info.supply, mint_info.decimals, token_program,
+                     round(top_share, 4) if top_share is not None else None,
+                     round(top10_share, 4) if top10_share is not None else None)
+
+
+class TokenRiskAnalyzer:
+    """Scores mints from on-chain data, batching every mint of a call into one JSON-RPC request."""
+
+    def __init__(self, rpc_url: str, session: Optional[aiohttp.ClientSession] = None,
+                 max_score: float = MAX_RISK_SCORE, commitment: str = "confirmed"):
+        self.rpc_url = rpc_url
+        self.session = session
+        self.max_score = max_score
+        self.commitment = commitment
+        self.analyzed = 0
+        self.failures = 0
+
+    async def _batch(self, requests: List[Tuple[str, list]]) -> List[Dict[str, Any]]:
+        return await rpc_batch(self.session or get_session(RPC), self.rpc_url, requests)
+
+    async def analyze_many(self, mints: Sequence[Tuple[str, Optional[PoolEvent]]]) -> Dict[str, TokenRisk]:
+        """Score (mint, pool) pairs; pool may be None when the pool is not known."""
+        keys = list(dict.fromkeys(mint for mint, _ in mints))
+        requests = [("getMultipleAccounts", [keys, {"encoding": "base64", "commitment": self.commitment}])]
+        requests += [("getTokenLargestAccounts", [mint, {"commitment": self.commitment}]) for mint in keys]
+        try:
+            replies = await self._batch(requests)
+        except Exception:
+            self.failures += 1
+            raise
+        if "error" in replies[0]:
+            self.failures += 1
+            raise Exception(f"RPC Error: {replies[0]['error']}")
+
+        accounts = dict(zip(keys, replies[0]["result"]["value"]))
+        largest = {}
+        for mint, reply in zip(keys, replies[1:]):
+            # Some RPC plans reject getTokenLargestAccounts for big mints; score without it
+            largest[mint] = reply["result"]["value"] if "result" in reply else None
+        pools = dict(mints)
+        self.analyzed += len(keys)
+        return {mint: score_token(mint, accounts[mint], largest[mint], pool_token_accounts(mint, pools.get(mint)))
+                for mint in keys}
+
+    async def analyze(self, mint: str, pool: Optional[PoolEvent] = None) -> TokenRisk:
+        return (await self.analyze_many([(mint, pool)]))[mint]
+
+    def is_risky(self, risk: TokenRisk) -> bool:
+        return risk.score > self.max_score
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"analyzed": self.analyzed, "failures": self.failures, "max_score": self.max_score}
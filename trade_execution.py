@@ -1,10 +1,11 @@
 import time
+import atexit
 import requests
 import json
 import asyncio
 import base64
 import random
-from utils import fetch_price, log_trade_result
+from utils import fetch_price_async, log_trade_result
 from telegram_notifications import safe_send_telegram_message
 from decrypt_config import config
 from portfolio import add_position, remove_position, get_position, get_all_positions
@@ -14,6 +15,15 @@ from solana.rpc.types import TxOpts
 from solders.pubkey import Pubkey
 from solders.signature import Signature
 from solders.transaction import VersionedTransaction
+from solders.hash import Hash
+from solders.message import MessageV0
+from blockhash_cache import get_latest_blockhash
+from price_oracle import get_price_oracle
+from latency_budget import BudgetExceeded
+from http_sessions import JUPITER, RPC, SOLSCAN, get_session, prewarm
+from verdict_cache import ERROR, SAFE, SUSPICIOUS, UNVERIFIED, VERDICT_MAX_ENTRIES, VerdictCache
+from token_risk import MAX_RISK_SCORE, TokenRiskAnalyzer
+from honeypot_check import MAX_SELL_TAX, SellSimulator
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
 from telegram import Bot
 from telegram.request import HTTPXRequest as AiohttpRequest
@@ -23,6 +33,9 @@ trade_settings = config["trade_settings"]
 BACKTEST_MODE = False
 MOCK_DATA_FILE = "mock_pools.json"
 SOLANA_RPC_URL = config.get("api_keys", {}).get("solana_rpc_url", "https://api.mainnet-beta.solana.com")
+JUPITER_QUOTE_URL = "https://quote-api.jup.ag/v6/quote"
+JUPITER_SWAP_URL = "https://quote-api.jup.ag/v6/swap"
+SOLSCAN_TOKEN_META_URL = "https://public-api.solscan.io/token/meta"
 
 TRADE_COOLDOWN_SECONDS = trade_settings.get("trade_cooldown", 30)
 MAX_SESSION_BUDGET_SOL = trade_settings.get("max_session_budget", 15)
@@ -33,6 +46,35 @@ last_trade_time = 0
 
 BAD_TOKENS = set(["BAD1", "SCAM2", "FAKE3"])
 
+# Token verdicts per mint: safe/suspicious/error TTLs and an optional file
+# that keeps them across restarts (trade_settings.verdict_cache)
+VERDICT_SETTINGS = trade_settings.get("verdict_cache", {})
+token_verdicts = VerdictCache(VERDICT_SETTINGS.get("ttl_seconds"),
+                              VERDICT_SETTINGS.get("max_entries", VERDICT_MAX_ENTRIES),
+                              VERDICT_SETTINGS.get("path"))
+atexit.register(token_verdicts.close)
+
+# Tokens are judged on on-chain mint and holder data (see token_risk); the
+# Solscan metadata heuristics are an optional extra (trade_settings.solscan_check)
+RISK_SETTINGS = trade_settings.get("token_risk", {})
+risk_analyzer = TokenRiskAnalyzer(SOLANA_RPC_URL, max_score=RISK_SETTINGS.get("max_score", MAX_RISK_SCORE))
+SOLSCAN_CHECK = trade_settings.get("solscan_check", False)
+
+# Buys are preceded by a simulated sell of the token (see honeypot_check),
+# cached per mint like the other verdicts but trusted for less time, since a
+# token's sell path can be switched off after launch (trade_settings.honeypot_check).
+# Tokens with no holder to simulate from yet are kept only briefly, so the
+# sell is simulated once someone outside the pool holds the token
+HONEYPOT_SETTINGS = trade_settings.get("honeypot_check", {})
+HONEYPOT_CHECK = HONEYPOT_SETTINGS.get("enabled", True)
+sell_simulator = SellSimulator(SOLANA_RPC_URL, JUPITER_QUOTE_URL, JUPITER_SWAP_URL,
+                               max_tax=HONEYPOT_SETTINGS.get("max_sell_tax", MAX_SELL_TAX),
+                               require_simulation=HONEYPOT_SETTINGS.get("require_simulation", False))
+honeypot_verdicts = VerdictCache({SAFE: 300.0, UNVERIFIED: 10.0, **HONEYPOT_SETTINGS.get("ttl_seconds", {})},
+                                 VERDICT_SETTINGS.get("max_entries", VERDICT_MAX_ENTRIES),
+                                 HONEYPOT_SETTINGS.get("path"))
+atexit.register(honeypot_verdicts.close)
+
 # Initialize signer and Solana client
 signer = Keypair.from_bytes(bytes.fromhex(config["solana_wallets"]["signer_private_key"]))
 client = Client(SOLANA_RPC_URL)  # You might need to switch to an async client if available
@@ -61,93 +103,221 @@ def calculate_trade_size(volatility):
         return base_quantity * 1.5
     return base_quantity
 
-# Check if a token is suspicious
-async def is_token_suspicious(token_address):
-    try:
-        url = f"https://public-api.solscan.io/token/meta?tokenAddress={token_address}"
-        headers = {"accept": "application/json"}
-        async with aiohttp.ClientSession() as session:
-            response = await session.get(url, headers=headers, timeout=5)
-            
-            if response.status != 200:
-                return True
-            
-            data = await response.json()
-            suspicious_indicators = [
-                data.get("name", "").lower() in ["", "token", "unknown"],
-                "scam" in data.get("name", "").lower(),
-                data.get("symbol", "").lower() in ["scam", "fake"],
-                not data.get("verified", False)
-            ]
-
-            return any(suspicious_indicators)
-
-    except Exception as e:
-        print(f"⚠️ Scam check failed: {e}")
-        return True
+# Open the buy path's Jupiter, Solscan and RPC connections ahead of the first trade
+async def prewarm_trade_connections():
+    return await prewarm([(JUPITER, JUPITER_SWAP_URL), (SOLSCAN, SOLSCAN_TOKEN_META_URL), (RPC, SOLANA_RPC_URL)])
+
+# Classify a token from its Solscan metadata; raises when Solscan can't give an answer
+async def solscan_verdict(token_address):
+    url = f"{SOLSCAN_TOKEN_META_URL}?tokenAddress={token_address}"
+    headers = {"accept": "application/json"}
+    async with get_session(SOLSCAN).get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)) as response:
+        if response.status == 404:
+            return SUSPICIOUS, ["no metadata"]
+        if response.status != 200:
+            raise Exception(f"Solscan returned HTTP {response.status}")
+        data = await response.json()
+
+    name = data.get("name", "").lower()
+    suspicious_indicators = {
+        "generic name": name in ["", "token", "unknown"],
+        "scam in name": "scam" in name,
+        "scam symbol": data.get("symbol", "").lower() in ["scam", "fake"],
+        "unverified": not data.get("verified", False),
+    }
+    reasons = [reason for reason, hit in suspicious_indicators.items() if hit]
+    return (SUSPICIOUS if reasons else SAFE), reasons
+
+# Judge a token from on-chain data, plus Solscan when enabled; raises when a check can't answer
+async def token_verdict(token_address, pool=None):
+    checks = [risk_analyzer.analyze(token_address, pool)]
+    if SOLSCAN_CHECK:
+        checks.append(solscan_verdict(token_address))
+    risk, *solscan = await asyncio.gather(*checks)
+    detail = {"risk": risk._asdict()}
+    suspicious = risk_analyzer.is_risky(risk)
+    if solscan:
+        outcome, detail["solscan"] = solscan[0]
+        suspicious = suspicious or outcome == SUSPICIOUS
+    return (SUSPICIOUS if suspicious else SAFE), detail
+
+# Check if a token is suspicious (cached per mint; errors count as suspicious).
+# pool, when known, keeps the pool's own token accounts out of the holder concentration.
+async def is_token_suspicious(token_address, pool=None):
+    verdict = await token_verdicts.resolve(token_address, lambda mint: token_verdict(mint, pool))
+    return verdict.suspicious
+
+# Simulate selling the token from an existing holder's wallet and judge the result
+async def sell_simulation_verdict(token_address, pool=None):
+    simulation = await sell_simulator.simulate(token_address, pool)
+    if not simulation.simulated:
+        outcome = f"not simulated ({simulation.error})"
+    elif simulation.error:
+        outcome = f"sell failed ({simulation.error})"
+    else:
+        outcome = f"tax {simulation.tax:.1%}" if simulation.tax is not None else "sell ok"
+    simulate_ms = f", simulate {simulation.simulate_ms:.0f}ms" if simulation.simulate_ms is not None else ""
+    print(f"🧪 Sell simulation for {token_address}: {outcome} in {simulation.elapsed_ms:.0f}ms{simulate_ms}")
+    if not simulation.simulated:
+        # Nothing was learned about the sell path; cache briefly either way
+        return (ERROR if sell_simulator.is_honeypot(simulation) else UNVERIFIED), simulation._asdict()
+    return (SUSPICIOUS if sell_simulator.is_honeypot(simulation) else SAFE), simulation._asdict()
+
+# Check if a token's sell path is blocked or heavily taxed (cached per mint; errors count as honeypots)
+async def is_honeypot(token_address, pool=None):
+    verdict = await honeypot_verdicts.resolve(token_address, lambda mint: sell_simulation_verdict(mint, pool))
+    return verdict.suspicious
+
+def restamp_blockhash(message):
+    """Rebuild a v0 message against the prefetched blockhash, if one is fresh.
+
+    Jupiter builds the swap against whatever hash its own RPC had; the
+    background prefetcher's is at most a few hundred ms old, which widens
+    the landing window without an extra round-trip. Legacy messages, or no
+    fresh cached hash, leave the message untouched.
+    """
+    snapshot = get_latest_blockhash()
+    if snapshot is None or not isinstance(message, MessageV0):
+        return message
+    return MessageV0(
+        message.header,
+        message.account_keys,
+        Hash.from_string(snapshot.blockhash),
+        message.instructions,
+        message.address_table_lookups,
+    )
+
+# Fetch the Jupiter swap transaction for a trade
+async def fetch_swap_transaction(token_address, quantity, side, wallet_key=None):
+    user_pubkey = str(wallet_key.pubkey() if wallet_key else signer.pubkey())
+    params = {
+        "inputMint": "So11111111111111111111111111111111111111112" if side == "buy" else token_address,
+        "outputMint": token_address if side == "buy" else "So11111111111111111111111111111111111111112",
+        "amount": int(quantity * 1e9),
+        "slippage": 1.0,
+        "userPublicKey": user_pubkey,
+        "wrapUnwrapSOL": True,
+        "dynamicSlippage": True
+    }
+    async with get_session(JUPITER).get(JUPITER_SWAP_URL, params=params) as response:
+        return await response.json()
 
 # Async function to send a trade transaction
-async def send_trade_transaction(token_address, quantity, price, side, wallet_key=None):
+async def send_trade_transaction(token_address, quantity, price, side, wallet_key=None, budget=None, quote=None):
+    """quote is an already-started fetch_swap_transaction task to use instead of fetching one now."""
     try:
-        quote_url = "https://quote-api.jup.ag/v6/swap"
-        user_pubkey = str(wallet_key.pubkey() if wallet_key else signer.pubkey())
-        params = {
-            "inputMint": "So11111111111111111111111111111111111111112" if side == "buy" else token_address,
-            "outputMint": token_address if side == "buy" else "So11111111111111111111111111111111111111112",
-            "amount": int(quantity * 1e9),
-            "slippage": 1.0,
-            "userPublicKey": user_pubkey,
-            "wrapUnwrapSOL": True,
-            "dynamicSlippage": True
-        }
-        async with aiohttp.ClientSession() as session:
-            response = await session.get(quote_url, params=params)
-            route_response = await response.json()
+        if quote is not None:
+            route_response = await quote
+        else:
+            route_response = await fetch_swap_transaction(token_address, quantity, side, wallet_key)
             
-            if "swapTransaction" not in route_response:
-                print(f"❌ No swapTransaction in Jupiter response: {route_response}")
-                return None
+        if "swapTransaction" not in route_response:
+            print(f"❌ No swapTransaction in Jupiter response: {route_response}")
+            return None
 
-            swap_tx = base64.b64decode(route_response["swapTransaction"])
-            txn = VersionedTransaction.deserialize(swap_tx)
+        if budget:
+            budget.check("quote")
+
+        swap_tx = base64.b64decode(route_response["swapTransaction"])
+        message = restamp_blockhash(VersionedTransaction.from_bytes(swap_tx).message)
+        
+        # Use the provided wallet key or default to signer
+        key_to_use = wallet_key or signer
+        txn = VersionedTransaction(message, [key_to_use])
+        if budget:
+            budget.check("sign")
+
+        encoded_tx = base64.b64encode(bytes(txn)).decode('ascii')
+        async with get_session(RPC).post(
+            f"{SOLANA_RPC_URL}", 
+            json={
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "sendTransaction",
+                "params": [
+                    encoded_tx,
+                    {"skipPreflight": False, "preflightCommitment": "processed"}
+                ]
+            },
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            result = await response.json()
+        if budget:
+            budget.mark("send")
+            budget.finish("sent" if "result" in result else "send_failed")
             
-            # Use the provided wallet key or default to signer
-            key_to_use = wallet_key or signer
-            txn.sign([key_to_use])
-
-            encoded_tx = base64.b64encode(txn.serialize()).decode('ascii')
-            async with aiohttp.ClientSession() as session:
-                response = await session.post(
-                    f"{SOLANA_RPC_URL}", 
-                    json={
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "sendTransaction",
-                        "params": [
-                            encoded_tx,
-                            {"skipPreflight": False, "preflightCommitment": "processed"}
-                        ]
-                    },
-                    headers={"Content-Type": "application/json"}
-                )
-                result = await response.json()
-                
-            if "result" in result:
-                sig = result["result"]
-                print(f"🚀 Trade TX sent: https://solscan.io/tx/{sig}")
-                return sig
-            else:
-                print(f"❌ Transaction failed: {result.get('error')}")
-                return None
+        if "result" in result:
+            sig = result["result"]
+            print(f"🚀 Trade TX sent: https://solscan.io/tx/{sig}")
+            return sig
+        else:
+            print(f"❌ Transaction failed: {result.get('error')}")
+            return None
+    except BudgetExceeded:
+        raise
     except Exception as e:
         print(f"❌ Trade TX failed: {e}")
         return None
 
 # Execute the trade
-async def execute_trade(action, token_address):
-    global session_spent, last_trade_time
+async def execute_trade(action, token_address, budget=None, pool=None):
+    """Run the pre-trade checks and send the trade.
 
-    if token_address in BAD_TOKENS or await is_token_suspicious(token_address):
+    budget is the opportunity's LatencyBudget (buys only); the trade is
+    abandoned at the first stage that ends past its deadline. pool is the
+    detected PoolEvent, when there is one, for the token risk check.
+    """
+    try:
+        return await _execute_trade(action, token_address, budget, pool)
+    except BudgetExceeded as e:
+        print(f"⏱️ Abandoned {action} of {token_address}: {e}")
+        return None
+    finally:
+        if budget:
+            budget.finish("skipped")  # no-op once sent or aborted
+
+async def run_pre_trade_checks(checks, speculative=None, timeout=None):
+    """Run independent pre-trade checks concurrently, alongside speculative work.
+
+    checks maps a name to (awaitable, verdict), where verdict(result) returns
+    a rejection message or a falsy value. The first rejection (or a check
+    raising, or timeout passing) cancels every check still running and all
+    speculative tasks. Returns (results, rejection, timings, speculative
+    tasks); timings are ms per check, None for the ones cancelled.
+    """
+    started = time.monotonic()
+    tasks = {asyncio.ensure_future(awaitable): name for name, (awaitable, _) in checks.items()}
+    speculative_tasks = {name: asyncio.ensure_future(awaitable) for name, awaitable in (speculative or {}).items()}
+    results, timings = {}, {name: None for name in checks}
+    rejection = None
+    pending = set(tasks)
+    try:
+        while pending and rejection is None:
+            remaining = None if timeout is None else timeout - (time.monotonic() - started)
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                rejection = f"⏱️ Pre-trade checks still running after {timeout * 1000:.0f}ms"
+                break
+            for task in done:
+                name = tasks[task]
+                timings[name] = (time.monotonic() - started) * 1000
+                try:
+                    results[name] = task.result()
+                except Exception as e:
+                    rejection = rejection or f"❌ Pre-trade check {name} failed: {e}"
+                    continue
+                rejection = rejection or checks[name][1](results[name]) or None
+    finally:
+        if pending or rejection is not None:
+            for task in (*pending, *speculative_tasks.values()):
+                task.cancel()
+    return results, rejection, timings, speculative_tasks
+
+def format_check_timings(timings):
+    return ", ".join(f"{name} {ms:.0f}ms" if ms is not None else f"{name} cancelled" for name, ms in timings.items())
+
+async def _execute_trade(action, token_address, budget=None, pool=None):
+    if token_address in BAD_TOKENS:
         print(f"🚫 Skipping suspicious token: {token_address}")
         return
 
@@ -155,21 +325,48 @@ async def execute_trade(action, token_address):
         print("🕒 Cooldown active. Waiting before next trade.")
         return
 
-    if await get_wallet_balance() < MIN_WALLET_BALANCE_SOL:
-        print("🚫 Wallet balance too low. Skipping trade.")
-        return
-
     if session_spent >= MAX_SESSION_BUDGET_SOL:
         print("💰 Max session budget reached. Skipping trade.")
         return
 
+    # Sizing comes first: the speculative quote needs the quantity
     volatility = await get_market_volatility()
     quantity = calculate_trade_size(volatility)
 
-    price = await fetch_price(token_address)
-    if price is None:
-        print("❌ Could not fetch price. Trade aborted.")
-        return
+    # The network checks don't depend on each other, so the gate costs the slowest
+    # one rather than their sum; the Jupiter quote is fetched meanwhile and
+    # thrown away if any check rejects the trade
+    checks = {
+        "scam": (is_token_suspicious(token_address, pool),
+                 lambda suspicious: suspicious and f"🚫 Skipping suspicious token: {token_address}"),
+        "balance": (get_wallet_balance(),
+                    lambda balance: balance < MIN_WALLET_BALANCE_SOL and "🚫 Wallet balance too low. Skipping trade."),
+        "price": (fetch_price_async(token_address),
+                  lambda price: price is None and "❌ Could not fetch price. Trade aborted."),
+    }
+    if action == "buy" and HONEYPOT_CHECK:
+        checks["honeypot"] = (is_honeypot(token_address, pool),
+                              lambda honeypot: honeypot and f"🍯 Skipping honeypot token: {token_address}")
+    results, rejection, timings, speculative = await run_pre_trade_checks(
+        checks,
+        speculative={"quote": fetch_swap_transaction(token_address, quantity, action)},
+        timeout=budget.remaining if budget else None,
+    )
+    print(f"⏱️ Pre-trade checks for {token_address}: {format_check_timings(timings)}")
+    quote = speculative["quote"]
+    try:
+        if budget:
+            budget.check("filter")
+        if rejection:
+            print(rejection)
+            return
+        price = results["price"]
+        return await _place_trade(action, token_address, quantity, price, volatility, budget, quote, pool)
+    finally:
+        quote.cancel()  # no-op once the trade has used it
+
+async def _place_trade(action, token_address, quantity, price, volatility, budget, quote, pool=None):
+    global session_spent, last_trade_time
 
     stop_loss = max(trade_settings["dynamic_risk_management"]["min_stop_loss"],
                     trade_settings["dynamic_risk_management"]["max_stop_loss"] * volatility)
@@ -178,12 +375,15 @@ async def execute_trade(action, token_address):
 
     if action == "buy":
         print(f"🛒 Buying {quantity} of {token_address} at ${price:.4f} (Volatility: {volatility})")
-        tx_sig = await send_trade_transaction(token_address, quantity, price, side="buy")
+        tx_sig = await send_trade_transaction(token_address, quantity, price, side="buy", budget=budget, quote=quote)
         await safe_send_telegram_message(
             f"✅ Bought {quantity} of {token_address} at ${price:.4f} (Volatility: {volatility})"
         )
         log_trade_result("buy", token_address, price, quantity, 0, "success")
         add_position(token_address, quantity, price, "dex")
+        if pool is not None:
+            # check_for_auto_sell prices the position from the pool's vaults from here on
+            get_price_oracle().track(token_address, pool)
         return tx_sig
 
     elif action == "sell":
@@ -191,12 +391,13 @@ async def execute_trade(action, token_address):
         entry_price = position["price"] if position else price
         profit_loss = round((price - entry_price) * quantity, 6)
         print(f"📤 Selling {quantity} of {token_address} at ${price:.4f} with P/L: ${profit_loss:.4f} (Volatility: {volatility})")
-        tx_sig = await send_trade_transaction(token_address, quantity, price, side="sell")
+        tx_sig = await send_trade_transaction(token_address, quantity, price, side="sell", quote=quote)
         await safe_send_telegram_message(
             f"✅ Sold {quantity} of {token_address} at ${price:.4f} with P/L: ${profit_loss:.4f} (Volatility: {volatility})"
         )
         log_trade_result("sell", token_address, price, quantity, profit_loss, "success")
         remove_position(token_address)
+        get_price_oracle().untrack(token_address)
         return tx_sig
 
     session_spent += price * quantity
@@ -210,12 +411,15 @@ async def check_for_auto_sell():
         if not position:
             continue
 
-        current_price = await fetch_price(token)
-        if current_price is None:
-            continue
+        # On-chain price when the oracle follows this pool; HTTP only when it is stale
+        profit_pct = get_price_oracle().get_profit_pct(token)
+        if profit_pct is None:
+            current_price = await fetch_price_async(token)
+            if current_price is None:
+                continue
 
-        entry_price = position["price"]
-        profit_pct = ((current_price - entry_price) / entry_price) * 100
+            entry_price = position["price"]
+            profit_pct = ((current_price - entry_price) / entry_price) * 100
 
         if profit_pct >= trade_settings["profit_target"]:
             print(f"💰 Profit target hit for {token}. Auto-selling.")
@@ -226,13 +430,15 @@ async def check_for_auto_sell():
 
 # Add missing functions that were in the import error
 
-async def buy_token_multi_wallet(token_address, wallets=None):
+async def buy_token_multi_wallet(token_address, wallets=None, budget=None, pool=None):
     """
     Buy a token using multiple wallets
     
     Args:
         token_address: The address of the token to buy
         wallets: List of wallet addresses to use (default: use all configured wallets)
+        budget: LatencyBudget of the opportunity; later wallets are skipped once it runs out
+        pool: The detected PoolEvent, if any, for the token risk check
     """
     wallets_config = {
         "wallet_1": config["solana_wallets"]["wallet_1"],
@@ -254,7 +460,7 @@ async def buy_token_multi_wallet(token_address, wallets=None):
         
         # We'll use the default signer for now - in a real implementation, 
         # you would need to load the private key for each wallet
-        result = await execute_trade("buy", token_address)
+        result = await execute_trade("buy", token_address, budget, pool)
         if result:
             results.append({"wallet": wallet_name, "tx": result})
             
@@ -8,6 +8,8 @@ import asyncio
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from config_manager import load_decrypted_config
+from dex_registry import DEFAULT_FEE_PCT, get_dex
+from http_sessions import PRICES, get_session
 
 LOG_FILE = "trade_log.json"
 CONFIG_FILE = "config.json"
@@ -31,24 +33,24 @@ async def fetch_price_async(token_address):
         f"https://quote-api.jup.ag/v4/quote?inputMint={token_address}&outputMint=So11111111111111111111111111111111111111112"
     ]
 
-    async with aiohttp.ClientSession() as session:
-        for url in urls:
-            try:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                    if "usd" in data.get(token_address, {}):
-                        return data[token_address]["usd"]
-                    if "data" in data:
-                        quotes = data.get("data", [])
-                        if quotes and isinstance(quotes, list):
-                            return quotes[0].get("outAmount", 0)
-
-            except aiohttp.ClientError as e:
-                logger.warning(f"⚠️ Error fetching price from {url}: {e}")
-            except json.JSONDecodeError as e:
-                logger.warning(f"⚠️ Error decoding JSON response from {url}: {e}")
+    session = get_session(PRICES)
+    for url in urls:
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                data = await response.json()
+
+                if "usd" in data.get(token_address, {}):
+                    return data[token_address]["usd"]
+                if "data" in data:
+                    quotes = data.get("data", [])
+                    if quotes and isinstance(quotes, list):
+                        return quotes[0].get("outAmount", 0)
+
+        except aiohttp.ClientError as e:
+            logger.warning(f"⚠️ Error fetching price from {url}: {e}")
+        except json.JSONDecodeError as e:
+            logger.warning(f"⚠️ Error decoding JSON response from {url}: {e}")
 
     return None
 
@@ -213,21 +215,6 @@ def calculate_slippage(current_price: float, expected_price: float) -> float:
     slippage = ((current_price - expected_price) / expected_price) * 100
     return abs(slippage)
 
-def is_honeypot(token_address: str) -> bool:
-    """Check if a token might be a honeypot."""
-    # This is a placeholder - you'd want to implement proper honeypot detection
-    # by checking:
-    # - If the token can be sold
-    # - High buy/sell tax
-    # - Disabled transfers
-    # - Contract permissions
-    
-    HONEYPOT_ADDRESSES = {
-        # Add known honeypot addresses here
-    }
-    
-    return token_address in HONEYPOT_ADDRESSES
-
 def format_sol_amount(lamports: int) -> str:
     """Format lamports to SOL with proper decimal places."""
     sol = lamports / 1e9
@@ -235,13 +222,8 @@ def format_sol_amount(lamports: int) -> str:
 
 def get_dex_fee(dex_program: str) -> float:
     """Get the fee percentage for a specific DEX."""
-    dex_fees = {
-        "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8": 0.25,  # Raydium
-        "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc": 0.3,   # Orca
-        "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBymtzvT": 0.3,   # Meteora
-    }
-    
-    return dex_fees.get(dex_program, 0.3)  # Default 0.3%
+    dex = get_dex(dex_program)
+    return dex.fee() if dex else DEFAULT_FEE_PCT
 
 async def validate_pool_info(pool_info: Dict[str, Any]) -> bool:
     """Validate pool information before trading."""
@@ -0,0 +1,191 @@
+"""Per-mint cache of token safety verdicts.
+
+A token check (Solscan metadata, on-chain risk, sell simulation) is slow
+next to the rest of the trade path and its answer rarely changes, so each
+mint's verdict is cached with a TTL that depends on the outcome: safe and
+suspicious verdicts live long, errors only briefly so a flaky API is
+retried soon without being hammered. A check that passed a token without
+being able to test it (no holder to simulate a sell from yet) is
+UNVERIFIED: bought like a safe one, but cached only as briefly as an error
+so the real check runs as soon as it can. Concurrent checks of the same mint
+share one in-flight request, and verdicts can be persisted to a JSON file
+so they survive restarts.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+SAFE = "safe"
+SUSPICIOUS = "suspicious"
+ERROR = "error"
+UNVERIFIED = "unverified"
+# Outcomes that say nothing lasting about the token; never persisted
+TRANSIENT = (ERROR, UNVERIFIED)
+
+DEFAULT_TTLS = {SAFE: 3600.0, SUSPICIOUS: 86400.0, ERROR: 30.0, UNVERIFIED: 30.0}
+VERDICT_MAX_ENTRIES = 10000
+# Persisted at most this often; close() writes whatever is left
+PERSIST_INTERVAL_SECONDS = 5.0
+
+
+class Verdict(NamedTuple):
+    """One check's outcome for a mint. Times are wall-clock so they survive restarts."""
+    outcome: str  # SAFE, SUSPICIOUS, ERROR or UNVERIFIED
+    detail: Any  # JSON-serialisable reasons or measurements from the check
+    checked_at: float
+    expires_at: float
+
+    @property
+    def suspicious(self) -> bool:
+        """Errors count as suspicious: a token whose check failed is not bought."""
+        return self.outcome not in (SAFE, UNVERIFIED)
+
+
+class VerdictCache:
+    """TTL cache of Verdicts keyed by mint, with single-flight checks and optional persistence."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = VERDICT_MAX_ENTRIES,
+                 path: Optional[str] = None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Verdict]" = OrderedDict()  # oldest first
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self._dirty = False
+        self._saved_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.expired = 0
+        self.evicted = 0
+        self.outcomes = {SAFE: 0, SUSPICIOUS: 0, ERROR: 0, UNVERIFIED: 0}
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, mint: str) -> Optional[Verdict]:
+        """Return the unexpired verdict for mint, if any (counts as a hit or miss)."""
+        with self._lock:
+            verdict = self._entries.get(mint)
+            if verdict is not None and verdict.expires_at <= time.time():
+                del self._entries[mint]
+                self.expired += 1
+                verdict = None
+            if verdict is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return verdict
+
+    def put(self, mint: str, outcome: str, detail: Any = None) -> Verdict:
+        now = time.time()
+        verdict = Verdict(outcome, detail, now, now + self.ttls[outcome])
+        with self._lock:
+            self._entries.pop(mint, None)
+            self._entries[mint] = verdict
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+            self.outcomes[outcome] += 1
+            self._dirty = self._dirty or outcome not in TRANSIENT
+        if self.path and self._dirty and now - self._saved_at >= PERSIST_INTERVAL_SECONDS:
+            self.save()
+        return verdict
+
+    async def resolve(self, mint: str, check: Callable[[str], Awaitable[Tuple[str, Any]]]) -> Verdict:
+        """Return the cached verdict, or run check(mint) -> (outcome, detail) once for all concurrent callers.
+
+        An exception from check is cached as an ERROR verdict.
+        """
+        verdict = self.get(mint)
+        if verdict is not None:
+            return verdict
+        key = (asyncio.get_running_loop(), mint)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled
+                return await self.resolve(mint, check)  # the caller running the check was; take over
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            try:
+                outcome, detail = await check(mint)
+            except Exception as e:
+                LOGGER.warning(f"⚠️ Token check failed for {mint}: {str(e)}")
+                outcome, detail = ERROR, str(e)
+            verdict = self.put(mint, outcome, detail)
+            future.set_result(verdict)
+            return verdict
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+
+    def _load(self):
+        try:
+            with open(self.path) as file:
+                stored = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            LOGGER.warning(f"⚠️ Ignoring unreadable verdict cache {self.path}: {str(e)}")
+            return
+        now = time.time()
+        for mint, fields in sorted(stored.items(), key=lambda item: item[1][2]):
+            verdict = Verdict(*fields)
+            if verdict.expires_at > now:
+                self._entries[mint] = verdict
+        LOGGER.info(f"🗂️ Loaded {len(self._entries)} token verdicts from {self.path}")
+
+    def save(self):
+        """Write the SAFE and SUSPICIOUS verdicts to path (errors and unverified passes are transient and not kept)."""
+        if not self.path:
+            return
+        with self._lock:
+            stored = {mint: list(verdict) for mint, verdict in self._entries.items() if verdict.outcome not in TRANSIENT}
+            self._dirty = False
+            self._saved_at = time.time()
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w") as file:
+                json.dump(stored, file)
+            os.replace(temporary, self.path)
+        except (OSError, TypeError) as e:
+            LOGGER.warning(f"⚠️ Could not persist verdict cache to {self.path}: {str(e)}")
+
+    def close(self):
+        if self._dirty:
+            self.save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": dict(self.ttls),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            # misses that joined another caller's in-flight check instead of running their own
+            "shared_inflight": self.shared,
+            "checks_run": sum(self.outcomes.values()),
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "outcomes": dict(self.outcomes),
+            "persisted_to": self.path,
+        }
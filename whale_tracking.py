@@ -4,6 +4,8 @@ import aiohttp
 from typing import List, Dict, Optional, Any
 from solana.rpc.async_api import AsyncClient
 from config_manager import load_decrypted_config
+from dex_registry import get_dex
+from event_types import SwapEvent
 
 LOGGER = logging.getLogger(__name__)
 
@@ -52,7 +54,7 @@ class WhaleTracker:
             
         return []
     
-    async def analyze_transaction(self, transaction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def analyze_transaction(self, transaction: Dict[str, Any]) -> Optional[SwapEvent]:
         """Analyze a transaction for potential trading opportunities."""
         try:
             # Extract transaction details
@@ -60,35 +62,21 @@ class WhaleTracker:
             message = tx_info.get("message", {})
             instructions = message.get("instructions", [])
             
-            # Look for DEX interactions
+            # Look for swaps on a registered DEX
             for instruction in instructions:
-                program_id = instruction.get("programId")
-                
-                # Check if this is a known DEX program
-                if program_id in ["675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8",  # Raydium
-                                "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc",  # Orca
-                                "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBymtzvT"]: # Meteora
+                dex = get_dex(instruction.get("programId"))
+                if dex is None or dex.decode_swap is None:
+                    continue
+                swap = dex.decode_swap(instruction, transaction)
+                if swap:
+                    return swap
                     
-                    parsed = instruction.get("parsed", {})
-                    if parsed.get("type") in ["swap", "swapExactTokensForTokens"]:
-                        # Extract swap details
-                        info = parsed.get("info", {})
-                        return {
-                            "type": "swap",
-                            "program": program_id,
-                            "token_in": info.get("tokenIn"),
-                            "token_out": info.get("tokenOut"),
-                            "amount_in": info.get("amountIn"),
-                            "amount_out": info.get("amountOut"),
-                            "timestamp": transaction.get("blockTime")
-                        }
-                        
         except Exception as e:
             LOGGER.error(f"Error analyzing transaction: {e}")
             
         return None
     
-    async def monitor_whale_activity(self) -> List[Dict[str, Any]]:
+    async def monitor_whale_activity(self) -> List[SwapEvent]:
         """Monitor all whale wallets for recent activity."""
         all_transactions = []
         
@@ -102,8 +90,8 @@ class WhaleTracker:
             for tx in transactions:
                 analysis = await self.analyze_transaction(tx)
                 if analysis:
-                    analysis["whale"] = whale_name
-                    analysis["wallet"] = wallet_address
+                    analysis.whale = whale_name
+                    analysis.wallet = wallet_address
                     all_transactions.append(analysis)
         
         await self.client.close()